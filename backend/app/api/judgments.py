@@ -1,27 +1,53 @@
 """判断履歴API"""
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
-from app.models.schemas import JudgmentResponse
-from app.services.dynamodb_service import DynamoDBService
+from typing import Optional
+from app.models.schemas import JudgmentResponse, JudgmentPage, BatchGetRequest, BatchJudgmentResponse
+from app.api.params import parse_time_range
+from app.services.pagination import InvalidCursorError
+from app.services.async_dynamodb_service import AsyncDynamoDBService
 
 router = APIRouter(prefix="/api/judgments", tags=["judgments"])
-db_service = DynamoDBService()
+db_service = AsyncDynamoDBService()
 
 
-@router.get("", response_model=List[JudgmentResponse])
+@router.get("", response_model=JudgmentPage)
 async def get_judgments(
     limit: int = Query(50, ge=1, le=100),
-    last_key: Optional[str] = Query(None)
+    cursor: Optional[str] = Query(None),
+    from_time: Optional[str] = Query(None, alias="from", description="期間の開始（ISO8601）"),
+    to_time: Optional[str] = Query(None, alias="to", description="期間の終了（ISO8601）"),
+    min_score: Optional[int] = Query(None, ge=0, le=10, description="confidence_scoreの下限")
 ):
-    """判断履歴一覧を取得"""
-    result = db_service.get_judgments(limit=limit, last_key=last_key)
-    return [JudgmentResponse(**item) for item in result['items']]
+    """判断履歴一覧を新しい順に取得（次のページはnext_cursorをcursorに指定）"""
+    from_time, to_time = parse_time_range(from_time, to_time)
+    try:
+        result = await db_service.get_judgments(
+            limit=limit, cursor=cursor, from_time=from_time, to_time=to_time, min_score=min_score
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JudgmentPage(
+        items=[JudgmentResponse(**item) for item in result['items']],
+        next_cursor=result['next_cursor']
+    )
+
+
+@router.post("/batch", response_model=BatchJudgmentResponse)
+async def get_judgments_batch(request: BatchGetRequest):
+    """複数の判断履歴を一括取得（最大100件）"""
+    keys = [key.model_dump() for key in request.keys]
+    items = await db_service.get_judgments_by_keys(keys)
+    found = {item['judgment_id'] for item in items}
+    return BatchJudgmentResponse(
+        items=[JudgmentResponse(**item) for item in items],
+        missing=list(dict.fromkeys(key['id'] for key in keys if key['id'] not in found))
+    )
 
 
 @router.get("/{judgment_id}", response_model=JudgmentResponse)
 async def get_judgment(judgment_id: str):
     """特定の判断履歴を取得"""
-    judgment = db_service.get_judgment(judgment_id)
+    judgment = await db_service.get_judgment(judgment_id)
     
     if not judgment:
         raise HTTPException(status_code=404, detail="Judgment not found")
@@ -0,0 +1,27 @@
+"""APIパラメータの共通処理"""
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from fastapi import HTTPException
+
+
+def parse_time_range(from_time: Optional[str], to_time: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    期間指定（ISO8601）を検証し、保存形式（UTCのタイムゾーンなしISO8601）にそろえる
+    
+    日付のみの場合はその日の0時として扱う。不正な値・逆転した期間は400。
+    """
+    def normalize(name: str, value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid '{name}': {value}")
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed.isoformat()
+    
+    from_time, to_time = normalize("from", from_time), normalize("to", to_time)
+    if from_time and to_time and from_time > to_time:
+        raise HTTPException(status_code=400, detail="'from' must not be later than 'to'")
+    return from_time, to_time
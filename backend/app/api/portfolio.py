@@ -1,20 +1,87 @@
 """ポートフォリオAPI"""
 from fastapi import APIRouter, HTTPException
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timedelta
+from app.config import TRADING_SYMBOLS
 from app.models.schemas import (
-    PortfolioCurrentResponse, PerformanceResponse, CurrencyPerformanceResponse
+    PortfolioCurrentResponse, PerformanceResponse, CurrencyPerformanceResponse, DashboardResponse
 )
-from app.services.dynamodb_service import DynamoDBService
+from app.services.async_dynamodb_service import AsyncDynamoDBService
 
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
-db_service = DynamoDBService()
+db_service = AsyncDynamoDBService()
+
+
+def _period_name(days: int) -> str:
+    """騰落率の期間の表示名"""
+    return f"{days}日" if days < 7 else f"{days//7}週間" if days < 30 else "1ヶ月"
+
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard():
+    """
+    ダッシュボード（現在の資産内訳・資産全体の騰落率・通貨別騰落率）をまとめて取得
+    
+    メイン実行サイクルが毎回更新するドキュメントをGetItem 1回で返す。
+    未作成の場合は各エンドポイントと同じく生データから組み立てる。
+    """
+    dashboard = await db_service.get_dashboard()
+    if dashboard:
+        return DashboardResponse(
+            portfolio=_dashboard_portfolio(dashboard),
+            performance=_dashboard_performance(dashboard),
+            currency_performance=_dashboard_currency_performance(dashboard),
+            updated_at=dashboard['updated_at']
+        )
+    portfolio = await get_current_portfolio()
+    return DashboardResponse(
+        portfolio=portfolio,
+        performance=await get_portfolio_performance(),
+        currency_performance=await get_currency_performance(),
+        updated_at=portfolio.timestamp
+    )
+
+
+def _dashboard_portfolio(dashboard: dict) -> PortfolioCurrentResponse:
+    """ダッシュボードの現在の資産内訳"""
+    return PortfolioCurrentResponse(**dashboard['portfolio'])
+
+
+def _dashboard_performance(dashboard: dict) -> List[PerformanceResponse]:
+    """ダッシュボードの資産全体の騰落率"""
+    return [
+        PerformanceResponse(
+            period=_period_name(int(entry['days'])),
+            total_value_usdt=entry['total_value_usdt'],
+            change_percent=entry['change_percent']
+        )
+        for entry in dashboard['portfolio_performance']
+    ]
+
+
+def _dashboard_currency_performance(dashboard: dict) -> List[CurrencyPerformanceResponse]:
+    """ダッシュボードの通貨別騰落率（1日/1週間/1ヶ月前の日足終値との比較）"""
+    return [
+        CurrencyPerformanceResponse(
+            symbol=entry['symbol'],
+            current_price=entry['current_price'],
+            change_24h=entry['change_24h'],
+            change_1d=entry.get('change_1d'),
+            change_1w=entry.get('change_7d'),
+            change_1m=entry.get('change_30d')
+        )
+        for entry in dashboard['currency_performance']
+    ]
 
 
 @router.get("/current", response_model=PortfolioCurrentResponse)
 async def get_current_portfolio():
     """現在の資産内訳を取得"""
-    snapshot = db_service.get_latest_portfolio_snapshot()
+    dashboard = await db_service.get_dashboard()
+    if dashboard:
+        return _dashboard_portfolio(dashboard)
+    
+    snapshot = await db_service.get_latest_portfolio_snapshot()
     
     if not snapshot:
         raise HTTPException(status_code=404, detail="Portfolio snapshot not found")
@@ -31,8 +98,12 @@ async def get_current_portfolio():
 @router.get("/performance", response_model=List[PerformanceResponse])
 async def get_portfolio_performance():
     """資産全体の騰落率を取得（1日/2日/1週間/2週間/1ヶ月）"""
+    dashboard = await db_service.get_dashboard()
+    if dashboard:
+        return _dashboard_performance(dashboard)
+    
     periods = [1, 2, 7, 14, 30]
-    current_snapshot = db_service.get_latest_portfolio_snapshot()
+    current_snapshot = await db_service.get_latest_portfolio_snapshot()
     
     if not current_snapshot:
         raise HTTPException(status_code=404, detail="Current portfolio snapshot not found")
@@ -40,8 +111,13 @@ async def get_portfolio_performance():
     current_value = current_snapshot['total_value_usdt']
     performances = []
     
+    # 各期間の基準時刻以前で最も近いスナップショットをまとめて取得
+    now = datetime.utcnow()
+    target_times = {days: (now - timedelta(days=days)).isoformat() for days in periods}
+    past_snapshots = await db_service.get_portfolio_snapshots_at(list(target_times.values()))
+    
     for days in periods:
-        past_snapshot = db_service.get_portfolio_performance(days)
+        past_snapshot = past_snapshots.get(target_times[days])
         
         if past_snapshot:
             past_value = past_snapshot['total_value_usdt']
@@ -49,10 +125,8 @@ async def get_portfolio_performance():
         else:
             change_percent = 0.0
         
-        period_name = f"{days}日" if days < 7 else f"{days//7}週間" if days < 30 else "1ヶ月"
-        
         performances.append(PerformanceResponse(
-            period=period_name,
+            period=_period_name(days),
             total_value_usdt=current_value,
             change_percent=change_percent
         ))
@@ -63,47 +137,53 @@ async def get_portfolio_performance():
 @router.get("/currency-performance", response_model=List[CurrencyPerformanceResponse])
 async def get_currency_performance():
     """各通貨の騰落率を取得"""
-    # 最新の価格履歴から各通貨の騰落率を計算
-    symbols = [
-        "PAXG/USDT", "SLVON/USDT", "SPYON/USDT", "QQQON/USDT",
-        "TSLAX/USDT", "NVDAX/USDT", "MSTRX/USDT", "ONDO/USDT"
-    ]
+    dashboard = await db_service.get_dashboard()
+    if dashboard:
+        return _dashboard_currency_performance(dashboard)
+    
+    # 全通貨の当日/1日/1週間/1ヶ月前の日足集計をBatchGetItem 1回で取得
+    periods = [1, 7, 30]
+    daily_rollups = await db_service.get_daily_rollups_at(TRADING_SYMBOLS, [0] + periods)
     
     performances = []
     
-    for symbol in symbols:
-        price_history = db_service.get_price_history(symbol, days=30)
+    for symbol in TRADING_SYMBOLS:
+        rollups = daily_rollups.get(symbol, {})
+        latest = rollups.get(0)
+        
+        if not latest:
+            # 当日の日足がまだない場合（UTC 0時直後など）は直近の日足から計算
+            recent = await db_service.get_price_rollups(symbol, "1d", 31)
+            if not recent:
+                continue
+            latest = recent[0]
+            latest_bucket = datetime.fromisoformat(latest['bucket_start'])
+            for days in periods:
+                target = (latest_bucket - timedelta(days=days)).isoformat()
+                rollups[days] = next(
+                    (rollup for rollup in recent if rollup['bucket_start'] <= target),
+                    None
+                )
         
-        if price_history:
-            latest = price_history[0]
-            current_price = latest['price']
-            change_24h = latest['change_24h']
-            
-            # 1日/1週間/1ヶ月前の価格を取得
-            change_1d = None
-            change_1w = None
-            change_1m = None
-            
-            for price_data in price_history:
-                days_ago = (datetime.fromisoformat(latest['timestamp']) - 
-                           datetime.fromisoformat(price_data['timestamp'])).days
-                
-                if days_ago >= 1 and change_1d is None:
-                    change_1d = ((current_price - price_data['price']) / price_data['price']) * 100
-                if days_ago >= 7 and change_1w is None:
-                    change_1w = ((current_price - price_data['price']) / price_data['price']) * 100
-                if days_ago >= 30 and change_1m is None:
-                    change_1m = ((current_price - price_data['price']) / price_data['price']) * 100
-                    break
-            
-            performances.append(CurrencyPerformanceResponse(
-                symbol=symbol,
-                current_price=current_price,
-                change_24h=change_24h,
-                change_1d=change_1d,
-                change_1w=change_1w,
-                change_1m=change_1m
-            ))
+        current_price = latest['close']
+        
+        # 1日/1週間/1ヶ月前の日足終値と比較
+        changes = {}
+        for days in periods:
+            past = rollups.get(days)
+            if past and past['close'] > 0:
+                changes[days] = ((current_price - past['close']) / past['close']) * 100
+            else:
+                changes[days] = None
+        
+        performances.append(CurrencyPerformanceResponse(
+            symbol=symbol,
+            current_price=current_price,
+            change_24h=latest['change_24h'],
+            change_1d=changes[1],
+            change_1w=changes[7],
+            change_1m=changes[30]
+        ))
     
     return performances
 
@@ -1,27 +1,68 @@
 """取引履歴API"""
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
-from app.models.schemas import TransactionResponse
-from app.services.dynamodb_service import DynamoDBService
+from typing import Optional
+from app.models.schemas import (
+    TransactionResponse, TransactionPage, TransactionSummaryResponse,
+    BatchGetRequest, BatchTransactionResponse
+)
+from app.api.params import parse_time_range
+from app.services.pagination import InvalidCursorError
+from app.services.async_dynamodb_service import AsyncDynamoDBService
 
 router = APIRouter(prefix="/api/transactions", tags=["transactions"])
-db_service = DynamoDBService()
+db_service = AsyncDynamoDBService()
 
 
-@router.get("", response_model=List[TransactionResponse])
+@router.get("", response_model=TransactionPage)
 async def get_transactions(
     limit: int = Query(50, ge=1, le=100),
-    last_key: Optional[str] = Query(None)
+    cursor: Optional[str] = Query(None),
+    symbol: Optional[str] = Query(None, description="シンボル（例: PAXG/USDT）"),
+    from_time: Optional[str] = Query(None, alias="from", description="期間の開始（ISO8601）"),
+    to_time: Optional[str] = Query(None, alias="to", description="期間の終了（ISO8601）")
 ):
-    """取引履歴一覧を取得"""
-    result = db_service.get_transactions(limit=limit, last_key=last_key)
-    return [TransactionResponse(**item) for item in result['items']]
+    """取引履歴一覧を新しい順に取得（次のページはnext_cursorをcursorに指定）"""
+    from_time, to_time = parse_time_range(from_time, to_time)
+    try:
+        result = await db_service.get_transactions(
+            limit=limit, cursor=cursor, symbol=symbol, from_time=from_time, to_time=to_time
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TransactionPage(
+        items=[TransactionResponse(**item) for item in result['items']],
+        next_cursor=result['next_cursor']
+    )
+
+
+@router.get("/summary", response_model=TransactionSummaryResponse)
+async def get_transaction_summary(
+    symbol: str = Query(..., description="シンボル（例: PAXG/USDT）"),
+    from_time: Optional[str] = Query(None, alias="from", description="期間の開始（ISO8601）"),
+    to_time: Optional[str] = Query(None, alias="to", description="期間の終了（ISO8601）")
+):
+    """シンボル・期間ごとの取引集計（件数・売買数量・VWAP）"""
+    from_time, to_time = parse_time_range(from_time, to_time)
+    summary = await db_service.get_transaction_summary(symbol, from_time=from_time, to_time=to_time)
+    return TransactionSummaryResponse(**summary, from_time=from_time, to_time=to_time)
+
+
+@router.post("/batch", response_model=BatchTransactionResponse)
+async def get_transactions_batch(request: BatchGetRequest):
+    """複数の取引履歴を一括取得（最大100件）"""
+    keys = [key.model_dump() for key in request.keys]
+    items = await db_service.get_transactions_by_keys(keys)
+    found = {item['transaction_id'] for item in items}
+    return BatchTransactionResponse(
+        items=[TransactionResponse(**item) for item in items],
+        missing=list(dict.fromkeys(key['id'] for key in keys if key['id'] not in found))
+    )
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(transaction_id: str):
     """特定の取引履歴を取得"""
-    transaction = db_service.get_transaction(transaction_id)
+    transaction = await db_service.get_transaction(transaction_id)
     
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
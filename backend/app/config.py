@@ -2,6 +2,21 @@
 import os
 from typing import List
 
+# 取引対象資産（lambda/config.py の TRADING_SYMBOLS と同期すること）
+TRADING_SYMBOLS: List[str] = [
+    "PAXG/USDT",  # Gold
+    "SLVON/USDT", # Silver (iShares Silver Trust Ondo Tokenized)
+    "SPYON/USDT", # S&P500
+    "QQQON/USDT", # NASDAQ
+    "TSLAX/USDT", # Tesla
+    "NVDAX/USDT", # NVIDIA
+    "MSTRX/USDT", # MicroStrategy
+    "ONDO/USDT",  # US Treasury
+]
+
+# アクション対象とするConfidence Scoreの下限（lambda/config.py の MIN_CONFIDENCE_SCORE と同期すること）
+MIN_CONFIDENCE_SCORE = 8
+
 AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-1")
 DYNAMODB_TABLE_PREFIX = os.getenv("DYNAMODB_TABLE_PREFIX", "rwa_trading_agent")
 
@@ -10,6 +25,17 @@ JUDGMENTS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_judgments"
 TRANSACTIONS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_transactions"
 PORTFOLIO_SNAPSHOTS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_portfolio_snapshots"
 PRICE_HISTORY_TABLE = f"{DYNAMODB_TABLE_PREFIX}_price_history"
+PRICE_ROLLUPS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_price_rollups"
+DASHBOARD_TABLE = f"{DYNAMODB_TABLE_PREFIX}_dashboard"
+
+# DynamoDBアクセス設定（同期boto3呼び出しを専用スレッドプールで実行する）
+DYNAMODB_MAX_WORKERS = int(os.getenv("DYNAMODB_MAX_WORKERS", "16"))  # スレッドプールの最大並列数
+DYNAMODB_MAX_POOL_CONNECTIONS = DYNAMODB_MAX_WORKERS  # boto3のHTTPコネクションプール上限
+
+# レスポンスキャッシュ設定（データはLambdaの実行サイクルごとにしか更新されない）
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))  # エントリの最大保持時間
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))  # LRUの最大エントリ数
+RESPONSE_CACHE_VERSION_CHECK_SECONDS = int(os.getenv("RESPONSE_CACHE_VERSION_CHECK_SECONDS", "30"))  # 最新timestamp確認の間隔
 
 # CORS設定
 CORS_ORIGINS = [
@@ -4,6 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 from app.config import CORS_ORIGINS
 from app.api import portfolio, judgments, transactions
+from app.response_cache import ResponseCache, ResponseCacheMiddleware
 
 app = FastAPI(
     title="RWA Trading Agent API",
@@ -11,6 +12,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# レスポンスキャッシュ（CORSヘッダーがキャッシュ応答にも付くようCORSより内側に登録）
+response_cache = ResponseCache()
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
 # CORS設定
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +43,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """レスポンスキャッシュのヒット率"""
+    return response_cache.stats()
+
+
 # Lambda用ハンドラー
 handler = Mangum(app)
 
@@ -1,6 +1,6 @@
 """Pydanticスキーマ"""
 from typing import Dict, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -14,6 +14,38 @@ class JudgmentResponse(BaseModel):
     source_urls: List[str]
     info_fetch_status: Dict[str, bool]
     failed_sources: List[str]
+    # ソースごとの取得所要時間（記録前の判断履歴にはない）
+    info_fetch_latency_ms: Dict[str, float] = {}
+    # evaluated: LLMで判断 / skipped: 価格・ニュースに変化がなくLLMを省略
+    status: str = "evaluated"
+    # LLM応答キャッシュのhit/miss件数
+    llm_cache_hits: int = 0
+    llm_cache_misses: int = 0
+
+
+class JudgmentPage(BaseModel):
+    """判断履歴一覧の1ページ"""
+    items: List[JudgmentResponse]
+    # 次のページのカーソル（最終ページはNone）
+    next_cursor: Optional[str] = None
+
+
+class ItemKey(BaseModel):
+    """一括取得のキー（timestampが分かっていればBatchGetItemで読み込む）"""
+    id: str
+    timestamp: Optional[str] = None
+
+
+class BatchGetRequest(BaseModel):
+    """一括取得リクエスト"""
+    keys: List[ItemKey] = Field(..., min_length=1, max_length=100)
+
+
+class BatchJudgmentResponse(BaseModel):
+    """判断履歴の一括取得レスポンス"""
+    items: List[JudgmentResponse]
+    # 見つからなかったID
+    missing: List[str]
 
 
 class TransactionResponse(BaseModel):
@@ -29,6 +61,36 @@ class TransactionResponse(BaseModel):
     post_allocation: Dict[str, float]
 
 
+class TransactionPage(BaseModel):
+    """取引履歴一覧の1ページ"""
+    items: List[TransactionResponse]
+    # 次のページのカーソル（最終ページはNone）
+    next_cursor: Optional[str] = None
+
+
+class TransactionSummaryResponse(BaseModel):
+    """シンボル・期間ごとの取引集計レスポンス（取消・拒否された注文は除く）"""
+    symbol: str
+    from_time: Optional[str] = None
+    to_time: Optional[str] = None
+    count: int
+    buy_count: int
+    sell_count: int
+    buy_volume: float
+    sell_volume: float
+    # 出来高加重平均価格（対象の取引がない場合はNone）
+    vwap: Optional[float] = None
+    buy_vwap: Optional[float] = None
+    sell_vwap: Optional[float] = None
+
+
+class BatchTransactionResponse(BaseModel):
+    """取引履歴の一括取得レスポンス"""
+    items: List[TransactionResponse]
+    # 見つからなかったID
+    missing: List[str]
+
+
 class PortfolioSnapshotResponse(BaseModel):
     """資産スナップショットレスポンス"""
     snapshot_id: str
@@ -64,3 +126,11 @@ class CurrencyPerformanceResponse(BaseModel):
     change_1w: Optional[float] = None
     change_1m: Optional[float] = None
 
+
+class DashboardResponse(BaseModel):
+    """ダッシュボードレスポンス"""
+    portfolio: PortfolioCurrentResponse
+    performance: List[PerformanceResponse]
+    currency_performance: List[CurrencyPerformanceResponse]
+    # メイン実行サイクルがダッシュボードを更新した時刻
+    updated_at: str
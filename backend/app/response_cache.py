@@ -0,0 +1,184 @@
+"""レスポンスキャッシュ"""
+import hashlib
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from typing import Dict, Optional, Tuple
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+from app.config import (
+    RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_VERSION_CHECK_SECONDS
+)
+from app.services.async_dynamodb_service import AsyncDynamoDBService
+
+# キャッシュ対象のパス接頭辞 -> (名前空間, データ版数の取得メソッド)
+# 版数は各名前空間の最新timestampで、新しいものが見えた時点でその名前空間のエントリを破棄する
+CACHED_PREFIXES = {
+    "/api/portfolio": ("portfolio", "get_latest_snapshot_timestamp"),
+    "/api/judgments": ("judgments", "get_latest_judgment_timestamp"),
+}
+
+# 版数の取得に使うサービス（ミドルウェアに指定がない場合。ルーターのdb_serviceと同様に差し替え可能）
+db_service = AsyncDynamoDBService()
+
+
+class ResponseCache:
+    """
+    データ版数付きのインプロセスTTL/LRUキャッシュ
+    
+    エントリは (パス, クエリ) をキーに、生成時の版数とともに保持する。
+    版数が変わったエントリ、またはTTLを過ぎたエントリは無効。
+    """
+    
+    def __init__(self, ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (名前空間, 版数, 保存時刻, body, media_type, etag)
+        self._entries: "OrderedDict[str, Tuple[str, str, float, bytes, Optional[str], str]]" = OrderedDict()
+        # 名前空間 -> (版数, 確認時刻)
+        self._versions: Dict[str, Tuple[Optional[str], float]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
+    def get(self, key: str, version: str) -> Optional[Tuple[bytes, Optional[str], str]]:
+        """有効なエントリを (body, media_type, etag) で返す"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        _, entry_version, stored_at, body, media_type, etag = entry
+        if entry_version != version or time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return body, media_type, etag
+    
+    def put(self, key: str, namespace: str, version: str,
+            body: bytes, media_type: Optional[str]) -> str:
+        """エントリを保存してETagを返す"""
+        etag = '"' + hashlib.sha1(version.encode() + b":" + body).hexdigest() + '"'
+        self._entries[key] = (namespace, version, time.monotonic(), body, media_type, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return etag
+    
+    def cached_version(self, namespace: str) -> Optional[str]:
+        """確認間隔内であれば前回確認した版数を返す（期限切れはNone）"""
+        version, checked_at = self._versions.get(namespace, (None, 0.0))
+        if version is not None and time.monotonic() - checked_at < RESPONSE_CACHE_VERSION_CHECK_SECONDS:
+            return version
+        return None
+    
+    def observe_version(self, namespace: str, version: str):
+        """最新の版数を記録し、より新しい版数であれば名前空間のエントリを破棄"""
+        previous, _ = self._versions.get(namespace, (None, 0.0))
+        self._versions[namespace] = (version, time.monotonic())
+        if previous is not None and version != previous:
+            stale = [key for key, entry in self._entries.items() if entry[0] == namespace]
+            for key in stale:
+                del self._entries[key]
+            self.record(namespace, "invalidations", len(stale))
+    
+    def record(self, namespace: str, counter: str, amount: int = 1):
+        """ヒット率などのカウンタを加算"""
+        counters = self._stats.setdefault(
+            namespace,
+            {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0, "bypassed": 0}
+        )
+        counters[counter] += amount
+    
+    def stats(self) -> Dict:
+        """名前空間ごとのカウンタとヒット率"""
+        namespaces = {}
+        for namespace, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            namespaces[namespace] = {
+                **counters,
+                "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            }
+        return {"entries": len(self._entries), "namespaces": namespaces}
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """対象APIのGETレスポンスをキャッシュし、ETag / If-None-Match で304を返す"""
+    
+    def __init__(self, app, cache: ResponseCache,
+                 db_service: Optional[AsyncDynamoDBService] = None):
+        super().__init__(app)
+        self.cache = cache
+        # Noneの場合は呼び出しのたびにモジュールのdb_serviceを参照する
+        self.db_service = db_service
+    
+    async def dispatch(self, request: Request, call_next):
+        target = self._target(request)
+        if target is None:
+            return await call_next(request)
+        
+        namespace, version_method = target
+        version = await self._current_version(namespace, version_method)
+        if version is None:
+            # 版数が取得できない場合はキャッシュしない
+            self.cache.record(namespace, "bypassed")
+            return await call_next(request)
+        
+        key = f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+        if_none_match = request.headers.get("if-none-match")
+        
+        cached = self.cache.get(key, version)
+        if cached is not None:
+            body, media_type, etag = cached
+            self.cache.record(namespace, "hits")
+            return self._respond(namespace, body, media_type, etag, if_none_match, "HIT")
+        
+        self.cache.record(namespace, "misses")
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = self.cache.put(key, namespace, version, body, response.media_type)
+        return self._respond(namespace, body, response.media_type, etag, if_none_match, "MISS",
+                             status_code=response.status_code, headers=response.headers)
+    
+    def _target(self, request: Request) -> Optional[Tuple[str, str]]:
+        """キャッシュ対象であれば (名前空間, 版数取得メソッド) を返す"""
+        if request.method != "GET":
+            return None
+        for prefix, target in CACHED_PREFIXES.items():
+            if request.url.path.startswith(prefix):
+                return target
+        return None
+    
+    async def _current_version(self, namespace: str, version_method: str) -> Optional[str]:
+        """名前空間の版数（最新timestamp）を取得。確認間隔内は前回値を使う"""
+        version = self.cache.cached_version(namespace)
+        if version is not None:
+            return version
+        service = self.db_service or db_service
+        version = await getattr(service, version_method)()
+        if version is not None:
+            self.cache.observe_version(namespace, version)
+        return version
+    
+    def _respond(self, namespace: str, body: bytes, media_type: Optional[str], etag: str,
+                 if_none_match: Optional[str], cache_status: str,
+                 status_code: int = 200, headers=None) -> Response:
+        """If-None-Matchが一致すれば304、それ以外は本文付きで返す"""
+        response_headers = dict(headers or {})
+        response_headers.pop("content-length", None)
+        response_headers.update({
+            "ETag": etag,
+            # ブラウザには毎回再検証させ、変更がなければ304で本文転送を省く
+            "Cache-Control": "no-cache",
+            "X-Cache": cache_status,
+        })
+        
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self.cache.record(namespace, "not_modified")
+            return Response(status_code=304, headers={
+                "ETag": etag, "Cache-Control": "no-cache", "X-Cache": cache_status
+            })
+        return Response(content=body, status_code=status_code,
+                        headers=response_headers, media_type=media_type)
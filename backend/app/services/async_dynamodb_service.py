@@ -0,0 +1,45 @@
+"""非同期DynamoDBサービス"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.config import DYNAMODB_MAX_WORKERS
+from app.services.dynamodb_service import DynamoDBService
+
+# アプリ全体で共有するDynamoDB呼び出し用スレッドプール
+# （boto3のコネクションプール上限 DYNAMODB_MAX_POOL_CONNECTIONS と同じ並列数）
+_executor = ThreadPoolExecutor(
+    max_workers=DYNAMODB_MAX_WORKERS,
+    thread_name_prefix="dynamodb"
+)
+
+
+class AsyncDynamoDBService:
+    """
+    DynamoDBServiceの非同期版
+    
+    DynamoDBServiceの公開メソッドをそのままawait可能なメソッドとして提供する。
+    boto3の同期呼び出しは専用スレッドプールで実行されるため、
+    async defのルートからawaitしてもイベントループを塞がない。
+    """
+    
+    def __init__(self, service: Optional[DynamoDBService] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.service = service or DynamoDBService()
+        self._executor = executor or _executor
+    
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        method = getattr(self.service, name)
+        if not callable(method):
+            raise AttributeError(name)
+        
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(method, *args, **kwargs)
+            )
+        
+        return call
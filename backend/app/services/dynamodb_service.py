@@ -1,24 +1,41 @@
 """DynamoDBサービス"""
 import boto3
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from decimal import Decimal
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
+from app.services.pagination import decode_cursor, encode_cursor, iter_items, iter_pages
+from app.services.transaction_summary import summarize_transactions
 from app.config import (
     JUDGMENTS_TABLE, TRANSACTIONS_TABLE, PORTFOLIO_SNAPSHOTS_TABLE,
-    PRICE_HISTORY_TABLE, AWS_REGION
+    PRICE_HISTORY_TABLE, PRICE_ROLLUPS_TABLE, DASHBOARD_TABLE, AWS_REGION,
+    DYNAMODB_MAX_POOL_CONNECTIONS, MIN_CONFIDENCE_SCORE
 )
 
+# 時系列GSI（record_type固定 + timestamp）のページングで使うLastEvaluatedKeyの属性
+JUDGMENT_PAGE_KEY = ("judgment_id", "timestamp", "record_type")
+ACTIONABLE_JUDGMENT_PAGE_KEY = ("judgment_id", "timestamp", "actionable")
+TRANSACTION_PAGE_KEY = ("transaction_id", "timestamp", "record_type")
+TRANSACTION_BY_SYMBOL_PAGE_KEY = ("transaction_id", "timestamp", "symbol")
+
 
 class DynamoDBService:
     """DynamoDBサービス"""
     
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
+        self.dynamodb = boto3.resource(
+            'dynamodb',
+            region_name=AWS_REGION,
+            config=Config(max_pool_connections=DYNAMODB_MAX_POOL_CONNECTIONS)
+        )
         self.judgments_table = self.dynamodb.Table(JUDGMENTS_TABLE)
         self.transactions_table = self.dynamodb.Table(TRANSACTIONS_TABLE)
         self.portfolio_snapshots_table = self.dynamodb.Table(PORTFOLIO_SNAPSHOTS_TABLE)
         self.price_history_table = self.dynamodb.Table(PRICE_HISTORY_TABLE)
+        self.price_rollups_table = self.dynamodb.Table(PRICE_ROLLUPS_TABLE)
+        self.dashboard_table = self.dynamodb.Table(DASHBOARD_TABLE)
     
     def _decimal_to_float(self, value):
         """Decimalをfloatに変換"""
@@ -30,155 +47,382 @@ class DynamoDBService:
             return [self._decimal_to_float(item) for item in value]
         return value
     
+    def get_dashboard(self) -> Optional[Dict]:
+        """
+        ダッシュボードを取得（GetItem 1回）
+        
+        現在の資産・資産全体の騰落率・通貨別騰落率は、メイン実行サイクルが毎回更新する。
+        未作成（導入直後）の場合はNone。
+        """
+        try:
+            response = self.dashboard_table.get_item(
+                Key={"dashboard_id": "main"},
+                # 騰落率計算用の履歴は返さない
+                ProjectionExpression="portfolio, portfolio_performance, currency_performance, updated_at",
+            )
+            item = response.get("Item")
+            return self._decimal_to_float(item) if item else None
+        except Exception as e:
+            print(f"Error getting dashboard: {str(e)}")
+            return None
+    
     def get_latest_portfolio_snapshot(self) -> Optional[Dict]:
         """最新のポートフォリオスナップショットを取得"""
         try:
-            response = self.portfolio_snapshots_table.scan(
-                Limit=1
+            # 最新取得はGSIでQuery（record_type固定 + timestamp降順 + Limit=1）
+            response = self.portfolio_snapshots_table.query(
+                IndexName="portfolio_snapshots_by_record_type_timestamp",
+                KeyConditionExpression=Key("record_type").eq("portfolio_snapshot"),
+                ScanIndexForward=False,
+                Limit=1,
             )
+            items = response.get("Items", [])
             
-            if response['Items']:
-                # 最新のものを取得（timestampでソート）
-                items = sorted(
-                    response['Items'],
-                    key=lambda x: x['timestamp'],
-                    reverse=True
-                )
-                item = items[0]
-                return self._decimal_to_float(item)
+            if not items:
+                # フォールバック: record_type未付与の既存データのみの場合（バックフィル前）
+                # infrastructure/backfill_snapshot_record_type.py 実行後は通らない
+                # ページ単位で読み進め、最新のものだけを保持する
+                items = [max(iter_items(self.portfolio_snapshots_table.scan),
+                             key=lambda x: x['timestamp'], default=None)]
+            
+            if items[0]:
+                return self._decimal_to_float(items[0])
             return None
         except Exception as e:
             print(f"Error getting portfolio snapshot: {str(e)}")
             return None
     
-    def get_portfolio_performance(self, days: int) -> Optional[Dict]:
-        """指定日数前のポートフォリオスナップショットを取得"""
+    def get_latest_snapshot_timestamp(self) -> Optional[str]:
+        """最新のポートフォリオスナップショットのtimestampのみを取得（キャッシュ検証用）"""
+        return self._get_latest_timestamp(
+            self.portfolio_snapshots_table,
+            "portfolio_snapshots_by_record_type_timestamp",
+            "portfolio_snapshot"
+        )
+    
+    def get_latest_judgment_timestamp(self) -> Optional[str]:
+        """最新の判断履歴のtimestampのみを取得（キャッシュ検証用）"""
+        return self._get_latest_timestamp(
+            self.judgments_table,
+            "judgments_by_record_type_timestamp",
+            "judgment"
+        )
+    
+    def _get_latest_timestamp(self, table, index_name: str, record_type: str) -> Optional[str]:
+        """record_type固定GSIから最新アイテムのtimestampを取得"""
         try:
-            target_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
-            
-            response = self.portfolio_snapshots_table.scan()
-            items = response['Items']
-            
-            # 指定日数前の最も近いスナップショットを取得
-            closest_item = None
-            closest_diff = None
-            
-            for item in items:
-                item_date = item['timestamp']
-                if item_date <= target_date:
-                    diff = (datetime.fromisoformat(target_date) - 
-                           datetime.fromisoformat(item_date)).total_seconds()
-                    if closest_diff is None or diff < closest_diff:
-                        closest_item = item
-                        closest_diff = diff
-            
-            if closest_item:
-                return self._decimal_to_float(closest_item)
-            return None
+            response = table.query(
+                IndexName=index_name,
+                KeyConditionExpression=Key("record_type").eq(record_type),
+                ScanIndexForward=False,
+                Limit=1,
+                ProjectionExpression="#ts",
+                ExpressionAttributeNames={"#ts": "timestamp"},
+            )
+            items = response.get("Items", [])
+            return items[0]["timestamp"] if items else None
         except Exception as e:
-            print(f"Error getting portfolio performance: {str(e)}")
+            print(f"Error getting latest {record_type} timestamp: {str(e)}")
             return None
     
-    def get_judgments(self, limit: int = 50, last_key: Optional[str] = None) -> Dict:
-        """判断履歴一覧を取得"""
-        try:
-            # 最新取得はGSIでQuery（record_type固定 + timestamp降順 + Limit）
-            # NOTE: 既存データ（record_type未付与）が残っている間はフォールバックでscanも実施。
-            if last_key:
-                # このプロジェクトのlast_keyはフロントで未使用。互換のためscanベースのページングは温存しない。
-                pass
-
+    def get_portfolio_performance(self, days: int) -> Optional[Dict]:
+        """指定日数前のポートフォリオスナップショットを取得"""
+        target_time = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        return self.get_portfolio_snapshots_at([target_time])[target_time]
+    
+    def get_portfolio_snapshots_at(self, target_times: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        各指定時刻以前で最も近いポートフォリオスナップショットを取得
+        
+        timestamp降順のGSIに対して「timestamp <= 指定時刻」の範囲Query（Limit=1）を
+        指定時刻ごとに1回だけ行うため、履歴の長さに関係なく読み込みは時刻数分で済む。
+        
+        Args:
+            target_times: ISO8601形式の時刻リスト
+        
+        Returns:
+            {指定時刻: スナップショット（該当なしの場合None）}
+        """
+        snapshots: Dict[str, Optional[Dict]] = {}
+        for target_time in target_times:
             try:
-                response = self.judgments_table.query(
-                    IndexName="judgments_by_record_type_timestamp",
-                    KeyConditionExpression=Key("record_type").eq("judgment"),
+                response = self.portfolio_snapshots_table.query(
+                    IndexName="portfolio_snapshots_by_record_type_timestamp",
+                    KeyConditionExpression=(
+                        Key("record_type").eq("portfolio_snapshot")
+                        & Key("timestamp").lte(target_time)
+                    ),
                     ScanIndexForward=False,
-                    Limit=limit,
+                    Limit=1,
                 )
                 items = response.get("Items", [])
-            except Exception:
-                items = []
-
-            if len(items) < limit:
-                # フォールバック: scanしてtimestamp降順から補完（テーブルが小さい間の暫定）
-                scan_items: List[Dict] = []
-                scan_kwargs: Dict = {}
-                while True:
-                    scan_resp = self.judgments_table.scan(**scan_kwargs)
-                    scan_items.extend(scan_resp.get("Items", []))
-                    lek = scan_resp.get("LastEvaluatedKey")
-                    if not lek:
-                        break
-                    scan_kwargs["ExclusiveStartKey"] = lek
-
-                scan_items_sorted = sorted(scan_items, key=lambda x: x["timestamp"], reverse=True)
-                items = scan_items_sorted[:limit]
-
-            return {
-                "items": [self._decimal_to_float(item) for item in items],
-                "last_evaluated_key": None,
-            }
-        except Exception as e:
-            print(f"Error getting judgments: {str(e)}")
-            return {'items': [], 'last_evaluated_key': None}
+                snapshots[target_time] = self._decimal_to_float(items[0]) if items else None
+            except Exception as e:
+                print(f"Error getting portfolio snapshot at {target_time}: {str(e)}")
+                snapshots[target_time] = None
+        return snapshots
+    
+    def get_judgments(self, limit: int = 50, cursor: Optional[str] = None,
+                      from_time: Optional[str] = None, to_time: Optional[str] = None,
+                      min_score: Optional[int] = None) -> Dict:
+        """
+        判断履歴一覧を新しい順に取得（キーセット方式のページング）
+        
+        期間はtimestampのキー条件で絞り込む。min_scoreがMIN_CONFIDENCE_SCORE以上の場合は
+        アクション対象の判断のみを含むスパースGSIをQueryするため、大半を占める低スコア・スキップの判断は読まない。
+        
+        Args:
+            cursor: 前のページのnext_cursor（省略時は最新から。同じ条件のカーソルのみ有効）
+            from_time / to_time: 期間（ISO8601、両端を含む）
+            min_score: confidence_scoreの下限
+        
+        Returns:
+            {"items": 判断履歴, "next_cursor": 次のページのカーソル（最終ページはNone）}
+        
+        Raises:
+            InvalidCursorError: カーソルが不正な場合
+        """
+        if min_score is not None and min_score >= MIN_CONFIDENCE_SCORE:
+            return self._query_page(
+                self.judgments_table, "judgments_actionable_by_timestamp",
+                self._time_range(Key("actionable").eq("judgment"), from_time, to_time),
+                ACTIONABLE_JUDGMENT_PAGE_KEY, limit, cursor,
+                # インデックスの全件がMIN_CONFIDENCE_SCORE以上のため、それより高い場合のみ絞り込む
+                Attr("confidence_score").gte(min_score) if min_score > MIN_CONFIDENCE_SCORE else None
+            )
+        return self._query_page(
+            self.judgments_table, "judgments_by_record_type_timestamp",
+            self._time_range(Key("record_type").eq("judgment"), from_time, to_time),
+            JUDGMENT_PAGE_KEY, limit, cursor,
+            Attr("confidence_score").gte(min_score) if min_score else None
+        )
+    
+    def iter_judgments(self, page_size: int = 100) -> Iterator[Dict]:
+        """判断履歴を新しい順に1件ずつ返すジェネレータ（読み進めた分だけページを取得）"""
+        return self._iter_record_type(self.judgments_table, "judgments_by_record_type_timestamp",
+                                      "judgment", page_size)
     
     def get_judgment(self, judgment_id: str) -> Optional[Dict]:
-        """特定の判断履歴を取得"""
+        """特定の判断履歴を取得（ハッシュキーjudgment_idでQuery）"""
+        return self._get_by_id(self.judgments_table, "judgment_id", judgment_id)
+    
+    def get_judgments_by_keys(self, keys: List[Dict[str, Optional[str]]]) -> List[Dict]:
+        """
+        複数の判断履歴をまとめて取得
+        
+        Args:
+            keys: {"id": judgment_id, "timestamp": timestamp（省略可）} のリスト
+        
+        Returns:
+            見つかった判断履歴（keysの順。存在しないものは含まれない）
+        """
+        return self._get_by_keys(JUDGMENTS_TABLE, self.judgments_table, "judgment_id", keys)
+    
+    def get_transactions(self, limit: int = 50, cursor: Optional[str] = None,
+                         symbol: Optional[str] = None, from_time: Optional[str] = None,
+                         to_time: Optional[str] = None) -> Dict:
+        """
+        取引履歴一覧を新しい順に取得（キーセット方式のページング）
+        
+        symbol指定時は transactions_by_symbol GSI、それ以外は record_type固定GSIをQueryし、
+        期間はtimestampのキー条件で絞り込む。
+        
+        Args:
+            cursor: 前のページのnext_cursor（省略時は最新から。同じ条件のカーソルのみ有効）
+            symbol: シンボル（例: "PAXG/USDT"）
+            from_time / to_time: 期間（ISO8601、両端を含む）
+        
+        Returns:
+            {"items": 取引履歴, "next_cursor": 次のページのカーソル（最終ページはNone）}
+        
+        Raises:
+            InvalidCursorError: カーソルが不正な場合
+        """
+        if symbol:
+            return self._query_page(
+                self.transactions_table, "transactions_by_symbol",
+                self._time_range(Key("symbol").eq(symbol), from_time, to_time),
+                TRANSACTION_BY_SYMBOL_PAGE_KEY, limit, cursor
+            )
+        return self._query_page(
+            self.transactions_table, "transactions_by_record_type_timestamp",
+            self._time_range(Key("record_type").eq("transaction"), from_time, to_time),
+            TRANSACTION_PAGE_KEY, limit, cursor
+        )
+    
+    def get_transaction_summary(self, symbol: str, from_time: Optional[str] = None,
+                                to_time: Optional[str] = None) -> Dict:
+        """
+        シンボル・期間ごとの取引集計（件数・売買数量・VWAP）
+        
+        transactions_by_symbol GSIを期間のキー条件でQueryし、集計に必要な属性のみを
+        ページ単位で読み進めながら1回の走査で集計する。
+        """
         try:
-            # judgment_idとtimestampの両方が必要なので、スキャンで検索
-            response = self.judgments_table.scan(
-                FilterExpression='judgment_id = :id',
-                ExpressionAttributeValues={':id': judgment_id}
+            items = iter_items(
+                self.transactions_table.query,
+                IndexName="transactions_by_symbol",
+                KeyConditionExpression=self._time_range(Key("symbol").eq(symbol), from_time, to_time),
+                ProjectionExpression="#side, amount, price, #status",
+                ExpressionAttributeNames={"#side": "side", "#status": "status"},
             )
-            
-            if response['Items']:
-                return self._decimal_to_float(response['Items'][0])
-            return None
+            return summarize_transactions(symbol, items)
         except Exception as e:
-            print(f"Error getting judgment: {str(e)}")
-            return None
+            print(f"Error getting transaction summary for {symbol}: {str(e)}")
+            return summarize_transactions(symbol, [])
     
-    def get_transactions(self, limit: int = 50, last_key: Optional[str] = None) -> Dict:
-        """取引履歴一覧を取得"""
+    def iter_transactions(self, page_size: int = 100) -> Iterator[Dict]:
+        """取引履歴を新しい順に1件ずつ返すジェネレータ（読み進めた分だけページを取得）"""
+        return self._iter_record_type(self.transactions_table, "transactions_by_record_type_timestamp",
+                                      "transaction", page_size)
+    
+    def _time_range(self, key_condition, from_time: Optional[str], to_time: Optional[str]):
+        """パーティションキーの条件にtimestampの範囲条件（両端を含む）を追加"""
+        if from_time and to_time:
+            return key_condition & Key("timestamp").between(from_time, to_time)
+        if from_time:
+            return key_condition & Key("timestamp").gte(from_time)
+        if to_time:
+            return key_condition & Key("timestamp").lte(to_time)
+        return key_condition
+    
+    def _query_page(self, table, index_name: str, key_condition,
+                    key_attributes: Tuple[str, ...], limit: int, cursor: Optional[str],
+                    filter_expression=None) -> Dict:
+        """
+        時系列GSIをtimestamp降順に1ページ分Query
+        
+        FilterExpressionで除外された分はlimit件になるまで続きを読み込み、
+        途中で打ち切った場合は返した最後のアイテムのキーを次のページのカーソルにする。
+        """
+        query_kwargs: Dict = {
+            "IndexName": index_name,
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": False,
+            "Limit": limit,
+        }
+        if filter_expression is not None:
+            query_kwargs["FilterExpression"] = filter_expression
+        # 不正なカーソルは呼び出し側で400として扱う
+        exclusive_start_key = decode_cursor(cursor, key_attributes)
+        if exclusive_start_key:
+            query_kwargs["ExclusiveStartKey"] = exclusive_start_key
+        
         try:
-            scan_kwargs = {
-                'Limit': limit
-            }
-            
-            if last_key:
-                scan_kwargs['ExclusiveStartKey'] = {'transaction_id': last_key}
-            
-            response = self.transactions_table.scan(**scan_kwargs)
-            
-            items = sorted(
-                response['Items'],
-                key=lambda x: x['timestamp'],
-                reverse=True
-            )
-            
+            items: List[Dict] = []
+            last_evaluated_key = None
+            for page, last_evaluated_key in iter_pages(table.query, **query_kwargs):
+                remaining = limit - len(items)
+                if len(page) > remaining:
+                    items.extend(page[:remaining])
+                    last_evaluated_key = {attr: items[-1][attr] for attr in key_attributes}
+                    break
+                items.extend(page)
+                if len(items) >= limit:
+                    break
             return {
-                'items': [self._decimal_to_float(item) for item in items],
-                'last_evaluated_key': response.get('LastEvaluatedKey')
+                "items": [self._decimal_to_float(item) for item in items],
+                "next_cursor": encode_cursor(last_evaluated_key),
             }
         except Exception as e:
-            print(f"Error getting transactions: {str(e)}")
-            return {'items': [], 'last_evaluated_key': None}
+            print(f"Error querying {index_name}: {str(e)}")
+            return {"items": [], "next_cursor": None}
+    
+    def _iter_record_type(self, table, index_name: str, record_type: str,
+                          page_size: int) -> Iterator[Dict]:
+        """record_type固定GSIをtimestamp降順に1件ずつ返すジェネレータ"""
+        for item in iter_items(
+            table.query,
+            IndexName=index_name,
+            KeyConditionExpression=Key("record_type").eq(record_type),
+            ScanIndexForward=False,
+            Limit=page_size,
+        ):
+            yield self._decimal_to_float(item)
     
     def get_transaction(self, transaction_id: str) -> Optional[Dict]:
-        """特定の取引履歴を取得"""
+        """特定の取引履歴を取得（ハッシュキーtransaction_idでQuery）"""
+        return self._get_by_id(self.transactions_table, "transaction_id", transaction_id)
+    
+    def get_transactions_by_keys(self, keys: List[Dict[str, Optional[str]]]) -> List[Dict]:
+        """
+        複数の取引履歴をまとめて取得
+        
+        Args:
+            keys: {"id": transaction_id, "timestamp": timestamp（省略可）} のリスト
+        
+        Returns:
+            見つかった取引履歴（keysの順。存在しないものは含まれない）
+        """
+        return self._get_by_keys(TRANSACTIONS_TABLE, self.transactions_table, "transaction_id", keys)
+    
+    def _get_by_id(self, table, id_attr: str, item_id: str) -> Optional[Dict]:
+        """
+        IDでアイテムを取得
+        
+        キーは (ID, timestamp) の複合キーでGetItemにはtimestampが必要なため、
+        ハッシュキーのみを条件にQueryする（IDごとに1件なのでテーブルの大きさに関係なく1回の読み込み）。
+        """
         try:
-            response = self.transactions_table.scan(
-                FilterExpression='transaction_id = :id',
-                ExpressionAttributeValues={':id': transaction_id}
+            response = table.query(
+                KeyConditionExpression=Key(id_attr).eq(item_id),
+                Limit=1,
             )
-            
-            if response['Items']:
-                return self._decimal_to_float(response['Items'][0])
-            return None
+            items = response.get("Items", [])
+            return self._decimal_to_float(items[0]) if items else None
         except Exception as e:
-            print(f"Error getting transaction: {str(e)}")
+            print(f"Error getting {id_attr} {item_id}: {str(e)}")
             return None
     
+    def _get_by_keys(self, table_name: str, table, id_attr: str,
+                     keys: List[Dict[str, Optional[str]]]) -> List[Dict]:
+        """
+        複数のIDでアイテムを取得
+        
+        timestampが分かっているキー（一覧から辿る場合）はBatchGetItemでまとめて読み込み、
+        IDのみのキーはハッシュキーのQueryで1件ずつ読み込む。
+        """
+        ids = list(dict.fromkeys(key["id"] for key in keys))
+        timestamps = {key["id"]: key["timestamp"] for key in keys if key.get("timestamp")}
+        found: Dict[str, Dict] = {}
+        batch_failed = False
+        try:
+            full_keys = [{id_attr: item_id, "timestamp": timestamp} for item_id, timestamp in timestamps.items()]
+            for item in self._batch_get(table_name, full_keys):
+                found[item[id_attr]] = self._decimal_to_float(item)
+        except Exception as e:
+            print(f"Error batch getting {table_name}: {str(e)}")
+            # 一括読み込みに失敗した場合は、timestampが分かっているキーも1件ずつ読み込む
+            batch_failed = True
+        
+        for item_id in ids:
+            if item_id not in found and (batch_failed or item_id not in timestamps):
+                item = self._get_by_id(table, id_attr, item_id)
+                if item:
+                    found[item_id] = item
+        return [found[item_id] for item_id in ids if item_id in found]
+    
+    def _batch_get(self, table_name: str, keys: List[Dict]) -> List[Dict]:
+        """
+        BatchGetItemで複数キーを読み込む（1リクエスト100キーまで、UnprocessedKeysは再送）
+        
+        再送してもUnprocessedKeysが残った場合は、一部のアイテムだけを返さずRuntimeErrorを送出する。
+        """
+        items: List[Dict] = []
+        for start in range(0, len(keys), 100):
+            request_items = {table_name: {"Keys": keys[start:start + 100]}}
+            for attempt in range(5):
+                response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                items.extend(response.get("Responses", {}).get(table_name, []))
+                request_items = response.get("UnprocessedKeys") or {}
+                if not request_items:
+                    break
+                if attempt < 4:
+                    time.sleep(0.05 * (2 ** attempt))
+            if request_items:
+                raise RuntimeError(f"BatchGetItem left unprocessed keys after retries on {table_name}")
+        return items
+    
     def get_price_history(self, symbol: str, days: int = 30) -> List[Dict]:
         """価格履歴を取得"""
         try:
@@ -193,4 +437,57 @@ class DynamoDBService:
         except Exception as e:
             print(f"Error getting price history: {str(e)}")
             return []
-
+    
+    def get_price_rollups(self, symbol: str, interval: str = "1d", limit: int = 31) -> List[Dict]:
+        """
+        OHLCV集計を新しい順に取得
+        
+        Args:
+            interval: "1h"（時間足）または "1d"（日足）
+            limit: 取得するバケット数
+        """
+        try:
+            response = self.price_rollups_table.query(
+                KeyConditionExpression=Key("series_key").eq(f"{symbol}#{interval}"),
+                ScanIndexForward=False,
+                Limit=limit
+            )
+            
+            return [self._decimal_to_float(item) for item in response['Items']]
+        except Exception as e:
+            print(f"Error getting price rollups: {str(e)}")
+            return []
+    
+    def get_daily_rollups_at(self, symbols: List[str], day_offsets: List[int],
+                             now: Optional[datetime] = None) -> Dict[str, Dict[int, Dict]]:
+        """
+        複数シンボルの「N日前の日足集計」をBatchGetItem 1回でまとめて取得
+        
+        日足のキー（"<symbol>#1d", 当日UTC 0時 - N日）は計算で求まるため、
+        シンボル数×オフセット数のキーを一括で読み込む（1リクエスト100キーまで）。
+        
+        Returns:
+            {symbol: {day_offset: 日足集計}}（存在しないバケットは含まれない）
+        """
+        today = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+        keys = [
+            {
+                "series_key": f"{symbol}#1d",
+                "bucket_start": (today - timedelta(days=offset)).isoformat(),
+            }
+            for symbol in symbols
+            for offset in day_offsets
+        ]
+        offsets_by_bucket = {
+            (today - timedelta(days=offset)).isoformat(): offset for offset in day_offsets
+        }
+        
+        rollups: Dict[str, Dict[int, Dict]] = {symbol: {} for symbol in symbols}
+        try:
+            for item in self._batch_get(PRICE_ROLLUPS_TABLE, keys):
+                offset = offsets_by_bucket[item["bucket_start"]]
+                rollups[item["symbol"]][offset] = self._decimal_to_float(item)
+            return rollups
+        except Exception as e:
+            print(f"Error getting daily rollups: {str(e)}")
+            return rollups
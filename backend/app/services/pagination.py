@@ -0,0 +1,61 @@
+"""キーセット方式のページング"""
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """カーソルが不正（改ざん・別のAPIのカーソルなど）"""
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """LastEvaluatedKeyを不透明なカーソル（URLセーフなbase64）に変換。最終ページはNone"""
+    if not last_evaluated_key:
+        return None
+    payload = json.dumps(last_evaluated_key, sort_keys=True, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], key_attributes: Sequence[str]) -> Optional[Dict[str, str]]:
+    """
+    カーソルをExclusiveStartKeyに戻す
+    
+    Args:
+        key_attributes: ExclusiveStartKeyに含まれるべき属性（テーブルのキー + インデックスのキー）
+    
+    Raises:
+        InvalidCursorError: デコードできない、または属性が一致しない場合
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {str(e)}")
+    if (not isinstance(key, dict) or set(key) != set(key_attributes)
+            or not all(isinstance(value, str) for value in key.values())):
+        raise InvalidCursorError("Invalid cursor: key attributes do not match")
+    return key
+
+
+def iter_pages(operation: Callable[..., Dict], **kwargs: Any) -> Iterator[Tuple[List[Dict], Optional[Dict]]]:
+    """
+    Query / Scan をページ単位で順に実行し、(アイテム, LastEvaluatedKey) を返すジェネレータ
+    
+    呼び出し側が読み進めた分だけリクエストするため、テーブル全体をメモリに載せない。
+    """
+    while True:
+        response = operation(**kwargs)
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        yield response.get("Items", []), last_evaluated_key
+        if not last_evaluated_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+
+def iter_items(operation: Callable[..., Dict], **kwargs: Any) -> Iterator[Dict]:
+    """iter_pagesのアイテムを1件ずつ返すジェネレータ"""
+    for items, _ in iter_pages(operation, **kwargs):
+        yield from items
@@ -0,0 +1,40 @@
+"""取引集計"""
+from typing import Dict, Iterable
+
+# 約定していない注文のステータス（集計対象外）
+UNFILLED_STATUSES = {"canceled", "rejected", "expired"}
+
+
+def summarize_transactions(symbol: str, items: Iterable[Dict]) -> Dict:
+    """
+    取引の件数・売買数量・VWAPを1回の走査で集計
+    
+    itemsは1件ずつ読み進めるだけのため、ジェネレータを渡せば全件をメモリに載せない。
+    VWAPは Σ(価格×数量) / Σ数量（数量が0の場合はNone）。
+    """
+    totals = {
+        side: {"count": 0, "volume": 0.0, "notional": 0.0}
+        for side in ("buy", "sell")
+    }
+    for item in items:
+        side = item.get("side")
+        if side not in totals or item.get("status") in UNFILLED_STATUSES:
+            continue
+        amount = float(item.get("amount", 0))
+        totals[side]["count"] += 1
+        totals[side]["volume"] += amount
+        totals[side]["notional"] += float(item.get("price", 0)) * amount
+    
+    buy, sell = totals["buy"], totals["sell"]
+    volume = buy["volume"] + sell["volume"]
+    return {
+        "symbol": symbol,
+        "count": buy["count"] + sell["count"],
+        "buy_count": buy["count"],
+        "sell_count": sell["count"],
+        "buy_volume": buy["volume"],
+        "sell_volume": sell["volume"],
+        "vwap": (buy["notional"] + sell["notional"]) / volume if volume else None,
+        "buy_vwap": buy["notional"] / buy["volume"] if buy["volume"] else None,
+        "sell_vwap": sell["notional"] / sell["volume"] if sell["volume"] else None,
+    }
@@ -0,0 +1,208 @@
+"""DynamoDBアクセス層の並列負荷ベンチマーク
+
+並列リクエスト時のレイテンシ（p50/p99）とスループットを計測する。
+
+使い方（backend/ で実行、httpx が必要）:
+    # ローカル: アプリをuvicornで別スレッド起動し、DynamoDB呼び出しを擬似レイテンシに置き換えて
+    # 同期呼び出し（イベントループをブロック）とスレッドプール実行を比較
+    python -m benchmarks.concurrency_benchmark --requests 200 --concurrency 50 --latency-ms 30
+    
+    # デプロイ済みAPIに対して計測
+    python -m benchmarks.concurrency_benchmark --url https://xxxx.execute-api.ap-northeast-1.amazonaws.com \\
+        --path /api/portfolio/current --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import httpx
+import uvicorn
+
+from app.main import app
+from app import response_cache
+from app.api import portfolio
+from app.services.async_dynamodb_service import AsyncDynamoDBService
+
+
+class SimulatedDynamoDBService:
+    """
+    boto3呼び出しの代わりに指定時間スリープして固定のダッシュボード・スナップショットを返す
+    
+    レスポンスキャッシュの版数はNoneを返し、毎回キャッシュを通さずにルートまで到達させる
+    （キャッシュのヒットではなくDynamoDBアクセス層の並列性能を計測するため）。
+    """
+    
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+    
+    def get_latest_snapshot_timestamp(self) -> None:
+        time.sleep(self.latency_seconds)
+        return None
+    
+    def get_latest_judgment_timestamp(self) -> None:
+        time.sleep(self.latency_seconds)
+        return None
+    
+    def get_dashboard(self) -> Dict:
+        time.sleep(self.latency_seconds)
+        now = datetime.utcnow().isoformat()
+        return {
+            'portfolio': self._snapshot(now),
+            'portfolio_performance': [
+                {'days': days, 'total_value_usdt': 1000.0, 'change_percent': 0.0}
+                for days in (1, 2, 7, 14, 30)
+            ],
+            'currency_performance': [
+                {
+                    'symbol': 'PAXG/USDT',
+                    'current_price': 2000.0,
+                    'change_24h': 0.0,
+                    'change_1d': 0.0,
+                    'change_7d': 0.0,
+                    'change_30d': 0.0,
+                }
+            ],
+            'updated_at': now
+        }
+    
+    def get_latest_portfolio_snapshot(self) -> Dict:
+        time.sleep(self.latency_seconds)
+        return self._snapshot(datetime.utcnow().isoformat())
+    
+    @staticmethod
+    def _snapshot(timestamp: str) -> Dict:
+        return {
+            'holdings': {'USDT': 1000.0},
+            'values_usdt': {'USDT': 1000.0},
+            'total_value_usdt': 1000.0,
+            'allocations': {'USDT': 1.0},
+            'timestamp': timestamp
+        }
+
+
+class BlockingDynamoDBService:
+    """同期メソッドをそのままasync defから呼ぶ従来の挙動（比較用）"""
+    
+    def __init__(self, service):
+        self.service = service
+    
+    def __getattr__(self, name: str):
+        method = getattr(self.service, name)
+        
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        
+        return call
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    """ソート済みでないリストのパーセンタイル（最近傍法）"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(ratio * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_load(client: httpx.AsyncClient, path: str,
+                   total_requests: int, concurrency: int) -> Dict[str, float]:
+    """concurrency並列でtotal_requests件のGETを送り、レイテンシを集計"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+    
+    started_at = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started_at
+    
+    return {
+        'p50_ms': percentile(latencies, 0.50),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': max(latencies),
+        'throughput_rps': total_requests / elapsed,
+        'errors': errors,
+    }
+
+
+def print_result(label: str, result: Dict[str, float]):
+    print(
+        f"{label:<12} p50={result['p50_ms']:8.1f}ms  p99={result['p99_ms']:8.1f}ms  "
+        f"max={result['max_ms']:8.1f}ms  throughput={result['throughput_rps']:8.1f} req/s  "
+        f"errors={result['errors']}"
+    )
+
+
+def start_local_server() -> (uvicorn.Server, str):
+    """アプリをuvicornで別スレッド起動し、ベースURLを返す"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def benchmark_local(args):
+    """擬似レイテンシで同期呼び出しとスレッドプール実行を比較"""
+    simulated = SimulatedDynamoDBService(args.latency_ms / 1000)
+    modes = {
+        'blocking': BlockingDynamoDBService(simulated),
+        'threadpool': AsyncDynamoDBService(service=simulated),
+    }
+    original = portfolio.db_service, response_cache.db_service
+    server, base_url = start_local_server()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    
+    print(
+        f"path={args.path} requests={args.requests} concurrency={args.concurrency} "
+        f"simulated_latency={args.latency_ms}ms"
+    )
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            for label, service in modes.items():
+                portfolio.db_service = response_cache.db_service = service
+                print_result(label, await run_load(client, args.path, args.requests, args.concurrency))
+    finally:
+        portfolio.db_service, response_cache.db_service = original
+        server.should_exit = True
+
+
+async def benchmark_remote(args):
+    """デプロイ済みAPIに対して計測"""
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        print(f"url={args.url}{args.path} requests={args.requests} concurrency={args.concurrency}")
+        print_result('remote', await run_load(client, args.path, args.requests, args.concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DynamoDB access layer concurrency benchmark")
+    parser.add_argument('--url', help="計測対象APIのベースURL（省略時はローカルで擬似計測）")
+    parser.add_argument('--path', default='/api/portfolio/current')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=30.0, help="ローカル計測時の擬似DynamoDBレイテンシ")
+    args = parser.parse_args()
+    
+    if args.url:
+        asyncio.run(benchmark_remote(args))
+    else:
+        asyncio.run(benchmark_local(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+"""テスト共通設定（backend/ を import パスに追加する）"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# backend/ 直下の同梱モジュール（typing_extensions等）よりインストール済みのパッケージを優先する
+sys.path.append(BACKEND_DIR)
@@ -0,0 +1,111 @@
+"""キーセット方式のページング（カーソルの変換・ページ単位の読み込み）のテスト"""
+import base64
+import json
+import pytest
+from app.services.pagination import (
+    InvalidCursorError, decode_cursor, encode_cursor, iter_items, iter_pages
+)
+
+KEY_ATTRIBUTES = ["judgment_id", "timestamp", "status"]
+LAST_EVALUATED_KEY = {
+    "judgment_id": "abc-123",
+    "timestamp": "2026-10-17T12:00:00",
+    "status": "evaluated",
+}
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(LAST_EVALUATED_KEY)
+    
+    assert decode_cursor(cursor, KEY_ATTRIBUTES) == LAST_EVALUATED_KEY
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor({"judgment_id": "?>?>", "timestamp": "2026", "status": "x"})
+    
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor, KEY_ATTRIBUTES)["judgment_id"] == "?>?>"
+
+
+def test_last_page_has_no_cursor():
+    assert encode_cursor(None) is None
+    assert encode_cursor({}) is None
+
+
+def test_empty_cursor_starts_from_first_page():
+    assert decode_cursor(None, KEY_ATTRIBUTES) is None
+    assert decode_cursor("", KEY_ATTRIBUTES) is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    "%%%",
+    raw_cursor("just a string"),
+    raw_cursor(["abc-123", "2026-10-17T12:00:00"]),
+])
+def test_undecodable_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, KEY_ATTRIBUTES)
+
+
+def test_cursor_for_another_index_is_rejected():
+    # 別のAPI（取引一覧）のカーソルはキー属性が異なる
+    cursor = encode_cursor({"transaction_id": "tx-1", "timestamp": "2026-10-17T12:00:00"})
+    
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, KEY_ATTRIBUTES)
+
+
+def test_cursor_with_non_string_value_is_rejected():
+    cursor = raw_cursor({**LAST_EVALUATED_KEY, "timestamp": {"S": "2026-10-17T12:00:00"}})
+    
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, KEY_ATTRIBUTES)
+
+
+class FakeQuery:
+    """LastEvaluatedKeyで続きを返すQueryの代わり（受け取った引数を記録する）"""
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+    
+    def __call__(self, **kwargs):
+        self.calls.append(dict(kwargs))
+        index = len(self.calls) - 1
+        response = {"Items": self.pages[index]}
+        if index + 1 < len(self.pages):
+            response["LastEvaluatedKey"] = {"id": str(index)}
+        return response
+
+
+def test_iter_pages_follows_last_evaluated_key():
+    query = FakeQuery([[{"id": "a"}, {"id": "b"}], [{"id": "c"}], []])
+    
+    pages = list(iter_pages(query, TableName="judgments", Limit=2))
+    
+    assert pages == [
+        ([{"id": "a"}, {"id": "b"}], {"id": "0"}),
+        ([{"id": "c"}], {"id": "1"}),
+        ([], None),
+    ]
+    assert query.calls == [
+        {"TableName": "judgments", "Limit": 2},
+        {"TableName": "judgments", "Limit": 2, "ExclusiveStartKey": {"id": "0"}},
+        {"TableName": "judgments", "Limit": 2, "ExclusiveStartKey": {"id": "1"}},
+    ]
+
+
+def test_iter_items_requests_only_what_is_read():
+    query = FakeQuery([[{"id": "a"}], [{"id": "b"}], [{"id": "c"}]])
+    items = iter_items(query)
+    
+    assert next(items) == {"id": "a"}
+    assert len(query.calls) == 1
+    assert next(items) == {"id": "b"}
+    assert len(query.calls) == 2
@@ -21,15 +21,12 @@ const Dashboard: React.FC = () => {
       setLoading(true)
       setError(null)
       
-      const [portfolioData, performanceData, currencyData] = await Promise.all([
-        portfolioApi.getCurrent(),
-        portfolioApi.getPerformance(),
-        portfolioApi.getCurrencyPerformance(),
-      ])
+      // 資産内訳・騰落率・通貨別騰落率を1リクエストで取得
+      const dashboard = await portfolioApi.getDashboard()
 
-      setPortfolio(portfolioData)
-      setPerformance(performanceData)
-      setCurrencyPerformance(currencyData)
+      setPortfolio(dashboard.portfolio)
+      setPerformance(dashboard.performance)
+      setCurrencyPerformance(dashboard.currency_performance)
     } catch (err) {
       setError(err instanceof Error ? err.message : 'データの取得に失敗しました')
     } finally {
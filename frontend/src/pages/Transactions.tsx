@@ -15,8 +15,8 @@ const Transactions: React.FC = () => {
     try {
       setLoading(true)
       setError(null)
-      const data = await transactionsApi.getList(50)
-      setTransactions(data)
+      const page = await transactionsApi.getList(50)
+      setTransactions(page.items)
     } catch (err) {
       setError(err instanceof Error ? err.message : 'データの取得に失敗しました')
     } finally {
@@ -33,6 +33,13 @@ export interface CurrencyPerformance {
   change_1m?: number
 }
 
+export interface Dashboard {
+  portfolio: PortfolioCurrent
+  performance: Performance[]
+  currency_performance: CurrencyPerformance[]
+  updated_at: string
+}
+
 export interface Judgment {
   judgment_id: string
   timestamp: string
@@ -42,6 +49,10 @@ export interface Judgment {
   source_urls: string[]
   info_fetch_status: Record<string, boolean>
   failed_sources: string[]
+  info_fetch_latency_ms?: Record<string, number>
+  status?: 'evaluated' | 'skipped'
+  llm_cache_hits?: number
+  llm_cache_misses?: number
 }
 
 export interface Transaction {
@@ -56,7 +67,32 @@ export interface Transaction {
   post_allocation: Record<string, number>
 }
 
+export interface TransactionSummary {
+  symbol: string
+  from_time: string | null
+  to_time: string | null
+  count: number
+  buy_count: number
+  sell_count: number
+  buy_volume: number
+  sell_volume: number
+  vwap: number | null
+  buy_vwap: number | null
+  sell_vwap: number | null
+}
+
+// 一覧APIの1ページ（次のページはnext_cursorをcursorに指定して取得）
+export interface Page<T> {
+  items: T[]
+  next_cursor: string | null
+}
+
 export const portfolioApi = {
+  getDashboard: async (): Promise<Dashboard> => {
+    const response = await api.get<Dashboard>('/api/portfolio/dashboard')
+    return response.data
+  },
+
   getCurrent: async (): Promise<PortfolioCurrent> => {
     const response = await api.get<PortfolioCurrent>('/api/portfolio/current')
     return response.data
@@ -74,10 +110,10 @@ export const portfolioApi = {
 }
 
 export const judgmentsApi = {
-  getList: async (limit: number = 50, lastKey?: string): Promise<Judgment[]> => {
+  getList: async (limit: number = 50, cursor?: string): Promise<Page<Judgment>> => {
     const params: any = { limit }
-    if (lastKey) params.last_key = lastKey
-    const response = await api.get<Judgment[]>('/api/judgments', { params })
+    if (cursor) params.cursor = cursor
+    const response = await api.get<Page<Judgment>>('/api/judgments', { params })
     return response.data
   },
 
@@ -88,10 +124,29 @@ export const judgmentsApi = {
 }
 
 export const transactionsApi = {
-  getList: async (limit: number = 50, lastKey?: string): Promise<Transaction[]> => {
+  getList: async (limit: number = 50, cursor?: string): Promise<Page<Transaction>> => {
     const params: any = { limit }
-    if (lastKey) params.last_key = lastKey
-    const response = await api.get<Transaction[]>('/api/transactions', { params })
+    if (cursor) params.cursor = cursor
+    const response = await api.get<Page<Transaction>>('/api/transactions', { params })
+    return response.data
+  },
+
+  getBySymbol: async (
+    symbol: string, from?: string, to?: string, limit: number = 50, cursor?: string
+  ): Promise<Page<Transaction>> => {
+    const params: any = { symbol, limit }
+    if (from) params.from = from
+    if (to) params.to = to
+    if (cursor) params.cursor = cursor
+    const response = await api.get<Page<Transaction>>('/api/transactions', { params })
+    return response.data
+  },
+
+  getSummary: async (symbol: string, from?: string, to?: string): Promise<TransactionSummary> => {
+    const params: any = { symbol }
+    if (from) params.from = from
+    if (to) params.to = to
+    const response = await api.get<TransactionSummary>('/api/transactions/summary', { params })
     return response.data
   },
 
@@ -0,0 +1,101 @@
+"""record_typeバックフィルスクリプト
+
+record_type未付与の既存スナップショット・判断履歴・取引履歴に固定パーティションキーを付与し、
+*_by_record_type_timestamp GSI から最新取得・新しい順のページングができるようにする。
+あわせて、アクション対象（confidence_score >= MIN_CONFIDENCE_SCORE）の既存判断履歴に
+actionable を付与し、judgments_actionable_by_timestamp GSI に含める。
+"""
+import boto3
+import os
+from botocore.exceptions import ClientError
+
+AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-1")
+DYNAMODB_TABLE_PREFIX = os.getenv("DYNAMODB_TABLE_PREFIX", "rwa_trading_agent")
+MIN_CONFIDENCE_SCORE = 8  # lambda/config.py の MIN_CONFIDENCE_SCORE と同期すること
+
+dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
+
+# (テーブル名, IDの属性名, 付与するrecord_type)
+TARGETS = [
+    (f"{DYNAMODB_TABLE_PREFIX}_portfolio_snapshots", 'snapshot_id', 'portfolio_snapshot'),
+    (f"{DYNAMODB_TABLE_PREFIX}_judgments", 'judgment_id', 'judgment'),
+    (f"{DYNAMODB_TABLE_PREFIX}_transactions", 'transaction_id', 'transaction'),
+]
+
+
+def backfill_record_type(table_name: str, id_attr: str, record_type: str):
+    """record_type未付与のアイテムに固定パーティションキーを付与"""
+    table = dynamodb.Table(table_name)
+    scan_kwargs = {
+        'FilterExpression': 'attribute_not_exists(record_type)',
+        'ProjectionExpression': '#id, #ts',
+        'ExpressionAttributeNames': {'#id': id_attr, '#ts': 'timestamp'}
+    }
+    updated = 0
+    
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            try:
+                table.update_item(
+                    Key={id_attr: item[id_attr], 'timestamp': item['timestamp']},
+                    UpdateExpression='SET record_type = :record_type',
+                    ConditionExpression=f'attribute_exists({id_attr})',
+                    ExpressionAttributeValues={':record_type': record_type}
+                )
+                updated += 1
+            except ClientError as e:
+                print(f"Error updating {record_type} {item[id_attr]}: {str(e)}")
+        
+        lek = response.get('LastEvaluatedKey')
+        if not lek:
+            break
+        scan_kwargs['ExclusiveStartKey'] = lek
+    
+    return updated
+
+
+def backfill_actionable():
+    """アクション対象の判断履歴（LLMで判断し、スコアがしきい値以上）にスパースGSIのキーを付与"""
+    table = dynamodb.Table(f"{DYNAMODB_TABLE_PREFIX}_judgments")
+    scan_kwargs = {
+        'FilterExpression': (
+            'attribute_not_exists(actionable) AND confidence_score >= :min_score '
+            'AND (attribute_not_exists(#status) OR #status = :evaluated)'
+        ),
+        'ProjectionExpression': 'judgment_id, #ts',
+        'ExpressionAttributeNames': {'#ts': 'timestamp', '#status': 'status'},
+        'ExpressionAttributeValues': {':min_score': MIN_CONFIDENCE_SCORE, ':evaluated': 'evaluated'}
+    }
+    updated = 0
+    
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            try:
+                table.update_item(
+                    Key={'judgment_id': item['judgment_id'], 'timestamp': item['timestamp']},
+                    UpdateExpression='SET actionable = :actionable',
+                    ConditionExpression='attribute_exists(judgment_id)',
+                    ExpressionAttributeValues={':actionable': 'judgment'}
+                )
+                updated += 1
+            except ClientError as e:
+                print(f"Error updating judgment {item['judgment_id']}: {str(e)}")
+        
+        lek = response.get('LastEvaluatedKey')
+        if not lek:
+            break
+        scan_kwargs['ExclusiveStartKey'] = lek
+    
+    return updated
+
+
+if __name__ == '__main__':
+    for table_name, id_attr, record_type in TARGETS:
+        print(f"Backfilling record_type on {table_name}...")
+        count = backfill_record_type(table_name, id_attr, record_type)
+        print(f"Done! Updated {count} items")
+    print("Backfilling actionable on judgments...")
+    count = backfill_actionable()
+    print(f"Done! Updated {count} judgments")
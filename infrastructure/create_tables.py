@@ -17,6 +17,8 @@ tables = [
         ],
         'AttributeDefinitions': [
             {'AttributeName': 'judgment_id', 'AttributeType': 'S'},
+            {'AttributeName': 'record_type', 'AttributeType': 'S'},
+            {'AttributeName': 'actionable', 'AttributeType': 'S'},
             {'AttributeName': 'timestamp', 'AttributeType': 'S'}
         ],
         'BillingMode': 'PAY_PER_REQUEST',
@@ -28,6 +30,24 @@ tables = [
                     {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
                 ],
                 'Projection': {'ProjectionType': 'ALL'}
+            },
+            {
+                # 最新取得用: record_type固定 + timestamp降順でQueryできるGSI
+                'IndexName': 'judgments_by_record_type_timestamp',
+                'KeySchema': [
+                    {'AttributeName': 'record_type', 'KeyType': 'HASH'},
+                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            },
+            {
+                # アクション対象（confidence_score >= MIN_CONFIDENCE_SCORE）の判断のみを含むスパースGSI
+                'IndexName': 'judgments_actionable_by_timestamp',
+                'KeySchema': [
+                    {'AttributeName': 'actionable', 'KeyType': 'HASH'},
+                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
             }
         ]
     },
@@ -39,6 +59,7 @@ tables = [
         ],
         'AttributeDefinitions': [
             {'AttributeName': 'transaction_id', 'AttributeType': 'S'},
+            {'AttributeName': 'record_type', 'AttributeType': 'S'},
             {'AttributeName': 'timestamp', 'AttributeType': 'S'},
             {'AttributeName': 'symbol', 'AttributeType': 'S'}
         ],
@@ -51,6 +72,15 @@ tables = [
                     {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
                 ],
                 'Projection': {'ProjectionType': 'ALL'}
+            },
+            {
+                # 一覧取得用: record_type固定 + timestamp降順でQueryできるGSI
+                'IndexName': 'transactions_by_record_type_timestamp',
+                'KeySchema': [
+                    {'AttributeName': 'record_type', 'KeyType': 'HASH'},
+                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
             }
         ]
     },
@@ -62,6 +92,7 @@ tables = [
         ],
         'AttributeDefinitions': [
             {'AttributeName': 'snapshot_id', 'AttributeType': 'S'},
+            {'AttributeName': 'record_type', 'AttributeType': 'S'},
             {'AttributeName': 'timestamp', 'AttributeType': 'S'}
         ],
         'BillingMode': 'PAY_PER_REQUEST',
@@ -73,6 +104,15 @@ tables = [
                     {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
                 ],
                 'Projection': {'ProjectionType': 'ALL'}
+            },
+            {
+                # 最新取得用: record_type固定 + timestamp降順でQueryできるGSI
+                'IndexName': 'portfolio_snapshots_by_record_type_timestamp',
+                'KeySchema': [
+                    {'AttributeName': 'record_type', 'KeyType': 'HASH'},
+                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
             }
         ]
     },
@@ -88,6 +128,60 @@ tables = [
         ],
         'BillingMode': 'PAY_PER_REQUEST'
     },
+    {
+        # 価格履歴のOHLCV集計（series_key = "<symbol>#<1h|1d>"）
+        'TableName': f"{DYNAMODB_TABLE_PREFIX}_price_rollups",
+        'KeySchema': [
+            {'AttributeName': 'series_key', 'KeyType': 'HASH'},
+            {'AttributeName': 'bucket_start', 'KeyType': 'RANGE'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'series_key', 'AttributeType': 'S'},
+            {'AttributeName': 'bucket_start', 'AttributeType': 'S'}
+        ],
+        'BillingMode': 'PAY_PER_REQUEST'
+    },
+    {
+        # 既出ニュースインデックス（item_hash = ニュースのハッシュ、または "cursor#<source>"）
+        'TableName': f"{DYNAMODB_TABLE_PREFIX}_seen_news",
+        'KeySchema': [
+            {'AttributeName': 'item_hash', 'KeyType': 'HASH'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'item_hash', 'AttributeType': 'S'}
+        ],
+        'BillingMode': 'PAY_PER_REQUEST',
+        'TimeToLiveSpecification': {
+            'Enabled': True,
+            'AttributeName': 'expires_at'
+        }
+    },
+    {
+        # LLM応答キャッシュ（cache_key = モデル名・システム指示・正規化プロンプト・生成設定のハッシュ）
+        'TableName': f"{DYNAMODB_TABLE_PREFIX}_llm_cache",
+        'KeySchema': [
+            {'AttributeName': 'cache_key', 'KeyType': 'HASH'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'cache_key', 'AttributeType': 'S'}
+        ],
+        'BillingMode': 'PAY_PER_REQUEST',
+        'TimeToLiveSpecification': {
+            'Enabled': True,
+            'AttributeName': 'expires_at'
+        }
+    },
+    {
+        # ダッシュボード（実行サイクルごとに更新する表示用ドキュメント。dashboard_id = "main" の1件）
+        'TableName': f"{DYNAMODB_TABLE_PREFIX}_dashboard",
+        'KeySchema': [
+            {'AttributeName': 'dashboard_id', 'KeyType': 'HASH'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'dashboard_id', 'AttributeType': 'S'}
+        ],
+        'BillingMode': 'PAY_PER_REQUEST'
+    },
     {
         'TableName': f"{DYNAMODB_TABLE_PREFIX}_execution_locks",
         'KeySchema': [
@@ -107,6 +201,9 @@ tables = [
 def create_table(table_def):
     """テーブルを作成"""
     table_name = table_def['TableName']
+    # TTLはcreate_tableでは指定できないため、作成後にupdate_time_to_liveで有効化する
+    table_def = dict(table_def)
+    ttl_spec = table_def.pop('TimeToLiveSpecification', None)
     
     try:
         # 既存のテーブルをチェック
@@ -121,6 +218,11 @@ def create_table(table_def):
                 print(f"Creating table {table_name}...")
                 waiter = dynamodb.get_waiter('table_exists')
                 waiter.wait(TableName=table_name)
+                if ttl_spec:
+                    dynamodb.update_time_to_live(
+                        TableName=table_name,
+                        TimeToLiveSpecification=ttl_spec
+                    )
                 print(f"Table {table_name} created successfully")
                 return True
             except Exception as create_error:
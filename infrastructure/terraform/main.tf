@@ -59,17 +59,25 @@ resource "aws_iam_role_policy" "trading_agent_lambda_dynamodb" {
         Effect = "Allow"
         Action = [
           "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
+          "dynamodb:ConditionCheckItem", # TransactWriteItemsでの実行ロックの確認（fencing）
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
         Resource = [
           aws_dynamodb_table.judgments.arn,
+          "${aws_dynamodb_table.judgments.arn}/index/*",
           aws_dynamodb_table.transactions.arn,
           aws_dynamodb_table.portfolio_snapshots.arn,
           aws_dynamodb_table.price_history.arn,
+          aws_dynamodb_table.price_rollups.arn,
+          aws_dynamodb_table.seen_news.arn,
+          aws_dynamodb_table.llm_cache.arn,
+          aws_dynamodb_table.dashboard.arn,
           aws_dynamodb_table.execution_locks.arn
         ]
       }
@@ -111,14 +119,20 @@ resource "aws_iam_role_policy" "api_lambda_dynamodb" {
         Effect = "Allow"
         Action = [
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
         Resource = [
           aws_dynamodb_table.judgments.arn,
+          "${aws_dynamodb_table.judgments.arn}/index/*",
           aws_dynamodb_table.transactions.arn,
+          "${aws_dynamodb_table.transactions.arn}/index/*",
           aws_dynamodb_table.portfolio_snapshots.arn,
-          aws_dynamodb_table.price_history.arn
+          "${aws_dynamodb_table.portfolio_snapshots.arn}/index/*",
+          aws_dynamodb_table.price_history.arn,
+          aws_dynamodb_table.price_rollups.arn,
+          aws_dynamodb_table.dashboard.arn
         ]
       }
     ]
@@ -137,6 +151,11 @@ resource "aws_dynamodb_table" "judgments" {
     type = "S"
   }
 
+  attribute {
+    name = "actionable"
+    type = "S"
+  }
+
   attribute {
     name = "record_type"
     type = "S"
@@ -162,6 +181,14 @@ resource "aws_dynamodb_table" "judgments" {
     projection_type = "ALL"
   }
 
+  # アクション対象（confidence_score >= MIN_CONFIDENCE_SCORE）の判断のみを含むスパースGSI
+  global_secondary_index {
+    name            = "judgments_actionable_by_timestamp"
+    hash_key        = "actionable"
+    range_key       = "timestamp"
+    projection_type = "ALL"
+  }
+
   tags = {
     Name = "${var.table_prefix}-judgments"
   }
@@ -188,6 +215,11 @@ resource "aws_dynamodb_table" "transactions" {
     type = "S"
   }
 
+  attribute {
+    name = "record_type"
+    type = "S"
+  }
+
   global_secondary_index {
     name            = "transactions_by_symbol"
     hash_key        = "symbol"
@@ -195,6 +227,14 @@ resource "aws_dynamodb_table" "transactions" {
     projection_type = "ALL"
   }
 
+  # 一覧取得用: record_type固定 + timestamp降順でQueryできるGSI
+  global_secondary_index {
+    name            = "transactions_by_record_type_timestamp"
+    hash_key        = "record_type"
+    range_key       = "timestamp"
+    projection_type = "ALL"
+  }
+
   tags = {
     Name = "${var.table_prefix}-transactions"
   }
@@ -211,6 +251,11 @@ resource "aws_dynamodb_table" "portfolio_snapshots" {
     type = "S"
   }
 
+  attribute {
+    name = "record_type"
+    type = "S"
+  }
+
   attribute {
     name = "timestamp"
     type = "S"
@@ -223,6 +268,14 @@ resource "aws_dynamodb_table" "portfolio_snapshots" {
     projection_type = "ALL"
   }
 
+  # 最新取得用: record_type固定 + timestamp降順でQueryできるGSI
+  global_secondary_index {
+    name            = "portfolio_snapshots_by_record_type_timestamp"
+    hash_key        = "record_type"
+    range_key       = "timestamp"
+    projection_type = "ALL"
+  }
+
   tags = {
     Name = "${var.table_prefix}-portfolio-snapshots"
   }
@@ -249,6 +302,86 @@ resource "aws_dynamodb_table" "price_history" {
   }
 }
 
+# 価格履歴のOHLCV集計（series_key = "<symbol>#<1h|1d>"）
+resource "aws_dynamodb_table" "price_rollups" {
+  name         = "${var.table_prefix}_price_rollups"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "series_key"
+  range_key    = "bucket_start"
+
+  attribute {
+    name = "series_key"
+    type = "S"
+  }
+
+  attribute {
+    name = "bucket_start"
+    type = "S"
+  }
+
+  tags = {
+    Name = "${var.table_prefix}-price-rollups"
+  }
+}
+
+# 既出ニュースインデックス（item_hash = ニュースのハッシュ、または "cursor#<source>"）
+resource "aws_dynamodb_table" "seen_news" {
+  name         = "${var.table_prefix}_seen_news"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "item_hash"
+
+  attribute {
+    name = "item_hash"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Name = "${var.table_prefix}-seen-news"
+  }
+}
+
+# LLM応答キャッシュ（cache_key = モデル名・システム指示・正規化プロンプト・生成設定のハッシュ）
+resource "aws_dynamodb_table" "llm_cache" {
+  name         = "${var.table_prefix}_llm_cache"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "cache_key"
+
+  attribute {
+    name = "cache_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Name = "${var.table_prefix}-llm-cache"
+  }
+}
+
+# ダッシュボード（実行サイクルごとに更新する表示用ドキュメント。dashboard_id = "main" の1件）
+resource "aws_dynamodb_table" "dashboard" {
+  name         = "${var.table_prefix}_dashboard"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "dashboard_id"
+
+  attribute {
+    name = "dashboard_id"
+    type = "S"
+  }
+
+  tags = {
+    Name = "${var.table_prefix}-dashboard"
+  }
+}
+
 resource "aws_dynamodb_table" "execution_locks" {
   name         = "${var.table_prefix}_execution_locks"
   billing_mode = "PAY_PER_REQUEST"
@@ -364,11 +497,15 @@ resource "aws_lambda_layer_version" "dependencies" {
 
 # Lambda関数（メイン実行用）- 依存関係を含むZIPを作成
 resource "null_resource" "trading_agent_lambda_package" {
+  # マーケット情報スナップショットはLayerと同じバージョンのccxtで作成する
+  depends_on = [null_resource.lambda_layer_package]
+
   triggers = {
     source_hash = sha256(join("", [
       for f in fileset("${path.module}/../../lambda", "**/*.py") : filesha256("${path.module}/../../lambda/${f}")
     ]))
     requirements_hash = filesha256("${path.module}/../../lambda/requirements.txt")
+    layer_requirements_hash = filesha256("${path.module}/../../lambda-layer/requirements.txt")
     python_version = "3.13"
     runtime_version = "python3.13"
   }
@@ -388,6 +525,14 @@ resource "null_resource" "trading_agent_lambda_package" {
         --implementation cp \
         --quiet \
         --disable-pip-version-check
+      # コールドスタート時にload_marketsの全件ダウンロードを避けるため、マーケット情報スナップショットを同梱する
+      # （キャッシュの版数にccxtのバージョンを含むため、Layerのccxtと同じバージョンをビルド環境用に入れて作成する）
+      CCXT_VERSION=$(sed -n "s/^__version__ = '\(.*\)'/\1/p" ../lambda-layer/python/ccxt/__init__.py)
+      SNAPSHOT_DEPS=$(mktemp -d)
+      python3 -m pip install "ccxt==$CCXT_VERSION" -t "$SNAPSHOT_DEPS" --quiet --disable-pip-version-check \
+        && PYTHONPATH="$SNAPSHOT_DEPS" python3 -m utils.market_cache \
+        || echo "WARNING: failed to build the market snapshot; cold starts will call load_markets"
+      rm -rf "$SNAPSHOT_DEPS"
     EOT
   }
 }
@@ -397,7 +542,7 @@ data "archive_file" "trading_agent_lambda" {
   type       = "zip"
   source_dir = "${path.module}/../../lambda"
   output_path = "${path.module}/lambda.zip"
-  excludes    = ["__pycache__", "*.pyc", ".env", "*.zip", "package", "*.log"]
+  excludes    = ["__pycache__", "*.pyc", ".env", "*.zip", "package", "*.log", "benchmarks"]
 }
 
 resource "aws_lambda_function" "trading_agent" {
@@ -464,7 +609,7 @@ data "archive_file" "api_lambda" {
   type       = "zip"
   source_dir = "${path.module}/../../backend"
   output_path = "${path.module}/api.zip"
-  excludes    = ["__pycache__", "*.pyc", ".env", "*.zip", "package", "*.log"]
+  excludes    = ["__pycache__", "*.pyc", ".env", "*.zip", "package", "*.log", "benchmarks"]
 }
 
 resource "aws_lambda_function" "api" {
@@ -27,6 +27,17 @@ TRANSACTIONS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_transactions"
 PORTFOLIO_SNAPSHOTS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_portfolio_snapshots"
 PRICE_HISTORY_TABLE = f"{DYNAMODB_TABLE_PREFIX}_price_history"
 EXECUTION_LOCKS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_execution_locks"
+PRICE_ROLLUPS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_price_rollups"
+SEEN_NEWS_TABLE = f"{DYNAMODB_TABLE_PREFIX}_seen_news"
+LLM_CACHE_TABLE = f"{DYNAMODB_TABLE_PREFIX}_llm_cache"
+DASHBOARD_TABLE = f"{DYNAMODB_TABLE_PREFIX}_dashboard"
+
+# DynamoDB 一括書き込み設定
+BATCH_WRITE_MAX_ITEMS = 25  # BatchWriteItemの1リクエストあたり上限
+BATCH_WRITE_MAX_RETRIES = 5  # UnprocessedItemsの再送回数
+BATCH_WRITE_BACKOFF_SECONDS = 0.05  # 再送時のバックオフ初期値（指数的に増加）
+BATCH_GET_MAX_KEYS = 100  # BatchGetItemの1リクエストあたり上限
+TRANSACT_WRITE_MAX_ITEMS = 100  # TransactWriteItemsの1リクエストあたり上限
 
 # リスク管理設定
 MAX_SPREAD_PERCENT = 0.5  # スプレッドが0.5%以上の場合はエントリーをスキップ
@@ -34,6 +45,56 @@ FEE_PERCENT = 0.2  # 手数料0.2%
 BALANCE_USAGE_RATIO = 0.998  # 残高の99.8%で計算
 MAX_PRICE_DEVIATION_PERCENT = 5.0  # 価格乖離5%以上でエントリー制限
 MIN_CONFIDENCE_SCORE = 8  # Confidence Score 8以上でアクション検討
+ORDER_BOOK_CACHE_TTL_SECONDS = 10  # サイクル内でのオーダーブックキャッシュ有効期間
+
+# 実行サイクル設定
+PIPELINE_MAX_WORKERS = 8  # ステージ並列実行のスレッド数の上限（依存関係のないステージ数に合わせ、これを超えない）
+CLIENT_MAX_AGE_SECONDS = 3600  # ウォームスタート時に再利用するクライアントの最大寿命
+
+# 実行ロック（リース）設定
+LOCK_LEASE_SECONDS = 90  # リース期間（異常終了した実行のロックはこの時間で引き継げる）
+LOCK_RENEW_INTERVAL_SECONDS = 30  # 実行中にリースを延長する間隔
+LOCK_ACQUIRE_WAIT_SECONDS = 10.0  # ロック保持中の場合に待つ最大時間（超えたらスキップ）
+LOCK_ACQUIRE_POLL_SECONDS = 1.0  # ロック取得の再試行間隔
+
+# ダッシュボード（実行サイクルごとに更新する表示用ドキュメント）
+DASHBOARD_PERIOD_DAYS = [1, 2, 7, 14, 30]  # 資産全体の騰落率の期間
+DASHBOARD_CURRENCY_PERIOD_DAYS = [1, 7, 30]  # 通貨別騰落率の期間（日足終値と比較）
+DASHBOARD_HISTORY_DAYS = 31  # 保持する資産総額（時間単位）・日足終値の履歴の日数
+
+# 変化判定（価格・ニュースに変化がなければLLMを呼ばない）
+CHANGE_GATE_ENABLED = os.getenv("CHANGE_GATE_ENABLED", "true").lower() == "true"
+CHANGE_GATE_MAX_STALENESS_SECONDS = 60 * 60  # 直近のLLM判断からこれ以上経過したら変化がなくても呼ぶ
+CHANGE_GATE_PRICE_MOVE_PERCENT = 0.5  # 価格変動のしきい値（既定値、%）
+CHANGE_GATE_PRICE_MOVE_PERCENT_BY_SYMBOL = {  # 価格変動のしきい値（シンボル別、%）
+    "PAXG/USDT": 0.3,
+    "ONDO/USDT": 1.0,
+    "TSLAX/USDT": 1.0,
+    "NVDAX/USDT": 1.0,
+    "MSTRX/USDT": 1.5,
+}
+
+# Gate.io API設定
+TICKER_FETCH_MAX_WORKERS = 4  # 一括取得失敗時の個別ティッカー取得の最大並列数
+ORDER_BOOK_FETCH_MAX_WORKERS = 4  # オーダーブック並列取得の最大並列数
+MARKET_CACHE_PATH = os.getenv("MARKET_CACHE_PATH", "/tmp/gateio_markets.json")  # マーケット情報キャッシュ
+MARKET_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gateio_markets.json")  # 同梱スナップショット
+MARKET_CACHE_TTL_SECONDS = 24 * 60 * 60  # 期限切れ後はバックグラウンドで再取得
+
+# Gemini API設定
+GEMINI_MODEL = "gemini-3-flash-preview"
+GEMINI_SINGLE_CALL_ENABLED = os.getenv("GEMINI_SINGLE_CALL_ENABLED", "true").lower() == "true"  # 分析と最適化を1回の構造化出力呼び出しで行う（falseで従来の2回呼び出し）
+GEMINI_STREAMING_ENABLED = os.getenv("GEMINI_STREAMING_ENABLED", "true").lower() == "true"  # 市場分析をストリーミングで受信し、スコア確定時点で判断する
+GEMINI_STREAM_EARLY_EXIT_CHARS = 400  # スコアが閾値未満の場合に受信する判断根拠の文字数（以降は打ち切る）
+GEMINI_STREAM_DRAIN_WAIT_SECONDS = 2.0  # 実行サイクルの終了時に、早期終了したストリームの残りの受信を待つ上限（超えた分の応答キャッシュへの保存は保証しない）
+GEMINI_CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "false").lower() == "true"  # 静的システム指示のコンテキストキャッシュ（現在の指示は最小トークン数未満のため既定で無効）
+GEMINI_CONTEXT_CACHE_MIN_TOKENS = 1024  # コンテキストキャッシュを作成できる最小トークン数（これ未満の指示は作成を試みない）
+GEMINI_CONTEXT_CACHE_TTL_SECONDS = 60 * 60  # コンテキストキャッシュの有効期間
+GEMINI_CONTEXT_CACHE_REFRESH_MARGIN_SECONDS = 5 * 60  # 残り期間がこれを下回ったら延長
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"  # 同一プロンプトの応答を再利用する
+LLM_CACHE_REPLAY_ONLY = os.getenv("LLM_CACHE_REPLAY_ONLY", "false").lower() == "true"  # キャッシュにない呼び出しはエラー（テストでの再生用）
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60  # 応答キャッシュの有効期間
+LLM_CACHE_MEMORY_MAX_ENTRIES = 256  # メモリ上に保持する応答キャッシュの上限
 
 # ニュースソース
 NEWS_SOURCES = {
@@ -44,4 +105,16 @@ NEWS_SOURCES = {
     "forexfactory": "https://www.forexfactory.com/calendar",
     "liveuamap": "https://liveuamap.com/",
 }
+NEWS_FETCH_BUDGET_SECONDS = 8.0  # ニュース収集全体の上限（全ソースを並列に取得）
+NEWS_SOURCE_DEADLINE_SECONDS = 5.0  # ソースごとの期限（既定値）
+NEWS_SOURCE_DEADLINES = {  # ソースごとの期限（個別指定）
+    "cryptopanic": 6.0,
+    "forexfactory": 6.0,
+}
+NEWS_MAX_ITEMS_PER_SOURCE = 10  # ソースごとの最大取得件数
+NEWS_USER_AGENT = "Mozilla/5.0 (compatible; rwa-trading-agent/1.0)"
+NEWS_CRYPTOPANIC_MAX_PAGES = 3  # カーソル以降の投稿を取得する際の最大ページ数
+NEWS_SEEN_TTL_DAYS = 7  # 既出ニュースインデックスの保持期間
+NEWS_SEEN_MEMORY_MAX_ITEMS = 5000  # メモリ上に保持する既出ハッシュの上限
+NEWS_SEEN_DIGEST_ITEMS = 5  # プロンプトに含める既出ニュースの件数
 
@@ -8,14 +8,17 @@ from typing import Dict
 # 注意: Lambda環境では dotenv を使用しない（環境変数が直接設定されている）
 # ローカル開発時は、環境変数を直接設定するか、.envファイルを手動で読み込む
 
-from config import MIN_CONFIDENCE_SCORE, TRADING_SYMBOLS
+from config import (
+    MIN_CONFIDENCE_SCORE, TRADING_SYMBOLS, PIPELINE_MAX_WORKERS, GEMINI_SINGLE_CALL_ENABLED
+)
 from utils.logger import logger
-from utils.lock import acquire_lock, release_lock
+from utils.lock import acquire_lock, release_lock, LeaseRenewer
 from utils.news_collector import collect_news
-from utils.gateio_client import GateIOClient
-from utils.gemini_client import GeminiClient
-from utils.dynamodb_client import DynamoDBClient
-from utils.risk_manager import RiskManager
+from utils import clients
+from utils.pipeline import Pipeline
+from utils.gemini_client import GeminiClient, MarketDecision
+from utils.change_gate import evaluate_change_gate
+from utils.dashboard import load_dashboard, update_dashboard
 
 
 def calculate_current_allocations(balance: Dict[str, float], 
@@ -46,6 +49,51 @@ def calculate_current_allocations(balance: Dict[str, float],
     return allocations
 
 
+def build_price_data(tickers: Dict[str, Dict]) -> Dict[str, Dict]:
+    """市場分析に渡す価格データを作成"""
+    return {
+        symbol: {
+            'price': ticker['price'],
+            'change_24h': ticker['change_24h']
+        }
+        for symbol, ticker in tickers.items()
+    }
+
+
+def prefetch_order_books_on_high_score(confidence_score: int):
+    """Confidence Scoreが閾値以上であれば、リスク管理チェック用のオーダーブック取得を先行して開始"""
+    if confidence_score >= MIN_CONFIDENCE_SCORE:
+        logger.info(f"Confidence Score {confidence_score} received, prefetching order books")
+        clients.risk_manager().prefetch_order_books_in_background(TRADING_SYMBOLS)
+
+
+def analyze_market(gemini: GeminiClient, news_data: Dict, balance: Dict[str, float],
+                   tickers: Dict[str, Dict]) -> MarketDecision:
+    """
+    市場分析を実行
+    
+    GEMINI_SINGLE_CALL_ENABLEDの場合は目標資産配分まで1回の呼び出しで求める。
+    無効の場合は従来どおり分析のみ行い、目標資産配分はステップ4で別途求める。
+    応答はストリーミングで受信し、スコアが確定した時点でオーダーブックの先行取得を開始する
+    （スコアが閾値未満であれば判断根拠の途中で打ち切る）。
+    """
+    price_data = build_price_data(tickers)
+    if GEMINI_SINGLE_CALL_ENABLED:
+        return gemini.decide(
+            news_data['news_text'],
+            price_data,
+            calculate_current_allocations(balance, tickers),
+            on_score=prefetch_order_books_on_high_score
+        )
+    
+    confidence_score, reasoning = gemini.analyze_market(
+        news_data['news_text'],
+        price_data,
+        on_score=prefetch_order_books_on_high_score
+    )
+    return MarketDecision(confidence_score, reasoning)
+
+
 def calculate_trade_orders(current_allocations: Dict[str, float],
                           target_allocations: Dict[str, float],
                           total_value: float,
@@ -93,38 +141,63 @@ def lambda_handler(event, context):
     メイン実行サイクル
     EventBridgeから5分間隔で呼び出される
     """
-    # ロック取得
-    if not acquire_lock():
+    # ロック（リース）取得。保持中なら少し待ち、期限切れのリースは引き継ぐ
+    lease = acquire_lock(owner=getattr(context, 'aws_request_id', None))
+    if lease is None:
         logger.info("Another execution is in progress, skipping")
         return {
             'statusCode': 200,
             'body': json.dumps('Skipped: Another execution in progress')
         }
+    # 長いサイクルでもリースが切れないよう、実行中はバックグラウンドで延長する
+    renewer = LeaseRenewer(lease).start()
     
     try:
-        # クライアント初期化
-        gateio_client = GateIOClient()
-        gemini_client = GeminiClient()
-        dynamodb_client = DynamoDBClient()
-        risk_manager = RiskManager(gateio_client)
-        
-        # 1. 情報収集
-        logger.info("Step 1: Collecting news")
-        news_data = collect_news()
+        # クライアントはウォームスタート時は前回のものを再利用し、
+        # Gate.io / Gemini は各ステージで必要になった時点で生成する（ccxt / google.generativeai の読み込みをI/Oと重ねる）
+        dynamodb_client = clients.dynamodb_client()
         
-        # 2. 現在の残高と価格を取得
-        logger.info("Step 2: Fetching balance and prices")
-        balance = gateio_client.get_balance()
-        tickers = gateio_client.get_all_tickers()
+        # 1〜3. 情報収集・残高/価格取得・市場分析
+        # 互いに依存しないステージ（ニュース・残高・価格・Geminiクライアント生成・直近の判断・ダッシュボード）は
+        # すべて同時に開始し、変化判定・市場分析は必要な取得の完了後に開始する
+        logger.info("Steps 1-3: Collecting news, fetching balance/prices and analyzing market")
+        pipeline = Pipeline("cycle", max_workers=PIPELINE_MAX_WORKERS)
+        # ニュースは既出インデックスで新着/既出を判定し、プロンプトには新着分と既出の要約のみを含める
+        # （判定したインデックスと同じインスタンスで保存時にcommit()する）
+        seen_index = clients.seen_news_index()
+        pipeline.add_stage("news", lambda: collect_news(seen_index=seen_index))
+        pipeline.add_stage("balance", lambda: clients.gateio_client().get_balance())
+        pipeline.add_stage("tickers", lambda: clients.gateio_client().get_all_tickers())
+        # Geminiクライアントの生成（初回はgoogle.generativeaiの読み込み）をニュース・価格取得と並行して行う
+        pipeline.add_stage("gemini", clients.gemini_client)
+        # 変化判定: 直近の判断の入力と比べて価格・ニュースに変化がなければLLMを呼ばない
+        pipeline.add_stage("last_judgment", dynamodb_client.get_latest_judgment)
+        # ダッシュボードは前回のドキュメントに今回の結果を差分反映する
+        pipeline.add_stage("dashboard", lambda: load_dashboard(dynamodb_client))
+        pipeline.add_stage(
+            "gate",
+            lambda last_judgment, news, tickers: evaluate_change_gate(
+                last_judgment, tickers, news['news_items']
+            ),
+            depends_on=["last_judgment", "news", "tickers"]
+        )
+        pipeline.add_stage(
+            "analysis",
+            lambda news, balance, tickers, gemini, gate: (
+                MarketDecision(0, gate.reason) if gate.skip
+                else analyze_market(gemini, news, balance, tickers)
+            ),
+            depends_on=["news", "balance", "tickers", "gemini", "gate"]
+        )
+        stage_results = pipeline.run()
         
-        # 価格履歴を保存
-        for symbol, ticker_data in tickers.items():
-            dynamodb_client.save_price_history(
-                symbol,
-                ticker_data['price'],
-                ticker_data['change_24h'],
-                ticker_data['volume']
-            )
+        news_data = stage_results["news"]
+        balance = stage_results["balance"]
+        tickers = stage_results["tickers"]
+        gate = stage_results["gate"]
+        decision = stage_results["analysis"]
+        logger.info(f"Change gate: {gate.reason}")
+        confidence_score, reasoning = decision.confidence_score, decision.reasoning
         
         # 現在の資産配分を計算
         current_allocations = calculate_current_allocations(balance, tickers)
@@ -133,30 +206,18 @@ def lambda_handler(event, context):
             for symbol in TRADING_SYMBOLS
         ]) + balance.get('USDT', 0)
         
-        # 3. 市場分析
-        logger.info("Step 3: Analyzing market")
-        price_data = {
-            symbol: {
-                'price': ticker['price'],
-                'change_24h': ticker['change_24h']
-            }
-            for symbol, ticker in tickers.items()
-        }
-        
-        confidence_score, reasoning = gemini_client.analyze_market(
-            news_data['news_text'],
-            price_data
-        )
-        
         logger.info(f"Confidence Score: {confidence_score}")
         
         # 4. ポートフォリオ最適化（Confidence Score 8以上の場合のみ）
         if confidence_score >= MIN_CONFIDENCE_SCORE:
             logger.info("Step 4: Optimizing portfolio")
-            target_allocations = gemini_client.optimize_portfolio(
-                reasoning,
-                current_allocations
-            )
+            # 1回呼び出しで目標資産配分が得られていればそれを使い、なければ最適化を呼び出す
+            target_allocations = decision.target_allocations
+            if target_allocations is None:
+                target_allocations = clients.gemini_client().optimize_portfolio(
+                    reasoning,
+                    current_allocations
+                )
             
             # 5. 売買命令を計算
             orders = calculate_trade_orders(
@@ -169,17 +230,12 @@ def lambda_handler(event, context):
             # 6. リスク管理チェックと実行
             # [TEST MODE] 取引実行はコメントアウト（テスト中は損失を防ぐため）
             executed_orders = []
-            for order in orders:
-                is_valid, message = risk_manager.validate_trade(
-                    order['symbol'],
-                    order['side'],
-                    order['amount']
-                )
-                
+            for order, is_valid, message in clients.risk_manager().validate_orders(orders, tickers):
                 if is_valid:
                     logger.info(f"[TEST MODE] Would execute {order['side']} order for {order['symbol']}: {order['amount']} (TRADE EXECUTION DISABLED)")
                     # [TEST MODE] 取引実行をコメントアウト
-                    # result = gateio_client.create_market_order(
+                    # renewer.ensure_held()  # リースを失っていれば発注しない
+                    # result = clients.gateio_client().create_market_order(
                     #     order['symbol'],
                     #     order['side'],
                     #     order['amount']
@@ -194,7 +250,8 @@ def lambda_handler(event, context):
                     #         result.get('price', 0),
                     #         result.get('status', 'unknown'),
                     #         current_allocations,
-                    #         target_allocations
+                    #         target_allocations,
+                    #         fencing_token=lease.fencing_token
                     #     )
                     #     executed_orders.append(result)
                     
@@ -209,30 +266,11 @@ def lambda_handler(event, context):
                     executed_orders.append(result)
                 else:
                     logger.warning(f"Trade validation failed for {order['symbol']}: {message}")
-            
-            # 7. 判断履歴を保存
-            dynamodb_client.save_judgment(
-                confidence_score,
-                reasoning,
-                target_allocations,
-                news_data['source_urls'],
-                news_data['fetch_status'],
-                news_data['failed_sources']
-            )
         else:
             logger.info(f"Confidence Score ({confidence_score}) below threshold ({MIN_CONFIDENCE_SCORE}), skipping action")
             # 判断履歴のみ保存（アクションなし）
             target_allocations = current_allocations
-            dynamodb_client.save_judgment(
-                confidence_score,
-                reasoning,
-                target_allocations,
-                news_data['source_urls'],
-                news_data['fetch_status'],
-                news_data['failed_sources']
-            )
         
-        # 8. ポートフォリオスナップショットを保存
         holdings = {symbol: balance.get(symbol, 0) for symbol in TRADING_SYMBOLS + ['USDT']}
         values_usdt = {}
         for symbol in TRADING_SYMBOLS:
@@ -242,12 +280,55 @@ def lambda_handler(event, context):
             values_usdt['USDT'] = balance['USDT']
         
         final_allocations = calculate_current_allocations(balance, tickers)
-        dynamodb_client.save_portfolio_snapshot(
-            holdings,
-            values_usdt,
-            total_value,
-            final_allocations
-        )
+        
+        # Gemini呼び出しごとのキャッシュ済み/未キャッシュトークン数・レイテンシ・応答キャッシュのhit/miss
+        llm_usage = stage_results["gemini"].pop_usage()
+        
+        # 7. 判断履歴・価格履歴（OHLCV集計含む）・ポートフォリオスナップショットをまとめて保存
+        # （BatchWriteItemで一括フラッシュし、シンボル数が増えても往復回数を抑える）
+        # フラッシュ直前にリースを確認し、他の実行に引き継がれていれば書き込まない
+        # （fencing_token付きの判断履歴・スナップショット・ダッシュボードは、書き込みの時点でも実行ロックを確認する）
+        with dynamodb_client.write_group(guard=renewer.ensure_held, lease=lease):
+            dynamodb_client.save_price_history_batch(tickers)
+            rollups = dynamodb_client.save_price_rollups(tickers)
+            dynamodb_client.save_judgment(
+                confidence_score,
+                reasoning,
+                target_allocations,
+                news_data['source_urls'],
+                news_data['fetch_status'],
+                news_data['failed_sources'],
+                status='skipped' if gate.skip else 'evaluated',
+                inputs=gate.inputs,
+                llm_usage=llm_usage,
+                fencing_token=lease.fencing_token
+            )
+            # 8. ポートフォリオスナップショットを保存
+            dynamodb_client.save_portfolio_snapshot(
+                holdings,
+                values_usdt,
+                total_value,
+                final_allocations,
+                fencing_token=lease.fencing_token
+            )
+            # ダッシュボード（現在の資産・騰落率・通貨別騰落率）を更新し、APIはGetItem 1回で返す
+            dynamodb_client.save_dashboard(
+                update_dashboard(
+                    stage_results["dashboard"],
+                    holdings,
+                    values_usdt,
+                    total_value,
+                    final_allocations,
+                    {rollup['symbol']: rollup for rollup in rollups if rollup['interval'] == '1d'}
+                ),
+                fencing_token=lease.fencing_token
+            )
+            # 今回の新着ニュースを既出インデックスに記録
+            seen_index.commit()
+        
+        # 早期終了したGemini応答の残りの受信（応答キャッシュへの保存）を短時間だけ待つ
+        # （生成全体の完了までは待たず、実行時間とロックの保持時間を延ばさない）
+        stage_results["gemini"].wait_for_drains()
         
         logger.info("Execution completed successfully")
         
@@ -256,15 +337,22 @@ def lambda_handler(event, context):
             'body': json.dumps({
                 'message': 'Execution completed successfully',
                 'confidence_score': confidence_score,
-                'orders_executed': len(executed_orders) if confidence_score >= MIN_CONFIDENCE_SCORE else 0
+                'llm_skipped': gate.skip,
+                'orders_executed': len(executed_orders) if confidence_score >= MIN_CONFIDENCE_SCORE else 0,
+                'stage_timings': pipeline.timings,
+                'llm_usage': llm_usage,
+                'lock': lease.metrics()
             })
         }
     
     except Exception as e:
         logger.error(f"Execution failed: {str(e)}")
+        # 異常状態のクライアントを次回に持ち越さない
+        clients.invalidate_clients()
         raise
     
     finally:
-        # ロック解放
-        release_lock()
+        # リース延長を止めてロック解放
+        renewer.stop()
+        release_lock(lease)
 
@@ -0,0 +1,54 @@
+"""OHLCV集計の再構築（バックフィル用ハンドラー）"""
+import json
+import sys
+from datetime import datetime, timedelta
+
+from config import TRADING_SYMBOLS, LOCK_LEASE_SECONDS
+from utils.logger import logger
+from utils.lock import acquire_lock, release_lock, LeaseRenewer
+from utils.dynamodb_client import DynamoDBClient
+
+
+def lambda_handler(event, context):
+    """
+    price_historyの生データから直近N日分の時間足・日足集計を再構築
+    
+    通常の集計はメイン実行サイクルで逐次更新されるため、
+    集計テーブル導入時のバックフィルや欠損時の修復に使用する。
+    メイン実行サイクルも同じバケットを読み込み→更新で書き込むため、同じ実行ロック（リース）を取得して実行する
+    （実行中のサイクルがあれば1サイクル分まで待ち、取得できなければスキップ）。
+    event例: {"days": 30}
+    """
+    days = int((event or {}).get('days', 1))
+    since = datetime.utcnow() - timedelta(days=days)
+    
+    lease = acquire_lock(owner=getattr(context, 'aws_request_id', None), wait_seconds=LOCK_LEASE_SECONDS)
+    if lease is None:
+        logger.info("Another execution is in progress, skipping rollup rebuild")
+        return {
+            'statusCode': 200,
+            'body': json.dumps('Skipped: Another execution in progress')
+        }
+    renewer = LeaseRenewer(lease).start()
+    
+    try:
+        dynamodb_client = DynamoDBClient()
+        rebuilt = {}
+        for symbol in TRADING_SYMBOLS:
+            # シンボルごとにまとめて書き込み、書き込み直前にリースを確認する
+            with dynamodb_client.write_group(guard=renewer.ensure_held):
+                rebuilt[symbol] = dynamodb_client.rebuild_price_rollups(symbol, since)
+            logger.info(f"Rebuilt {rebuilt[symbol]} rollup buckets for {symbol}")
+    finally:
+        renewer.stop()
+        release_lock(lease)
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'days': days, 'rebuilt_buckets': rebuilt})
+    }
+
+
+if __name__ == '__main__':
+    # ローカル実行: python rollup_handler.py 30
+    print(lambda_handler({'days': int(sys.argv[1]) if len(sys.argv) > 1 else 1}, None))
@@ -0,0 +1,28 @@
+"""テスト共通設定（lambda/ を import パスに追加し、DynamoDBは moto でモックする）"""
+import importlib.util
+import os
+import sys
+import pytest
+# botocoreへのフックを登録するため、boto3クライアントを生成するテスト対象のモジュールより先に読み込む
+from moto import mock_aws
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CREATE_TABLES_PATH = os.path.join(os.path.dirname(LAMBDA_DIR), "infrastructure", "create_tables.py")
+
+sys.path.insert(0, LAMBDA_DIR)
+# モック用の認証情報（実際のAWSには接続しない）
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+@pytest.fixture
+def dynamodb_tables():
+    """infrastructure/create_tables.py の定義どおりにテーブルを作成したモック環境"""
+    with mock_aws():
+        spec = importlib.util.spec_from_file_location("create_tables", CREATE_TABLES_PATH)
+        create_tables = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(create_tables)
+        for table_def in create_tables.tables:
+            create_tables.create_table(table_def)
+        yield
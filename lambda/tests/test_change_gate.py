@@ -0,0 +1,80 @@
+"""変化判定（LLM呼び出しの省略）のテスト"""
+from datetime import datetime, timedelta
+from config import CHANGE_GATE_MAX_STALENESS_SECONDS
+from utils.change_gate import evaluate_change_gate, news_hash
+
+NOW = datetime(2026, 10, 17, 12, 0, 0)
+NEWS = [{"title": "Gold hits record high", "url": "https://example.com/gold", "item_hash": "a", "seen": True}]
+
+
+def tickers(price: float = 100.0):
+    return {"PAXG/USDT": {"price": price}}
+
+
+def judgment(**overrides):
+    item = {
+        "status": "evaluated",
+        "confidence_score": 5,
+        "input_prices": {"PAXG/USDT": 100.0},
+        "news_hash": news_hash(NEWS),
+        "evaluated_at": (NOW - timedelta(minutes=5)).isoformat(),
+    }
+    item.update(overrides)
+    return item
+
+
+def test_skips_when_prices_and_news_are_unchanged():
+    result = evaluate_change_gate(judgment(), tickers(100.1), NEWS, now=NOW)
+    
+    assert result.skip is True
+    # 省略時は直近でLLMを呼んだ判断の入力を引き継ぐ
+    assert result.inputs["evaluated_at"] == judgment()["evaluated_at"]
+
+
+def test_skipped_judgment_is_a_valid_reference():
+    result = evaluate_change_gate(judgment(status="skipped", confidence_score=0), tickers(), NEWS, now=NOW)
+    
+    assert result.skip is True
+
+
+def test_evaluates_without_reference_judgment():
+    result = evaluate_change_gate(None, tickers(), NEWS, now=NOW)
+    
+    assert result.skip is False
+    assert result.inputs["input_prices"] == {"PAXG/USDT": 100.0}
+    assert result.inputs["evaluated_at"] == NOW.isoformat()
+
+
+def test_evaluates_after_failed_analysis():
+    assert evaluate_change_gate(judgment(confidence_score=0), tickers(), NEWS, now=NOW).skip is False
+
+
+def test_evaluates_when_reference_is_stale():
+    stale = (NOW - timedelta(seconds=CHANGE_GATE_MAX_STALENESS_SECONDS)).isoformat()
+    
+    assert evaluate_change_gate(judgment(evaluated_at=stale), tickers(), NEWS, now=NOW).skip is False
+
+
+def test_evaluates_when_price_moves_past_threshold():
+    result = evaluate_change_gate(judgment(), tickers(101.0), NEWS, now=NOW)
+    
+    assert result.skip is False
+    assert "PAXG/USDT moved" in result.reason
+
+
+def test_evaluates_when_new_symbol_appears():
+    current = dict(tickers(), **{"ONDO/USDT": {"price": 1.0}})
+    
+    assert evaluate_change_gate(judgment(), current, NEWS, now=NOW).skip is False
+
+
+def test_evaluates_when_new_news_arrives():
+    news = NEWS + [{"title": "Fed cuts rates", "url": "https://example.com/fed", "item_hash": "b", "seen": False}]
+    
+    result = evaluate_change_gate(judgment(), tickers(), news, now=NOW)
+    assert result.skip is False
+    assert result.reason == "news changed"
+
+
+def test_seen_news_dropping_out_is_not_a_change():
+    assert evaluate_change_gate(judgment(), tickers(), [], now=NOW).skip is True
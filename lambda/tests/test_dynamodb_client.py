@@ -0,0 +1,61 @@
+"""DynamoDBClient.write_group のテスト"""
+import pytest
+from config import LLM_CACHE_TABLE, PRICE_HISTORY_TABLE
+from utils.dynamodb_client import DynamoDBClient
+
+TICKERS = {"PAXG/USDT": {"price": 2000.0, "change_24h": 0.5, "volume": 10.0}}
+
+
+def price_history_count(client: DynamoDBClient) -> int:
+    return client.dynamodb.Table(PRICE_HISTORY_TABLE).scan()["Count"]
+
+
+def test_write_group_flushes_on_normal_exit(dynamodb_tables):
+    client = DynamoDBClient()
+    with client.write_group():
+        client.save_price_history_batch(TICKERS)
+        assert price_history_count(client) == 0
+    
+    assert price_history_count(client) == 1
+
+
+def test_write_group_discards_writes_on_exception(dynamodb_tables):
+    client = DynamoDBClient()
+    with pytest.raises(RuntimeError):
+        with client.write_group():
+            client.save_price_history_batch(TICKERS)
+            raise RuntimeError("cycle failed")
+    
+    assert price_history_count(client) == 0
+    # 破棄後は通常どおり即時書き込みに戻る
+    client.save_price_history_batch(TICKERS)
+    assert price_history_count(client) == 1
+
+
+def test_write_group_guard_failure_discards_writes(dynamodb_tables):
+    client = DynamoDBClient()
+    
+    def lost_lease():
+        raise RuntimeError("lease lost")
+    
+    with pytest.raises(RuntimeError):
+        with client.write_group(guard=lost_lease):
+            client.save_price_history_batch(TICKERS)
+    
+    assert price_history_count(client) == 0
+
+
+def test_llm_cache_is_written_immediately_inside_write_group(dynamodb_tables):
+    # 早期終了したストリームの受信スレッドが実行サイクルの書き込み中に保存しても、破棄されない
+    client = DynamoDBClient()
+    
+    def lost_lease():
+        raise RuntimeError("lease lost")
+    
+    with pytest.raises(RuntimeError):
+        with client.write_group(guard=lost_lease):
+            client.save_price_history_batch(TICKERS)
+            client.save_llm_cache({"cache_key": "k", "response_text": "{}", "expires_at": 1})
+    
+    assert price_history_count(client) == 0
+    assert client.dynamodb.Table(LLM_CACHE_TABLE).scan()["Count"] == 1
@@ -0,0 +1,151 @@
+"""Gemini応答の検証・パースのテスト"""
+import pytest
+from utils import gemini_client
+from utils.gemini_client import GeminiClient, MarketDecision, ScoreStreamParser
+
+
+def test_market_decision_normalizes_allocations():
+    decision = MarketDecision.from_dict({
+        "confidence_score": 9,
+        "reasoning": "金価格の上昇",
+        "target_allocations": {"PAXG/USDT": 3, "USDT": 1, "UNKNOWN/USDT": 5},
+    })
+    
+    assert decision.confidence_score == 9
+    assert decision.target_allocations == {"PAXG/USDT": 0.75, "USDT": 0.25}
+
+
+@pytest.mark.parametrize("allocations", [
+    {"PAXG/USDT": -0.5, "USDT": 1.5},
+    {"PAXG/USDT": "half", "USDT": 0.5},
+    {"PAXG/USDT": None, "USDT": 1.0},
+    {"PAXG/USDT": float("nan"), "USDT": 1.0},
+    "PAXG/USDT: 1.0",
+])
+def test_market_decision_keeps_score_when_allocations_are_malformed(allocations):
+    decision = MarketDecision.from_dict({
+        "confidence_score": 9,
+        "reasoning": "金価格の上昇",
+        "target_allocations": allocations,
+    })
+    
+    assert decision.confidence_score == 9
+    assert decision.reasoning == "金価格の上昇"
+    assert decision.target_allocations is None
+
+
+@pytest.mark.parametrize("data", [
+    {"confidence_score": 11, "reasoning": "範囲外"},
+    {"confidence_score": True, "reasoning": "真偽値"},
+    {"confidence_score": 5, "reasoning": " "},
+])
+def test_market_decision_rejects_invalid_score_or_reasoning(data):
+    with pytest.raises(ValueError):
+        MarketDecision.from_dict(data)
+
+
+def test_score_stream_parser_reports_score_once_complete():
+    parser = ScoreStreamParser()
+    
+    assert parser.feed('{"confidence_score": 1') is False
+    assert parser.score is None
+    assert parser.feed('0, "reasoning": "金') is True
+    assert parser.score == 10
+    assert parser.time_to_score_ms is not None
+    assert parser.feed('価格が上昇"}') is False
+    assert parser.reasoning() == "金価格が上昇"
+
+
+def test_score_stream_parser_returns_partial_reasoning():
+    parser = ScoreStreamParser()
+    parser.feed(r'{"confidence_score": 3, "reasoning": "\u91d1\"引用\"を含')
+    
+    assert parser.score == 3
+    assert parser.reasoning() == '金"引用"を含'
+    # エスケープの途中で切れていてもそのまま返す
+    parser.feed('\\')
+    assert parser.reasoning() == r'\u91d1\"引用\"を含' + '\\'
+
+
+class FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStream:
+    """google.generativeaiのストリーミング応答（イテレートとresolveで受信を進める）"""
+    
+    def __init__(self, chunks):
+        self._pending = list(chunks)
+        self._received = []
+        self.usage_metadata = None
+    
+    def __iter__(self):
+        yield from (FakeChunk(chunk) for chunk in self._received)
+        while self._pending:
+            chunk = self._pending.pop(0)
+            self._received.append(chunk)
+            yield FakeChunk(chunk)
+    
+    def resolve(self):
+        for _ in self:
+            pass
+    
+    @property
+    def text(self):
+        if self._pending:
+            raise ValueError("stream is not complete")
+        return "".join(self._received)
+
+
+class FakeModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+    
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        return FakeStream(self.chunks)
+
+
+class MemoryResponseCache:
+    def __init__(self):
+        self.entries = {}
+    
+    def get(self, key):
+        return self.entries.get(key)
+    
+    def put(self, key, model, call, instruction, prompt, generation_config, response_text, usage):
+        self.entries[key] = {"response_text": response_text}
+
+
+@pytest.fixture
+def streaming_client(monkeypatch):
+    """スコア2の長い応答をストリーミングで返すGeminiClient"""
+    reasoning = "材料不足。" * 200
+    chunks = ['{"confidence_score": 2, "reasoning": "'] + [reasoning[i:i + 50] for i in range(0, len(reasoning), 50)] + ['"}']
+    model = FakeModel(chunks)
+    monkeypatch.setattr(gemini_client, "GEMINI_STREAMING_ENABLED", True)
+    monkeypatch.setattr(gemini_client, "LLM_CACHE_REPLAY_ONLY", False)
+    client = GeminiClient(response_cache=MemoryResponseCache())
+    monkeypatch.setattr(client, "_model_for", lambda display_name, instruction: (model, None))
+    client.model = model
+    client.full_reasoning = reasoning
+    return client
+
+
+def test_early_exit_returns_excerpt_and_caches_completed_response(streaming_client):
+    scores = []
+    score, reasoning = streaming_client.analyze_market("ニュース", {}, on_score=scores.append)
+    
+    assert scores == [2]
+    assert score == 2
+    assert reasoning.endswith("…（以下省略）")
+    assert streaming_client.usage["analyze_market"]["early_exit"] is True
+    
+    streaming_client.wait_for_drains()
+    # 同じ入力の2回目は生成せず、完了した応答（判断根拠の全文）をキャッシュから返す
+    score, reasoning = streaming_client.analyze_market("ニュース", {}, on_score=scores.append)
+    assert (score, reasoning) == (2, streaming_client.full_reasoning)
+    assert streaming_client.model.calls == 1
+    assert streaming_client.usage["analyze_market"]["response_cache"] == "hit"
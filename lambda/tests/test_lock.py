@@ -0,0 +1,139 @@
+"""実行ロック（リース）のテスト"""
+import time
+import pytest
+from config import DASHBOARD_TABLE
+from utils import lock
+from utils.dynamodb_client import DynamoDBClient
+from utils.lock import LeaseLostError, LeaseRenewer, acquire_lock, release_lock, renew_lock
+
+
+def lock_item():
+    return lock.lock_table.get_item(Key={"lock_id": lock.LOCK_ID})["Item"]
+
+
+def expire_lease():
+    """保持中のリースを期限切れにする（異常終了した実行を再現）"""
+    lock.lock_table.update_item(
+        Key={"lock_id": lock.LOCK_ID},
+        UpdateExpression="SET lease_expires_at = :past",
+        ExpressionAttributeValues={":past": int(time.time()) - 1}
+    )
+
+
+def test_held_lock_is_skipped_and_recorded(dynamodb_tables):
+    lease = acquire_lock(owner="first")
+    
+    assert acquire_lock(owner="second", wait_seconds=0) is None
+    item = lock_item()
+    assert item["owner"] == "first"
+    assert item["skipped_count"] == 1
+    assert item["consecutive_skips"] == 1
+    release_lock(lease)
+
+
+def test_fencing_token_increases_on_every_acquire(dynamodb_tables):
+    first = acquire_lock(owner="first")
+    release_lock(first)
+    second = acquire_lock(owner="second")
+    
+    assert second.fencing_token == first.fencing_token + 1
+    assert second.taken_over is False
+    # 解放してもアイテムは残り、保持者だけが外れる
+    release_lock(second)
+    assert "owner" not in lock_item()
+    assert lock_item()["fencing_token"] == second.fencing_token
+
+
+def test_expired_lease_is_taken_over(dynamodb_tables):
+    stale = acquire_lock(owner="crashed")
+    expire_lease()
+    
+    lease = acquire_lock(owner="next", wait_seconds=0)
+    assert lease is not None
+    assert lease.taken_over is True
+    assert lease.fencing_token == stale.fencing_token + 1
+    
+    # 古い保持者は延長できず、解放しても新しい保持者のロックは外れない
+    with pytest.raises(LeaseLostError):
+        renew_lock(stale)
+    release_lock(stale)
+    assert lock_item()["owner"] == "next"
+
+
+def test_stale_holder_writes_are_fenced_off(dynamodb_tables):
+    stale = acquire_lock(owner="crashed")
+    expire_lease()
+    acquire_lock(owner="next", wait_seconds=0)
+    
+    client = DynamoDBClient()
+    renewer = LeaseRenewer(stale)
+    with pytest.raises(LeaseLostError):
+        with client.write_group(guard=renewer.ensure_held):
+            client.save_price_history_batch({"PAXG/USDT": {"price": 2000.0, "change_24h": 0.0, "volume": 1.0}})
+    
+    assert client.price_history_table.scan()["Count"] == 0
+
+
+TICKERS = {"PAXG/USDT": {"price": 2000.0, "change_24h": 0.0, "volume": 1.0}}
+
+
+def save_cycle_results(client: DynamoDBClient, lease):
+    client.save_price_history_batch(TICKERS)
+    client.save_portfolio_snapshot({"USDT": 1000.0}, {"USDT": 1000.0}, 1000.0, {"USDT": 1.0},
+                                   fencing_token=lease.fencing_token)
+    client.save_dashboard({"updated_at": "2026-10-17T12:00:00"}, fencing_token=lease.fencing_token)
+
+
+def test_fenced_write_group_writes_with_the_held_lease(dynamodb_tables):
+    lease = acquire_lock(owner="first")
+    client = DynamoDBClient()
+    
+    with client.write_group(lease=lease):
+        save_cycle_results(client, lease)
+    
+    assert client.portfolio_snapshots_table.scan()["Count"] == 1
+    assert client.price_history_table.scan()["Count"] == 1
+    dashboard = client.get_dashboard()
+    assert dashboard["fencing_token"] == lease.fencing_token
+    release_lock(lease)
+
+
+def test_takeover_after_the_guard_is_rejected_at_write_time(dynamodb_tables):
+    stale = acquire_lock(owner="paused")
+    
+    def guard_then_pause():
+        # 確認は通ったが、書き込みまでの間にリースが切れて引き継がれた
+        renew_lock(stale)
+        expire_lease()
+        acquire_lock(owner="next", wait_seconds=0)
+    
+    client = DynamoDBClient()
+    with pytest.raises(LeaseLostError):
+        with client.write_group(guard=guard_then_pause, lease=stale):
+            save_cycle_results(client, stale)
+    
+    assert client.portfolio_snapshots_table.scan()["Count"] == 0
+    assert client.price_history_table.scan()["Count"] == 0
+    assert client.get_dashboard() is None
+
+
+def test_dashboard_is_not_overwritten_by_an_older_token(dynamodb_tables):
+    client = DynamoDBClient()
+    client.save_dashboard({"updated_at": "new"}, fencing_token=5)
+    
+    with pytest.raises(LeaseLostError):
+        client.save_dashboard({"updated_at": "old"}, fencing_token=4)
+    
+    item = client.dynamodb.Table(DASHBOARD_TABLE).get_item(Key={"dashboard_id": "main"})["Item"]
+    assert item["updated_at"] == "new"
+
+
+def test_renew_extends_the_lease(dynamodb_tables):
+    lease = acquire_lock(owner="first")
+    expires_at = lease.lease_expires_at
+    expire_lease()
+    
+    renew_lock(lease)
+    assert lease.lease_expires_at >= expires_at
+    assert lock_item()["lease_expires_at"] == lease.lease_expires_at
+    assert acquire_lock(owner="second", wait_seconds=0) is None
@@ -0,0 +1,88 @@
+"""メイン実行サイクルのテスト（取引所・Gemini・ニュース取得はスタブ）"""
+import json
+import pytest
+from config import SEEN_NEWS_TABLE, TRADING_SYMBOLS
+from utils import clients, news_collector
+from utils.gemini_client import MarketDecision
+
+
+class StubGateIO:
+    """残高と価格を固定値で返す"""
+    
+    def __init__(self):
+        self.prices = {symbol: 100.0 for symbol in TRADING_SYMBOLS}
+    
+    def get_balance(self):
+        return {"USDT": 1000.0, "PAXG/USDT": 1.0}
+    
+    def get_all_tickers(self):
+        return {
+            symbol: {"price": price, "change_24h": 0.1, "volume": 10.0}
+            for symbol, price in self.prices.items()
+        }
+
+
+class StubGemini:
+    """常にアクション不要（スコア5）の判断を返す"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def decide(self, news_text, price_data, current_allocations, on_score=None):
+        self.calls += 1
+        return MarketDecision(5, "変化なし", dict(current_allocations))
+    
+    def pop_usage(self):
+        return {}
+    
+    def wait_for_drains(self):
+        pass
+
+
+@pytest.fixture
+def cycle(dynamodb_tables, monkeypatch):
+    """lambda_handlerを1回実行する関数（スタブのGeminiを属性として持つ）"""
+    import main
+    
+    gateio, gemini = StubGateIO(), StubGemini()
+    clients.invalidate_clients()
+    monkeypatch.setattr(clients, "gateio_client", lambda: gateio)
+    monkeypatch.setattr(clients, "gemini_client", lambda: gemini)
+    monkeypatch.setattr(news_collector, "NEWS_FETCHERS", {
+        "cryptopanic": lambda session, timeout, cursor=None: [
+            {"title": "Gold hits record high", "url": "https://example.com/gold", "source": "cryptopanic"}
+        ],
+    })
+    
+    def run():
+        return json.loads(main.lambda_handler({}, None)["body"])
+    
+    run.gemini = gemini
+    yield run
+    clients.invalidate_clients()
+
+
+def test_cycle_records_seen_news(cycle):
+    cycle()
+    
+    table = clients.dynamodb_client().dynamodb.Table(SEEN_NEWS_TABLE)
+    items = table.scan()["Items"]
+    assert [item["title"] for item in items] == ["Gold hits record high"]
+
+
+def test_second_cycle_without_changes_skips_llm(cycle):
+    first = cycle()
+    second = cycle()
+    
+    assert first["llm_skipped"] is False
+    assert second["llm_skipped"] is True
+    assert cycle.gemini.calls == 1
+
+
+def test_price_move_triggers_llm_again(cycle):
+    cycle()
+    gateio = clients.gateio_client()
+    gateio.prices["PAXG/USDT"] *= 1.05
+    
+    assert cycle()["llm_skipped"] is False
+    assert cycle.gemini.calls == 2
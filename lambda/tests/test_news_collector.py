@@ -0,0 +1,101 @@
+"""CryptoPanicのカーソル以降の取得と、カーソルの永続化のテスト"""
+from utils import news_collector
+from utils.dynamodb_client import DynamoDBClient
+from utils.news_collector import collect_news, fetch_cryptopanic_news
+from utils.seen_news import SeenNewsIndex
+
+
+def post(number: int, published_at: str):
+    return {
+        "title": f"Headline {number}",
+        "original_url": f"https://example.com/{number}",
+        "published_at": published_at,
+    }
+
+
+class FakeResponse:
+    status_code = 200
+    
+    def __init__(self, data):
+        self.data = data
+        self.text = ""
+    
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """時系列フィード（新しい順）のページを順に返すセッション"""
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+    
+    def get(self, url, params=None, timeout=None):
+        self.requests.append((url, params))
+        index = len(self.requests) - 1
+        has_next = index + 1 < len(self.pages)
+        return FakeResponse({
+            "results": self.pages[index],
+            "next": f"https://cryptopanic.com/api/developer/v2/posts/?page={index + 2}" if has_next else None,
+        })
+
+
+PAGES = [
+    [post(5, "2026-10-17T12:05:00Z"), post(4, "2026-10-17T12:04:00Z")],
+    [post(3, "2026-10-17T12:03:00Z"), post(2, "2026-10-17T12:02:00Z")],
+    [post(1, "2026-10-17T12:01:00Z")],
+]
+
+
+def test_first_fetch_reads_one_page_of_the_chronological_feed(monkeypatch):
+    monkeypatch.setenv("CRYPTOPANIC_AUTH_TOKEN", "token")
+    session = FakeSession(PAGES)
+    
+    items = fetch_cryptopanic_news(session, 1.0)
+    
+    assert [item["title"] for item in items] == ["Headline 5", "Headline 4"]
+    assert len(session.requests) == 1
+    # hotフィードは時系列順ではないためカーソルと組み合わせない
+    assert "filter" not in session.requests[0][1]
+
+
+def test_fetch_stops_at_cursor_and_keeps_posts_at_the_cursor(monkeypatch):
+    monkeypatch.setenv("CRYPTOPANIC_AUTH_TOKEN", "token")
+    session = FakeSession(PAGES)
+    
+    items = fetch_cryptopanic_news(session, 1.0, cursor="2026-10-17T12:03:00Z")
+    
+    assert [item["title"] for item in items] == ["Headline 5", "Headline 4", "Headline 3"]
+    # カーソルに達したページで止まり、それより前のページは取得しない
+    assert len(session.requests) == 2
+    assert session.requests[1] == ("https://cryptopanic.com/api/developer/v2/posts/?page=2", None)
+
+
+def test_cursor_advances_only_on_commit(dynamodb_tables, monkeypatch):
+    feed = {"pages": [[post(2, "2026-10-17T12:02:00Z"), post(1, "2026-10-17T12:01:00Z")]]}
+    cursors = []
+    
+    def fetch(session, timeout, cursor=None):
+        cursors.append(cursor)
+        return fetch_cryptopanic_news(FakeSession(feed["pages"]), timeout, cursor)
+    
+    monkeypatch.setenv("CRYPTOPANIC_AUTH_TOKEN", "token")
+    monkeypatch.setattr(news_collector, "NEWS_FETCHERS", {"cryptopanic": fetch})
+    
+    client = DynamoDBClient()
+    # 保存前に失敗したサイクルはカーソルを進めない
+    collect_news(seen_index=SeenNewsIndex(client))
+    index = SeenNewsIndex(client)
+    collect_news(seen_index=index)
+    with client.write_group():
+        index.commit()
+    
+    # コールドスタート相当（新しいインデックス）でもDynamoDBからカーソルを読み込む
+    feed["pages"] = [[post(3, "2026-10-17T12:03:00Z"), post(2, "2026-10-17T12:02:00Z")]]
+    news = collect_news(seen_index=SeenNewsIndex(DynamoDBClient()))
+    
+    assert cursors == [None, None, "2026-10-17T12:02:00Z"]
+    assert [(item["title"], item["seen"]) for item in news["news_items"]] == [
+        ("Headline 3", False), ("Headline 2", True)
+    ]
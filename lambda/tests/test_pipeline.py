@@ -0,0 +1,81 @@
+"""Pipeline（ステージグラフ）のテスト"""
+import threading
+import time
+import pytest
+from utils.pipeline import Pipeline
+
+
+def test_dependent_stage_receives_dependency_results():
+    pipeline = Pipeline("test")
+    pipeline.add_stage("a", lambda: 1)
+    pipeline.add_stage("b", lambda: 2)
+    pipeline.add_stage("sum", lambda a, b: a + b, depends_on=["a", "b"])
+    
+    assert pipeline.run() == {"a": 1, "b": 2, "sum": 3}
+
+
+def test_independent_stages_run_concurrently():
+    # 両ステージが同時に実行されていなければバリアがタイムアウトする
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline("test", max_workers=2)
+    pipeline.add_stage("a", lambda: barrier.wait() is not None)
+    pipeline.add_stage("b", lambda: barrier.wait() is not None)
+    
+    assert pipeline.run() == {"a": True, "b": True}
+
+
+def test_all_root_stages_start_together_by_default():
+    # 依存関係のないステージ数だけスレッドを用意するため、6ステージが同時に待ち合わせられる
+    barrier = threading.Barrier(6, timeout=5)
+    pipeline = Pipeline("test")
+    for name in "abcdef":
+        pipeline.add_stage(name, lambda: barrier.wait() is not None)
+    pipeline.add_stage("all", lambda **results: all(results.values()), depends_on=list("abcdef"))
+    
+    assert pipeline.worker_count() == 6
+    assert pipeline.run()["all"] is True
+
+
+def test_max_workers_caps_worker_count():
+    pipeline = Pipeline("test", max_workers=2)
+    for name in "abc":
+        pipeline.add_stage(name, lambda: None)
+    
+    assert pipeline.worker_count() == 2
+
+
+def test_dependent_stage_starts_after_dependencies_finish():
+    def analyze(fetch):
+        # 終了時刻が丸めで同じにならないよう、後続ステージに時間をかける
+        time.sleep(0.01)
+        return fetch.upper()
+    
+    pipeline = Pipeline("test")
+    pipeline.add_stage("fetch", lambda: "data")
+    pipeline.add_stage("analyze", analyze, depends_on=["fetch"])
+    pipeline.run()
+    
+    assert pipeline.timings["analyze"]["start_ms"] >= pipeline.timings["fetch"]["end_ms"]
+    assert pipeline.critical_path() == ["fetch", "analyze"]
+
+
+def test_unknown_dependency_is_rejected():
+    pipeline = Pipeline("test")
+    with pytest.raises(ValueError):
+        pipeline.add_stage("analyze", lambda fetch: fetch, depends_on=["fetch"])
+
+
+def test_stage_failure_propagates_and_skips_dependents():
+    called = []
+    
+    def fail():
+        raise RuntimeError("fetch failed")
+    
+    pipeline = Pipeline("test")
+    pipeline.add_stage("fetch", fail)
+    pipeline.add_stage("analyze", lambda fetch: called.append(fetch), depends_on=["fetch"])
+    
+    with pytest.raises(RuntimeError, match="fetch failed"):
+        pipeline.run()
+    assert called == []
+    assert "fetch" in pipeline.timings
@@ -0,0 +1,49 @@
+"""OHLCV集計の再構築ハンドラーのテスト"""
+import rollup_handler
+from config import PRICE_ROLLUPS_TABLE
+from utils import lock
+from utils.dynamodb_client import DynamoDBClient
+from utils.lock import acquire_lock, release_lock
+
+
+def seed_price_history(client: DynamoDBClient):
+    client.save_price_history("PAXG/USDT", 2000.0, 0.5, 10.0)
+
+
+def rollup_count(client: DynamoDBClient) -> int:
+    return client.dynamodb.Table(PRICE_ROLLUPS_TABLE).scan()["Count"]
+
+
+def test_rebuild_holds_the_execution_lease(dynamodb_tables, monkeypatch):
+    client = DynamoDBClient()
+    seed_price_history(client)
+    held = []
+    rebuild = DynamoDBClient.rebuild_price_rollups
+    
+    def rebuild_while_checking(self, symbol, since):
+        held.append(lock.lock_table.get_item(Key={"lock_id": lock.LOCK_ID})["Item"].get("owner"))
+        return rebuild(self, symbol, since)
+    
+    monkeypatch.setattr(DynamoDBClient, "rebuild_price_rollups", rebuild_while_checking)
+    response = rollup_handler.lambda_handler({"days": 1}, None)
+    
+    assert response["statusCode"] == 200
+    assert all(owner is not None for owner in held)
+    # 時間足・日足の2バケット
+    assert rollup_count(client) == 2
+    item = lock.lock_table.get_item(Key={"lock_id": lock.LOCK_ID})["Item"]
+    assert "owner" not in item
+
+
+def test_rebuild_is_skipped_while_a_cycle_holds_the_lease(dynamodb_tables, monkeypatch):
+    client = DynamoDBClient()
+    seed_price_history(client)
+    monkeypatch.setattr(rollup_handler, "LOCK_LEASE_SECONDS", 0)
+    cycle = acquire_lock(owner="cycle")
+    try:
+        response = rollup_handler.lambda_handler({"days": 1}, None)
+    finally:
+        release_lock(cycle)
+    
+    assert "Skipped" in response["body"]
+    assert rollup_count(client) == 0
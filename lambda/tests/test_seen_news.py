@@ -0,0 +1,49 @@
+"""既出ニュースインデックスのテスト"""
+from config import SEEN_NEWS_TABLE
+from utils import clients
+from utils.dynamodb_client import DynamoDBClient
+from utils.seen_news import SeenNewsIndex
+
+NEWS = [
+    {"title": "Gold hits record high", "url": "https://example.com/gold", "source": "cryptopanic"},
+    {"title": "Fed holds rates", "url": "https://example.com/fed", "source": "reuters"},
+]
+
+
+def seen_news_count(client: DynamoDBClient) -> int:
+    return client.dynamodb.Table(SEEN_NEWS_TABLE).scan()["Count"]
+
+
+def test_commit_inside_write_group_persists_new_items(dynamodb_tables):
+    client = DynamoDBClient()
+    index = SeenNewsIndex(client)
+    tagged = index.tag([dict(item) for item in NEWS])
+    assert [item["seen"] for item in tagged] == [False, False]
+    
+    with client.write_group():
+        index.commit()
+    
+    assert seen_news_count(client) == 2
+    # コールドスタート相当（メモリ上のミラーなし）でもDynamoDBから既出と判定される
+    retagged = SeenNewsIndex(DynamoDBClient()).tag([dict(item) for item in NEWS])
+    assert [item["seen"] for item in retagged] == [True, True]
+
+
+def test_items_are_new_again_when_cycle_fails_before_commit(dynamodb_tables):
+    client = DynamoDBClient()
+    SeenNewsIndex(client).tag([dict(item) for item in NEWS])
+    
+    retagged = SeenNewsIndex(client).tag([dict(item) for item in NEWS])
+    assert [item["seen"] for item in retagged] == [False, False]
+    assert seen_news_count(client) == 0
+
+
+def test_registry_keeps_index_during_write_group(dynamodb_tables):
+    clients.invalidate_clients()
+    try:
+        index = clients.seen_news_index()
+        with clients.dynamodb_client().write_group():
+            assert clients.seen_news_index() is index
+            assert clients.dynamodb_client() is index.dynamodb_client
+    finally:
+        clients.invalidate_clients()
@@ -0,0 +1,91 @@
+"""LLM呼び出し前の変化判定（価格変動・新着ニュース）"""
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from config import (
+    CHANGE_GATE_ENABLED, CHANGE_GATE_MAX_STALENESS_SECONDS,
+    CHANGE_GATE_PRICE_MOVE_PERCENT, CHANGE_GATE_PRICE_MOVE_PERCENT_BY_SYMBOL
+)
+
+
+@dataclass
+class GateResult:
+    """変化判定の結果"""
+    # Trueの場合はLLMを呼ばずに「変化なし」の判断を記録する
+    skip: bool
+    reason: str
+    # 判断履歴に記録する比較基準（input_prices, news_hash, evaluated_at）
+    # skipの場合は直近でLLMを呼んだ判断のもの、それ以外は今回の入力
+    inputs: Dict = field(default_factory=dict)
+
+
+def news_hash(news_items: List[Dict[str, str]]) -> str:
+    """ニュースの集合のハッシュ（並び順に依存しない）"""
+    item_hashes = sorted(
+        item.get("item_hash") or f"{item.get('url', '')}\n{item.get('title', '')}"
+        for item in news_items
+    )
+    return hashlib.sha256("\n".join(item_hashes).encode()).hexdigest()
+
+
+def price_moves_percent(reference_prices: Dict[str, float],
+                        tickers: Dict[str, Dict]) -> Dict[str, Optional[float]]:
+    """シンボルごとの基準価格からの変動率(%)（比較できない場合はNone）"""
+    moves = {}
+    for symbol, ticker in tickers.items():
+        reference = reference_prices.get(symbol)
+        moves[symbol] = abs(ticker['price'] / reference - 1) * 100 if reference else None
+    return moves
+
+
+def evaluate_change_gate(last_judgment: Optional[Dict], tickers: Dict[str, Dict],
+                         news_items: List[Dict[str, str]],
+                         now: Optional[datetime] = None) -> GateResult:
+    """
+    直近の判断の入力と比べて、LLMを呼ぶ必要があるかを判定
+    
+    以下のいずれかに該当する場合はLLMを呼ぶ（skip=False）。
+    - 直近の判断がない、比較基準がない、または分析エラー（confidence_score 0）だった
+    - 直近でLLMを呼んでからCHANGE_GATE_MAX_STALENESS_SECONDS以上経過した
+    - 新着ニュースがある（ニュースの集合が変わり、既出でない項目を含む）
+    - いずれかのシンボルの価格がしきい値以上変動した（またはシンボルが増えた）
+    """
+    now = now or datetime.utcnow()
+    current = {
+        'input_prices': {symbol: ticker['price'] for symbol, ticker in tickers.items()},
+        'news_hash': news_hash(news_items),
+        'evaluated_at': now.isoformat(),
+    }
+    
+    if not CHANGE_GATE_ENABLED:
+        return GateResult(False, "gate disabled", current)
+    if not last_judgment or not last_judgment.get('input_prices') or not last_judgment.get('evaluated_at'):
+        return GateResult(False, "no reference judgment", current)
+    if last_judgment.get('status', 'evaluated') == 'evaluated' and int(last_judgment.get('confidence_score', 0)) == 0:
+        return GateResult(False, "previous analysis failed", current)
+    
+    reference = {
+        'input_prices': {symbol: float(price) for symbol, price in last_judgment['input_prices'].items()},
+        'news_hash': last_judgment.get('news_hash'),
+        'evaluated_at': last_judgment['evaluated_at'],
+    }
+    
+    staleness = (now - datetime.fromisoformat(reference['evaluated_at'])).total_seconds()
+    if staleness >= CHANGE_GATE_MAX_STALENESS_SECONDS:
+        return GateResult(False, f"last evaluation is {staleness:.0f}s old", current)
+    # 既出のニュースが一覧から外れただけの場合は変化とみなさない
+    if reference['news_hash'] != current['news_hash'] and any(not item.get('seen') for item in news_items):
+        return GateResult(False, "news changed", current)
+    
+    moves = price_moves_percent(reference['input_prices'], tickers)
+    for symbol, move in moves.items():
+        threshold = CHANGE_GATE_PRICE_MOVE_PERCENT_BY_SYMBOL.get(symbol, CHANGE_GATE_PRICE_MOVE_PERCENT)
+        if move is None:
+            return GateResult(False, f"no reference price for {symbol}", current)
+        if move >= threshold:
+            return GateResult(False, f"{symbol} moved {move:.2f}% (threshold {threshold}%)", current)
+    
+    largest = max(moves, key=lambda symbol: moves[symbol], default=None)
+    detail = f"largest move {largest} {moves[largest]:.2f}%" if largest else "no tickers"
+    return GateResult(True, f"skipped: no change ({detail}, news unchanged)", reference)
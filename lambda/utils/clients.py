@@ -0,0 +1,97 @@
+"""クライアントレジストリ
+
+Lambdaコンテナ内でクライアントを1度だけ生成し、ウォームスタート時に再利用する。
+重いライブラリ（ccxt, google.generativeai）は各クライアントの生成時まで読み込まれない。
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from config import CLIENT_MAX_AGE_SECONDS, LLM_CACHE_ENABLED
+from utils.logger import logger
+from utils.gateio_client import GateIOClient
+from utils.gemini_client import GeminiClient
+from utils.dynamodb_client import DynamoDBClient
+from utils.llm_cache import LLMResponseCache
+from utils.risk_manager import RiskManager
+from utils.seen_news import SeenNewsIndex
+
+# name -> (生成時刻, クライアント)
+_clients: Dict[str, Tuple[float, Any]] = {}
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def get_client(name: str, factory: Callable[[], Any],
+               is_valid: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    共有クライアントを取得
+    
+    未生成・生成からCLIENT_MAX_AGE_SECONDS経過・ヘルスチェック失敗の場合は再生成する。
+    ヘルスチェックはネットワークを使わない軽量なもの（クライアントの is_healthy() と is_valid）。
+    """
+    with _locks_guard:
+        lock = _locks.setdefault(name, threading.Lock())
+    
+    with lock:
+        entry = _clients.get(name)
+        if entry is not None:
+            created_at, client = entry
+            healthy = getattr(client, 'is_healthy', lambda: True)()
+            if (time.monotonic() - created_at < CLIENT_MAX_AGE_SECONDS and healthy
+                    and (is_valid is None or is_valid(client))):
+                return client
+            logger.info(f"Recreating client: {name}")
+        
+        start = time.perf_counter()
+        client = factory()
+        _clients[name] = (time.monotonic(), client)
+        logger.info(f"Client initialized: {name} ({(time.perf_counter() - start) * 1000:.1f}ms)")
+        return client
+
+
+def invalidate_clients():
+    """全クライアントを破棄（実行失敗後、次回呼び出しで作り直す）"""
+    with _locks_guard:
+        _clients.clear()
+
+
+def gateio_client() -> GateIOClient:
+    """Gate.io クライアント（初回生成時にccxtを読み込む）"""
+    return get_client('gateio', GateIOClient)
+
+
+def gemini_client() -> GeminiClient:
+    """Gemini クライアント（初回生成時にgoogle.generativeaiを読み込む。応答キャッシュは現在のDynamoDBクライアントを使う）"""
+    if not LLM_CACHE_ENABLED:
+        return get_client('gemini', GeminiClient)
+    dynamodb = dynamodb_client()
+    return get_client(
+        'gemini',
+        lambda: GeminiClient(response_cache=LLMResponseCache(dynamodb)),
+        is_valid=lambda client: client.response_cache.dynamodb_client is dynamodb
+    )
+
+
+def dynamodb_client() -> DynamoDBClient:
+    """DynamoDB クライアント"""
+    return get_client('dynamodb', DynamoDBClient)
+
+
+def risk_manager() -> RiskManager:
+    """リスク管理（現在のGate.ioクライアントに紐づくもの）"""
+    gateio = gateio_client()
+    return get_client(
+        'risk_manager',
+        lambda: RiskManager(gateio),
+        is_valid=lambda manager: manager.gateio_client is gateio
+    )
+
+
+def seen_news_index() -> SeenNewsIndex:
+    """既出ニュースインデックス（現在のDynamoDBクライアントに紐づくもの）"""
+    dynamodb = dynamodb_client()
+    return get_client(
+        'seen_news',
+        lambda: SeenNewsIndex(dynamodb),
+        is_valid=lambda index: index.dynamodb_client is dynamodb
+    )
@@ -0,0 +1,111 @@
+"""ダッシュボード（実行サイクルごとに更新する表示用ドキュメント）"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from config import (
+    TRADING_SYMBOLS, DASHBOARD_PERIOD_DAYS, DASHBOARD_CURRENCY_PERIOD_DAYS, DASHBOARD_HISTORY_DAYS
+)
+from utils.dynamodb_client import DynamoDBClient
+from utils.price_rollup import bucket_start
+
+
+def load_dashboard(dynamodb_client: DynamoDBClient, now: Optional[datetime] = None) -> Dict:
+    """
+    前回のダッシュボードを読み込む
+    
+    まだない場合（導入直後）は、ポートフォリオスナップショットと日足集計から
+    資産総額・日足終値の履歴を組み立てる（以降は毎サイクルの差分更新のみ）。
+    """
+    dashboard = dynamodb_client.get_dashboard()
+    if dashboard:
+        return dashboard
+    now = now or datetime.utcnow()
+    since = now - timedelta(days=DASHBOARD_HISTORY_DAYS)
+    return {
+        'portfolio_history': dynamodb_client.get_portfolio_value_history(since),
+        'daily_closes': dynamodb_client.get_daily_closes(TRADING_SYMBOLS, since, now),
+    }
+
+
+def update_dashboard(previous: Dict, holdings: Dict[str, float], values_usdt: Dict[str, float],
+                     total_value: float, allocations: Dict[str, float],
+                     daily_rollups: Dict[str, Dict], now: Optional[datetime] = None) -> Dict:
+    """
+    前回のダッシュボードに今回のスナップショットと日足集計を反映したドキュメントを返す
+    
+    資産総額は時間単位（各時間の最新値）、通貨ごとの価格は日足終値で直近
+    DASHBOARD_HISTORY_DAYS日分を保持し、騰落率はそこから求める。
+    今回の日足集計がない通貨は前回の値を引き継ぐ。
+    
+    Args:
+        daily_rollups: シンボル -> 今回更新した日足集計（save_price_rollupsの戻り値）
+    """
+    now = now or datetime.utcnow()
+    oldest_hour = bucket_start(now - timedelta(days=DASHBOARD_HISTORY_DAYS), '1h')
+    oldest_day = bucket_start(now - timedelta(days=DASHBOARD_HISTORY_DAYS), '1d')
+    
+    history = {
+        hour: float(value) for hour, value in previous.get('portfolio_history', {}).items()
+        if hour >= oldest_hour
+    }
+    history[bucket_start(now, '1h')] = total_value
+    
+    performance = []
+    for days in DASHBOARD_PERIOD_DAYS:
+        past_value = _value_at(history, bucket_start(now - timedelta(days=days), '1h'))
+        performance.append({
+            'days': days,
+            'total_value_usdt': total_value,
+            'change_percent': (total_value - past_value) / past_value * 100 if past_value else 0.0,
+        })
+    
+    closes = {
+        symbol: {day: float(close) for day, close in symbol_closes.items() if day >= oldest_day}
+        for symbol, symbol_closes in previous.get('daily_closes', {}).items()
+    }
+    previous_currencies = {
+        entry['symbol']: entry for entry in previous.get('currency_performance', [])
+    }
+    currency_performance: List[Dict] = []
+    for symbol in TRADING_SYMBOLS:
+        rollup = daily_rollups.get(symbol)
+        if rollup is None:
+            if symbol in previous_currencies:
+                currency_performance.append(previous_currencies[symbol])
+            continue
+        current_price = float(rollup['close'])
+        symbol_closes = closes.setdefault(symbol, {})
+        symbol_closes[rollup['bucket_start']] = current_price
+        entry = {
+            'symbol': symbol,
+            'current_price': current_price,
+            'change_24h': float(rollup['change_24h']),
+        }
+        # N日前の日足終値と比較（その日の日足がない場合はNone）
+        today = datetime.fromisoformat(rollup['bucket_start'])
+        for days in DASHBOARD_CURRENCY_PERIOD_DAYS:
+            past_close = symbol_closes.get((today - timedelta(days=days)).isoformat())
+            entry[f'change_{days}d'] = (
+                (current_price - past_close) / past_close * 100 if past_close else None
+            )
+        currency_performance.append(entry)
+    
+    return {
+        'portfolio': {
+            'holdings': holdings,
+            'values_usdt': values_usdt,
+            'total_value_usdt': total_value,
+            'allocations': allocations,
+            'timestamp': now.isoformat(),
+        },
+        'portfolio_performance': performance,
+        'currency_performance': currency_performance,
+        'portfolio_history': history,
+        'daily_closes': closes,
+        'updated_at': now.isoformat(),
+    }
+
+
+def _value_at(history: Dict[str, float], hour: str) -> Optional[float]:
+    """指定した時間以前で最も新しい資産総額（該当なしはNone）"""
+    earlier = [key for key in history if key <= hour]
+    return history[max(earlier)] if earlier else None
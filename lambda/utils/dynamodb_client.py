@@ -1,14 +1,22 @@
 """DynamoDB クライアント"""
 import boto3
+import time
 import uuid
-from datetime import datetime
-from typing import Dict, List, Optional
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from typing import Callable, Dict, List, Optional, Tuple
 from decimal import Decimal
 from config import (
     JUDGMENTS_TABLE, TRANSACTIONS_TABLE, PORTFOLIO_SNAPSHOTS_TABLE,
-    PRICE_HISTORY_TABLE, AWS_REGION
+    PRICE_HISTORY_TABLE, PRICE_ROLLUPS_TABLE, SEEN_NEWS_TABLE, LLM_CACHE_TABLE, DASHBOARD_TABLE, AWS_REGION,
+    BATCH_WRITE_MAX_ITEMS, BATCH_WRITE_MAX_RETRIES, BATCH_WRITE_BACKOFF_SECONDS,
+    BATCH_GET_MAX_KEYS, TRANSACT_WRITE_MAX_ITEMS, NEWS_SEEN_TTL_DAYS, MIN_CONFIDENCE_SCORE
 )
+from utils.lock import Lease, LeaseLostError, fencing_condition
 from utils.logger import logger
+from utils.price_rollup import ROLLUP_INTERVALS, bucket_start, merge_ohlcv, series_key
 
 
 class DynamoDBClient:
@@ -20,12 +28,66 @@ class DynamoDBClient:
         self.transactions_table = self.dynamodb.Table(TRANSACTIONS_TABLE)
         self.portfolio_snapshots_table = self.dynamodb.Table(PORTFOLIO_SNAPSHOTS_TABLE)
         self.price_history_table = self.dynamodb.Table(PRICE_HISTORY_TABLE)
+        self.price_rollups_table = self.dynamodb.Table(PRICE_ROLLUPS_TABLE)
+        # write_group() 実行中のみ使用する書き込み待ちキュー（テーブル名 -> アイテム）
+        self._pending_writes: Optional[List[Tuple[str, Dict]]] = None
+        # write_group() 実行中のみ使用する、TransactWriteItemsで書き込むアイテムの書き込み待ちキュー
+        # （テーブル名, アイテム, アイテムの条件）。fencing_token付き・条件付きのアイテムが対象
+        self._pending_transact: Optional[List[Tuple[str, Dict, Optional[Dict]]]] = None
+    
+    @contextmanager
+    def write_group(self, guard: Optional[Callable[[], None]] = None, lease: Optional[Lease] = None):
+        """
+        ブロック内の保存処理をまとめて書き込む
+        
+        ブロック内で呼ばれた save_* はキューに積まれ、ブロックが正常に終了した時に
+        BatchWriteItem（25件単位）でまとめてフラッシュされる。
+        ブロック内で例外が発生した場合はキューを破棄し、途中までの保存も書き込まない。
+        guardはフラッシュ直前に呼ばれ、例外を送出した場合も同様に書き込まない
+        （実行ロックのリースを失った場合など）。
+        fencing_tokenを付与したアイテム（判断履歴・スナップショット・ダッシュボード）と条件付きのアイテムは
+        TransactWriteItemsで先に書き込む。leaseを渡した場合は実行ロックの確認（fencing_condition）を
+        同じトランザクションに含め、その時点で他の実行に引き継がれていればLeaseLostErrorとなり、
+        残りのアイテムも書き込まない。
+        """
+        self._pending_writes = []
+        self._pending_transact = []
+        try:
+            yield self
+        except BaseException:
+            discarded = len(self._pending_writes) + len(self._pending_transact)
+            self._pending_writes = self._pending_transact = None
+            if discarded:
+                logger.warning(f"Discarded {discarded} grouped writes")
+            raise
+        
+        pending, transact = self._pending_writes, self._pending_transact
+        self._pending_writes = self._pending_transact = None
+        if (pending or transact) and guard:
+            guard()
+        if transact:
+            self._transact_put(transact, lease)
+        if pending:
+            self._batch_put(pending)
+        if pending or transact:
+            logger.info(f"Flushed {len(pending) + len(transact)} grouped writes")
     
     def save_judgment(self, confidence_score: int, reasoning: str, 
                      target_allocations: Dict[str, float],
-                     source_urls: List[str], fetch_status: Dict[str, bool],
-                     failed_sources: List[str]) -> str:
-        """判断履歴を保存"""
+                     source_urls: List[str], fetch_status: Dict[str, Dict],
+                     failed_sources: List[str], status: str = 'evaluated',
+                     inputs: Optional[Dict] = None,
+                     llm_usage: Optional[Dict[str, Dict]] = None,
+                     fencing_token: Optional[int] = None) -> str:
+        """
+        判断履歴を保存
+        
+        fetch_statusはソース名 -> {"ok", "latency_ms", ...}（collect_newsの戻り値）
+        statusは 'evaluated'（LLMで判断）または 'skipped'（変化なしでLLMを省略）。
+        inputsは次回の変化判定の比較基準（input_prices, news_hash, evaluated_at）。
+        llm_usageはGemini呼び出しごとのトークン数と応答キャッシュのhit/miss（GeminiClient.pop_usageの戻り値）。
+        fencing_tokenは書き込んだ実行が保持していた実行ロックのトークン。
+        """
         judgment_id = str(uuid.uuid4())
         timestamp = datetime.utcnow().isoformat()
         
@@ -38,27 +100,66 @@ class DynamoDBClient:
             'target_allocations': {k: Decimal(str(v)) for k, v in target_allocations.items()},
             'reasoning_text': reasoning,
             'source_urls': source_urls,
-            'info_fetch_status': {k: bool(v) for k, v in fetch_status.items()},
-            'failed_sources': failed_sources
+            'info_fetch_status': {k: bool(v['ok']) for k, v in fetch_status.items()},
+            'info_fetch_latency_ms': {
+                k: Decimal(str(v['latency_ms'])) for k, v in fetch_status.items()
+            },
+            'failed_sources': failed_sources,
+            'status': status
         }
+        if inputs:
+            item['input_prices'] = {k: Decimal(str(v)) for k, v in inputs['input_prices'].items()}
+            item['news_hash'] = inputs['news_hash']
+            item['evaluated_at'] = inputs['evaluated_at']
+        if llm_usage:
+            item['llm_usage'] = {
+                call: {k: Decimal(str(v)) if isinstance(v, float) else v for k, v in usage.items()}
+                for call, usage in llm_usage.items()
+            }
+            cache_results = [usage.get('response_cache') for usage in llm_usage.values()]
+            item['llm_cache_hits'] = cache_results.count('hit')
+            item['llm_cache_misses'] = cache_results.count('miss')
+        if fencing_token is not None:
+            item['fencing_token'] = fencing_token
+        # アクション対象の判断のみに付与するスパースGSI（judgments_actionable_by_timestamp）のキー
+        if status == 'evaluated' and confidence_score >= MIN_CONFIDENCE_SCORE:
+            item['actionable'] = 'judgment'
         
         try:
-            self.judgments_table.put_item(Item=item)
+            self._put(JUDGMENTS_TABLE, item)
             logger.info(f"Judgment saved: {judgment_id}")
             return judgment_id
         except Exception as e:
             logger.error(f"Failed to save judgment: {str(e)}")
             raise
     
+    def get_latest_judgment(self) -> Optional[Dict]:
+        """最新の判断履歴を取得（record_type固定GSIをQuery。取得失敗時はNone）"""
+        try:
+            response = self.judgments_table.query(
+                IndexName='judgments_by_record_type_timestamp',
+                KeyConditionExpression=Key('record_type').eq('judgment'),
+                ScanIndexForward=False,
+                Limit=1
+            )
+            items = response.get('Items', [])
+            return items[0] if items else None
+        except Exception as e:
+            logger.error(f"Failed to get latest judgment: {str(e)}")
+            return None
+    
     def save_transaction(self, symbol: str, side: str, amount: float,
                         price: float, status: str,
                         pre_allocation: Dict[str, float],
-                        post_allocation: Dict[str, float]) -> str:
-        """取引履歴を保存"""
+                        post_allocation: Dict[str, float],
+                        fencing_token: Optional[int] = None) -> str:
+        """取引履歴を保存（fencing_tokenは実行ロックのトークン）"""
         transaction_id = str(uuid.uuid4())
         timestamp = datetime.utcnow().isoformat()
         
         item = {
+            # 時系列で一覧取得するための固定パーティションキー（GSI用）
+            'record_type': 'transaction',
             'transaction_id': transaction_id,
             'timestamp': timestamp,
             'symbol': symbol,
@@ -69,6 +170,8 @@ class DynamoDBClient:
             'pre_allocation': {k: Decimal(str(v)) for k, v in pre_allocation.items()},
             'post_allocation': {k: Decimal(str(v)) for k, v in post_allocation.items()}
         }
+        if fencing_token is not None:
+            item['fencing_token'] = fencing_token
         
         try:
             self.transactions_table.put_item(Item=item)
@@ -81,12 +184,15 @@ class DynamoDBClient:
     def save_portfolio_snapshot(self, holdings: Dict[str, float],
                                values_usdt: Dict[str, float],
                                total_value_usdt: float,
-                               allocations: Dict[str, float]) -> str:
-        """資産スナップショットを保存"""
+                               allocations: Dict[str, float],
+                               fencing_token: Optional[int] = None) -> str:
+        """資産スナップショットを保存（fencing_tokenは実行ロックのトークン）"""
         snapshot_id = str(uuid.uuid4())
         timestamp = datetime.utcnow().isoformat()
         
         item = {
+            # Queryで最新取得するための固定パーティションキー（GSI用）
+            'record_type': 'portfolio_snapshot',
             'snapshot_id': snapshot_id,
             'timestamp': timestamp,
             'holdings': {k: Decimal(str(v)) for k, v in holdings.items()},
@@ -94,9 +200,11 @@ class DynamoDBClient:
             'total_value_usdt': Decimal(str(total_value_usdt)),
             'allocations': {k: Decimal(str(v)) for k, v in allocations.items()}
         }
+        if fencing_token is not None:
+            item['fencing_token'] = fencing_token
         
         try:
-            self.portfolio_snapshots_table.put_item(Item=item)
+            self._put(PORTFOLIO_SNAPSHOTS_TABLE, item)
             logger.info(f"Portfolio snapshot saved: {snapshot_id}")
             return snapshot_id
         except Exception as e:
@@ -107,17 +215,370 @@ class DynamoDBClient:
                           change_24h: float, volume: float):
         """価格履歴を保存"""
         timestamp = datetime.utcnow().isoformat()
+        item = self._build_price_history_item(symbol, timestamp, price, change_24h, volume)
         
-        item = {
+        try:
+            self.price_history_table.put_item(Item=item)
+        except Exception as e:
+            logger.error(f"Failed to save price history for {symbol}: {str(e)}")
+    
+    def save_price_history_batch(self, tickers: Dict[str, Dict]):
+        """
+        全シンボルの価格履歴をまとめて保存
+        
+        Args:
+            tickers: {symbol: {"price", "change_24h", "volume"}} 形式（get_all_tickersの戻り値）
+        """
+        timestamp = datetime.utcnow().isoformat()
+        items = [
+            (PRICE_HISTORY_TABLE, self._build_price_history_item(
+                symbol,
+                timestamp,
+                ticker_data['price'],
+                ticker_data['change_24h'],
+                ticker_data['volume']
+            ))
+            for symbol, ticker_data in tickers.items()
+        ]
+        
+        try:
+            self._put_items(items)
+        except Exception as e:
+            logger.error(f"Failed to save price history batch: {str(e)}")
+    
+    def save_price_rollups(self, tickers: Dict[str, Dict],
+                           timestamp: Optional[datetime] = None) -> List[Dict]:
+        """
+        時間足・日足のOHLCV集計を更新し、更新後の集計アイテムを返す（失敗時は空）
+        
+        対象バケットをBatchGetItemでまとめて読み込み、今回の価格を反映して書き戻す。
+        実行ロックにより書き込みは常に単一サイクル（または再構築）のみのため、読み込み→更新で整合性が保てる。
+        """
+        timestamp = timestamp or datetime.utcnow()
+        try:
+            keys = [
+                {'series_key': series_key(symbol, interval), 'bucket_start': bucket_start(timestamp, interval)}
+                for symbol in tickers
+                for interval in ROLLUP_INTERVALS
+            ]
+            existing = {
+                (item['series_key'], item['bucket_start']): item
+                for item in self._batch_get(PRICE_ROLLUPS_TABLE, keys)
+            }
+            
+            items = []
+            for symbol, ticker_data in tickers.items():
+                for interval in ROLLUP_INTERVALS:
+                    key = (series_key(symbol, interval), bucket_start(timestamp, interval))
+                    items.append((PRICE_ROLLUPS_TABLE, merge_ohlcv(
+                        existing.get(key),
+                        symbol,
+                        interval,
+                        timestamp,
+                        ticker_data['price'],
+                        ticker_data['change_24h'],
+                        ticker_data['volume']
+                    )))
+            self._put_items(items)
+            return [item for _, item in items]
+        except Exception as e:
+            logger.error(f"Failed to save price rollups: {str(e)}")
+            return []
+    
+    def rebuild_price_rollups(self, symbol: str, since: datetime) -> int:
+        """
+        price_historyの生データからsince以降のOHLCV集計を再構築（バックフィル用）
+        
+        メイン実行サイクルと同じバケットに書き込むため、実行ロックを保持して呼ぶ（rollup_handler）。
+        write_group内で呼ぶとブロックの終了時にまとめて書き込まれる。
+        
+        Returns:
+            書き込んだ集計アイテム数
+        """
+        # since が属するバケットの先頭から再集計する（途中から集計するとopen/high/lowが欠けるため）
+        start = min(bucket_start(since, interval) for interval in ROLLUP_INTERVALS)
+        rollups: Dict[Tuple[str, str], Dict] = {}
+        query_kwargs = {
+            'KeyConditionExpression': Key('symbol').eq(symbol) & Key('timestamp').gte(start),
+        }
+        while True:
+            response = self.price_history_table.query(**query_kwargs)
+            for row in response.get('Items', []):
+                row_timestamp = datetime.fromisoformat(row['timestamp'])
+                for interval in ROLLUP_INTERVALS:
+                    key = (interval, bucket_start(row_timestamp, interval))
+                    rollups[key] = merge_ohlcv(
+                        rollups.get(key),
+                        symbol,
+                        interval,
+                        row_timestamp,
+                        row['price'],
+                        row['change_24h'],
+                        row['volume']
+                    )
+            lek = response.get('LastEvaluatedKey')
+            if not lek:
+                break
+            query_kwargs['ExclusiveStartKey'] = lek
+        
+        self._put_items([(PRICE_ROLLUPS_TABLE, item) for item in rollups.values()])
+        return len(rollups)
+    
+    def get_seen_news(self, item_hashes: List[str]) -> List[str]:
+        """既出ニュースインデックスに登録済みのハッシュを返す（読み込み失敗時は空）"""
+        try:
+            keys = [{'item_hash': item_hash} for item_hash in item_hashes]
+            return [item['item_hash'] for item in self._batch_get(SEEN_NEWS_TABLE, keys)]
+        except Exception as e:
+            logger.error(f"Failed to get seen news: {str(e)}")
+            return []
+    
+    def get_news_cursors(self, sources: List[str]) -> Dict[str, str]:
+        """ソースごとのニュース取得カーソルを返す（読み込み失敗時は空）"""
+        try:
+            keys = [{'item_hash': f"cursor#{source}"} for source in sources]
+            return {item['source']: item['cursor'] for item in self._batch_get(SEEN_NEWS_TABLE, keys)}
+        except Exception as e:
+            logger.error(f"Failed to get news cursors: {str(e)}")
+            return {}
+    
+    def save_seen_news(self, news_items: List[Dict], cursors: Dict[str, str]):
+        """
+        新着ニュースとソースごとのカーソルを既出ニュースインデックスに保存
+        
+        ニュースはNEWS_SEEN_TTL_DAYS後にTTLで削除される。カーソルは削除しない。
+        """
+        timestamp = datetime.utcnow().isoformat()
+        expires_at = int(time.time()) + NEWS_SEEN_TTL_DAYS * 24 * 60 * 60
+        items = [
+            (SEEN_NEWS_TABLE, {
+                'item_hash': news_item['item_hash'],
+                'source': news_item['source'],
+                'title': news_item['title'],
+                'url': news_item['url'],
+                'first_seen': timestamp,
+                'expires_at': expires_at
+            })
+            for news_item in news_items
+        ]
+        items.extend(
+            (SEEN_NEWS_TABLE, {
+                'item_hash': f"cursor#{source}",
+                'source': source,
+                'cursor': cursor,
+                'updated_at': timestamp
+            })
+            for source, cursor in cursors.items()
+        )
+        
+        try:
+            self._put_items(items)
+        except Exception as e:
+            logger.error(f"Failed to save seen news: {str(e)}")
+    
+    def get_llm_cache(self, cache_key: str) -> Optional[Dict]:
+        """LLM応答キャッシュのエントリを取得（取得失敗時はNone）"""
+        try:
+            response = self.dynamodb.Table(LLM_CACHE_TABLE).get_item(Key={'cache_key': cache_key})
+            return response.get('Item')
+        except Exception as e:
+            logger.error(f"Failed to get LLM cache entry: {str(e)}")
+            return None
+    
+    def save_llm_cache(self, entry: Dict):
+        """
+        LLM応答キャッシュのエントリを保存（expires_atのTTLで削除される）
+        
+        早期終了したストリームの受信スレッドからも呼ばれるため、write_group中でもキューに積まず即時に書き込む
+        （実行サイクルの書き込みが破棄されてもキャッシュは残す）。
+        """
+        try:
+            self.dynamodb.Table(LLM_CACHE_TABLE).put_item(Item=entry)
+        except Exception as e:
+            logger.error(f"Failed to save LLM cache entry: {str(e)}")
+            raise
+    
+    def _build_price_history_item(self, symbol: str, timestamp: str, price: float,
+                                  change_24h: float, volume: float) -> Dict:
+        """価格履歴アイテムを作成"""
+        return {
             'symbol': symbol,
             'timestamp': timestamp,
             'price': Decimal(str(price)),
             'change_24h': Decimal(str(change_24h)),
             'volume': Decimal(str(volume))
         }
+    
+    def get_dashboard(self) -> Optional[Dict]:
+        """ダッシュボードを取得（未作成・取得失敗時はNone）"""
+        try:
+            response = self.dynamodb.Table(DASHBOARD_TABLE).get_item(Key={'dashboard_id': 'main'})
+            return response.get('Item')
+        except Exception as e:
+            logger.error(f"Failed to get dashboard: {str(e)}")
+            return None
+    
+    def save_dashboard(self, dashboard: Dict, fencing_token: Optional[int] = None):
+        """
+        ダッシュボードを保存（fencing_tokenは実行ロックのトークン）
         
+        fencing_tokenを渡した場合は、より新しいトークンで書き込まれたダッシュボードを上書きしない。
+        """
+        item = {'dashboard_id': 'main', **_to_decimal(dashboard)}
+        condition = None
+        if fencing_token is not None:
+            item['fencing_token'] = fencing_token
+            condition = {
+                'ConditionExpression': 'attribute_not_exists(fencing_token) OR fencing_token <= :token',
+                'ExpressionAttributeValues': {':token': fencing_token},
+            }
         try:
-            self.price_history_table.put_item(Item=item)
+            self._put(DASHBOARD_TABLE, item, condition)
+            logger.info("Dashboard saved")
         except Exception as e:
-            logger.error(f"Failed to save price history for {symbol}: {str(e)}")
+            logger.error(f"Failed to save dashboard: {str(e)}")
+            raise
+    
+    def get_portfolio_value_history(self, since: datetime) -> Dict[str, float]:
+        """since以降の資産総額を時間単位（各時間の最新値）で取得（ダッシュボードの初期化用）"""
+        history: Dict[str, float] = {}
+        query_kwargs = {
+            'IndexName': 'portfolio_snapshots_by_record_type_timestamp',
+            'KeyConditionExpression': (
+                Key('record_type').eq('portfolio_snapshot') & Key('timestamp').gte(since.isoformat())
+            ),
+            'ProjectionExpression': '#ts, total_value_usdt',
+            'ExpressionAttributeNames': {'#ts': 'timestamp'},
+        }
+        try:
+            while True:
+                response = self.portfolio_snapshots_table.query(**query_kwargs)
+                # timestamp昇順のため、同じ時間の後のものが上書きする
+                for item in response.get('Items', []):
+                    hour = bucket_start(datetime.fromisoformat(item['timestamp']), '1h')
+                    history[hour] = float(item['total_value_usdt'])
+                lek = response.get('LastEvaluatedKey')
+                if not lek:
+                    return history
+                query_kwargs['ExclusiveStartKey'] = lek
+        except Exception as e:
+            logger.error(f"Failed to get portfolio value history: {str(e)}")
+            return history
+    
+    def get_daily_closes(self, symbols: List[str], since: datetime,
+                         until: datetime) -> Dict[str, Dict[str, float]]:
+        """sinceからuntilまでの日足終値をBatchGetItemで取得（シンボル -> 日付 -> 終値）"""
+        days = (until.date() - since.date()).days
+        keys = [
+            {
+                'series_key': series_key(symbol, '1d'),
+                'bucket_start': bucket_start(until - timedelta(days=offset), '1d'),
+            }
+            for symbol in symbols
+            for offset in range(days + 1)
+        ]
+        closes: Dict[str, Dict[str, float]] = {symbol: {} for symbol in symbols}
+        try:
+            for item in self._batch_get(PRICE_ROLLUPS_TABLE, keys):
+                closes[item['symbol']][item['bucket_start']] = float(item['close'])
+        except Exception as e:
+            logger.error(f"Failed to get daily closes: {str(e)}")
+        return closes
+    
+    def _put(self, table_name: str, item: Dict, condition: Optional[Dict] = None):
+        """
+        1件書き込み（write_group中はキューに積む）
+        
+        conditionは {"ConditionExpression", "ExpressionAttributeValues"}。
+        fencing_token付き・条件付きのアイテムはBatchWriteItemではなくTransactWriteItemsで書き込む。
+        """
+        if self._pending_transact is not None and (condition or 'fencing_token' in item):
+            self._pending_transact.append((table_name, item, condition))
+            return
+        if self._pending_writes is not None:
+            self._pending_writes.append((table_name, item))
+            return
+        try:
+            self.dynamodb.Table(table_name).put_item(Item=item, **(condition or {}))
+        except ClientError as e:
+            if condition and e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise LeaseLostError(f"Write to {table_name} rejected by a newer fencing_token")
+            raise
+    
+    def _put_items(self, items: List[Tuple[str, Dict]]):
+        """複数件書き込み（write_group中はキューに積み、それ以外は即時BatchWriteItem）"""
+        if self._pending_writes is not None:
+            self._pending_writes.extend(items)
+            return
+        self._batch_put(items)
+    
+    def _batch_get(self, table_name: str, keys: List[Dict]) -> List[Dict]:
+        """BatchGetItemで読み込み、UnprocessedKeysはバックオフ付きで再取得"""
+        items: List[Dict] = []
+        for start in range(0, len(keys), BATCH_GET_MAX_KEYS):
+            request_items = {table_name: {'Keys': keys[start:start + BATCH_GET_MAX_KEYS]}}
+            
+            for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+                response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                items.extend(response.get('Responses', {}).get(table_name, []))
+                request_items = response.get('UnprocessedKeys') or {}
+                if not request_items:
+                    break
+                if attempt < BATCH_WRITE_MAX_RETRIES:
+                    time.sleep(BATCH_WRITE_BACKOFF_SECONDS * (2 ** attempt))
+            
+            if request_items:
+                raise RuntimeError(f"BatchGetItem left unprocessed keys after retries on {table_name}")
+        return items
+    
+    def _transact_put(self, items: List[Tuple[str, Dict, Optional[Dict]]], lease: Optional[Lease]):
+        """
+        アイテムをTransactWriteItemsで書き込む（leaseを渡した場合は実行ロックの確認を含める）
+        
+        リースを保持していない（引き継がれた）、またはより新しいトークンで書き込まれていた場合はLeaseLostError。
+        """
+        fence = [{'ConditionCheck': fencing_condition(lease)}] if lease is not None else []
+        # 1トランザクションの上限から実行ロックの確認分を除いた件数ずつ書き込む
+        chunk_size = TRANSACT_WRITE_MAX_ITEMS - len(fence)
+        for start in range(0, len(items), chunk_size):
+            transact_items = list(fence)
+            for table_name, item, condition in items[start:start + chunk_size]:
+                transact_items.append({'Put': {'TableName': table_name, 'Item': item, **(condition or {})}})
+            try:
+                # リソースのクライアントはPythonの値をDynamoDBの型に変換して送る
+                self.dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+            except ClientError as e:
+                reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+                if 'ConditionalCheckFailed' in reasons:
+                    raise LeaseLostError("Fenced write rejected: the lease was taken over or a newer fencing_token wrote first")
+                raise
+    
+    def _batch_put(self, items: List[Tuple[str, Dict]]):
+        """BatchWriteItemで書き込み、UnprocessedItemsはバックオフ付きで再送"""
+        for start in range(0, len(items), BATCH_WRITE_MAX_ITEMS):
+            request_items: Dict[str, List[Dict]] = {}
+            for table_name, item in items[start:start + BATCH_WRITE_MAX_ITEMS]:
+                request_items.setdefault(table_name, []).append({'PutRequest': {'Item': item}})
+            
+            for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+                response = self.dynamodb.batch_write_item(RequestItems=request_items)
+                request_items = response.get('UnprocessedItems') or {}
+                if not request_items:
+                    break
+                if attempt < BATCH_WRITE_MAX_RETRIES:
+                    time.sleep(BATCH_WRITE_BACKOFF_SECONDS * (2 ** attempt))
+            
+            if request_items:
+                remaining = sum(len(requests) for requests in request_items.values())
+                raise RuntimeError(f"BatchWriteItem left {remaining} unprocessed items after retries")
+
 
+def _to_decimal(value):
+    """floatをDecimalに変換（DynamoDBに保存するため。dict / listは再帰的に変換）"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _to_decimal(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_decimal(v) for v in value]
+    return value
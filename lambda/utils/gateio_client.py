@@ -1,15 +1,33 @@
 """Gate.io API クライアント"""
-import ccxt
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-from config import GATEIO_API_KEY, GATEIO_API_SECRET, TRADING_SYMBOLS
+from config import (
+    GATEIO_API_KEY, GATEIO_API_SECRET, TRADING_SYMBOLS,
+    TICKER_FETCH_MAX_WORKERS, ORDER_BOOK_FETCH_MAX_WORKERS
+)
 from utils.logger import logger
+from utils.market_cache import MarketCache
 
 
 class GateIOClient:
     """Gate.io API クライアント"""
     
     def __init__(self):
-        self.exchange = ccxt.gateio({
+        # ccxtは読み込みが重いため、クライアント生成時まで遅延インポートする
+        import ccxt
+        
+        self._ccxt = ccxt
+        self.exchange = self._create_exchange()
+        # 直近のget_all_tickersで取得できなかったシンボルとエラー内容
+        self.ticker_failures: Dict[str, str] = {}
+        self.market_cache = MarketCache(self.exchange.id, ccxt.__version__)
+        self._market_refresh_thread: Optional[threading.Thread] = None
+        self._load_markets()
+    
+    def _create_exchange(self):
+        """ccxtの取引所インスタンスを生成"""
+        return self._ccxt.gateio({
             'apiKey': GATEIO_API_KEY,
             'secret': GATEIO_API_SECRET,
             'enableRateLimit': True,
@@ -18,6 +36,45 @@ class GateIOClient:
             }
         })
     
+    def _load_markets(self):
+        """
+        マーケット情報をキャッシュから設定
+        
+        キャッシュがあればload_marketsの全件ダウンロードを行わずに設定し、
+        TTL切れの場合はバックグラウンドで再取得する。キャッシュがない場合のみ同期取得する。
+        """
+        markets, fresh = self.market_cache.load()
+        if markets is None:
+            try:
+                self.refresh_markets()
+            except Exception as e:
+                # 取得できなければccxtが最初のAPI呼び出し時に通常どおり読み込む
+                logger.warning(f"Failed to load markets: {str(e)}")
+            return
+        
+        self.exchange.set_markets(markets)
+        if not fresh:
+            self.refresh_markets_in_background()
+    
+    def refresh_markets(self):
+        """取引所からマーケット情報を再取得し、キャッシュと取引所インスタンスを更新"""
+        markets = self.market_cache.save(self.exchange.load_markets(reload=True))
+        logger.info(f"Market cache refreshed: {len(markets)} markets")
+    
+    def refresh_markets_in_background(self):
+        """マーケット情報の再取得をバックグラウンドで実行（実行中なら何もしない）"""
+        if self._market_refresh_thread and self._market_refresh_thread.is_alive():
+            return
+        
+        def refresh():
+            try:
+                self.refresh_markets()
+            except Exception as e:
+                logger.warning(f"Background market refresh failed: {str(e)}")
+        
+        self._market_refresh_thread = threading.Thread(target=refresh, daemon=True)
+        self._market_refresh_thread.start()
+    
     def get_balance(self) -> Dict[str, float]:
         """残高を取得"""
         try:
@@ -31,26 +88,68 @@ class GateIOClient:
         """ティッカー情報を取得"""
         try:
             ticker = self.exchange.fetch_ticker(symbol)
-            return {
-                "symbol": symbol,
-                "price": ticker['last'],
-                "change_24h": ticker['percentage'],
-                "volume": ticker['quoteVolume']
-            }
+            return self._format_ticker(symbol, ticker)
         except Exception as e:
             logger.error(f"Failed to fetch ticker for {symbol}: {str(e)}")
             raise
     
     def get_all_tickers(self) -> Dict[str, Dict]:
-        """全シンボルのティッカー情報を取得"""
+        """
+        全シンボルのティッカー情報を取得
+        
+        fetch_tickersで1リクエストにまとめて取得し、失敗した場合や
+        応答に含まれないシンボルがある場合は個別取得（並列数制限付き）にフォールバックする。
+        取得できなかったシンボルは self.ticker_failures に記録する。
+        """
+        tickers = {}
+        self.ticker_failures = {}
+        
+        if self.exchange.has.get('fetchTickers'):
+            try:
+                raw_tickers = self.exchange.fetch_tickers(TRADING_SYMBOLS)
+                for symbol in TRADING_SYMBOLS:
+                    if symbol in raw_tickers:
+                        tickers[symbol] = self._format_ticker(symbol, raw_tickers[symbol])
+            except Exception as e:
+                logger.warning(f"Bulk ticker fetch failed, falling back to per-symbol fetch: {str(e)}")
+                tickers = {}
+        
+        missing = [symbol for symbol in TRADING_SYMBOLS if symbol not in tickers]
+        if missing:
+            tickers.update(self._fetch_tickers_individually(missing))
+        
+        # TRADING_SYMBOLSの順序を維持して返す
+        return {symbol: tickers[symbol] for symbol in TRADING_SYMBOLS if symbol in tickers}
+    
+    def _fetch_tickers_individually(self, symbols: List[str]) -> Dict[str, Dict]:
+        """シンボルごとにティッカーを並列取得（失敗はシンボル単位で記録）"""
         tickers = {}
-        for symbol in TRADING_SYMBOLS:
+        
+        def fetch(symbol: str):
             try:
-                tickers[symbol] = self.get_ticker(symbol)
+                return symbol, self._format_ticker(symbol, self.exchange.fetch_ticker(symbol)), None
             except Exception as e:
-                logger.warning(f"Failed to fetch ticker for {symbol}: {str(e)}")
+                return symbol, None, str(e)
+        
+        max_workers = max(1, min(TICKER_FETCH_MAX_WORKERS, len(symbols)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for symbol, ticker, error in executor.map(fetch, symbols):
+                if ticker is not None:
+                    tickers[symbol] = ticker
+                else:
+                    logger.warning(f"Failed to fetch ticker for {symbol}: {error}")
+                    self.ticker_failures[symbol] = error
         return tickers
     
+    def _format_ticker(self, symbol: str, ticker: Dict) -> Dict:
+        """ccxtのティッカーを共通形式に変換"""
+        return {
+            "symbol": symbol,
+            "price": ticker['last'],
+            "change_24h": ticker['percentage'],
+            "volume": ticker['quoteVolume']
+        }
+    
     def get_order_book(self, symbol: str, limit: int = 5) -> Dict:
         """オーダーブックを取得"""
         try:
@@ -71,6 +170,15 @@ class GateIOClient:
             logger.error(f"Failed to fetch order book for {symbol}: {str(e)}")
             return None
     
+    def get_order_books(self, symbols: List[str], limit: int = 5) -> Dict[str, Optional[Dict]]:
+        """複数シンボルのオーダーブックを並列取得（取得失敗はNone）"""
+        if not symbols:
+            return {}
+        max_workers = max(1, min(ORDER_BOOK_FETCH_MAX_WORKERS, len(symbols)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            orderbooks = executor.map(lambda symbol: self.get_order_book(symbol, limit), symbols)
+            return dict(zip(symbols, orderbooks))
+    
     def create_market_order(self, symbol: str, side: str, amount: float) -> Optional[Dict]:
         """成行注文を発注"""
         try:
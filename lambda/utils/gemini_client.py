@@ -1,32 +1,30 @@
 """Gemini API クライアント"""
-import google.generativeai as genai
-from typing import Dict, Tuple
-from config import GEMINI_API_KEY
-from utils.logger import logger
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from config import (
+    GEMINI_API_KEY, GEMINI_MODEL, GEMINI_CONTEXT_CACHE_ENABLED, GEMINI_CONTEXT_CACHE_MIN_TOKENS,
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS, GEMINI_CONTEXT_CACHE_REFRESH_MARGIN_SECONDS,
+    GEMINI_STREAMING_ENABLED, GEMINI_STREAM_EARLY_EXIT_CHARS, GEMINI_STREAM_DRAIN_WAIT_SECONDS,
+    LLM_CACHE_REPLAY_ONLY, MIN_CONFIDENCE_SCORE, TRADING_SYMBOLS
+)
+from utils.llm_cache import LLMResponseCache, cache_key
+from utils.logger import logger, log_to_json
 
+T = TypeVar("T")
 
-class GeminiClient:
-    """Gemini 3 Flash クライアント"""
-    
-    def __init__(self):
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-3-flash-preview')
-    
-    def analyze_market(self, news_text: str, price_data: Dict) -> Tuple[int, str]:
-        """
-        市場分析を実行
-        
-        Returns:
-            (confidence_score, reasoning_text)
-        """
-        prompt = f"""
-あなたは金融市場の分析エキスパートです。以下の情報を基に、RWA（現実資産トークン）のポートフォリオ最適化の判断を行ってください。
-
-## 最新ニュース
-{news_text}
+# 目標資産配分の対象（取引対象資産 + 現金）
+ALLOCATION_ASSETS = TRADING_SYMBOLS + ["USDT"]
 
-## 現在の価格情報
-{self._format_price_data(price_data)}
+# 市場分析の静的システム指示（毎サイクル同一のためコンテキストキャッシュの対象）
+MARKET_ANALYSIS_INSTRUCTION = """
+あなたは金融市場の分析エキスパートです。与えられる最新ニュースと現在の価格情報を基に、RWA（現実資産トークン）のポートフォリオ最適化の判断を行ってください。
 
 ## タスク
 1. ニュースの内容と現在の価格/騰落率を比較分析してください
@@ -38,35 +36,15 @@ class GeminiClient:
 
 ## 出力形式
 以下のJSON形式で回答してください：
-{{
+{
     "confidence_score": <1-10の整数>,
     "reasoning": "<判断根拠のテキスト説明>"
-}}
+}
 """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            result = self._parse_response(response.text)
-            return result["confidence_score"], result["reasoning"]
-        except Exception as e:
-            logger.error(f"Failed to analyze market with Gemini: {str(e)}")
-            return 0, f"分析エラー: {str(e)}"
-    
-    def optimize_portfolio(self, reasoning: str, current_allocations: Dict[str, float]) -> Dict[str, float]:
-        """
-        ポートフォリオ最適化
-        
-        Returns:
-            目標資産比率の辞書 (例: {{"PAXG/USDT": 0.6, "USDT": 0.4}})
-        """
-        prompt = f"""
-あなたはポートフォリオ最適化のエキスパートです。以下の情報を基に、最適な資産配分を決定してください。
-
-## 分析結果
-{reasoning}
 
-## 現在の資産配分
-{self._format_allocations(current_allocations)}
+# ポートフォリオ最適化の静的システム指示（取引対象資産と出力形式を含む）
+PORTFOLIO_OPTIMIZATION_INSTRUCTION = """
+あなたはポートフォリオ最適化のエキスパートです。与えられる分析結果と現在の資産配分を基に、最適な資産配分を決定してください。
 
 ## 取引対象資産
 - PAXG/USDT (Gold)
@@ -85,7 +63,7 @@ class GeminiClient:
 
 ## 出力形式
 以下のJSON形式で回答してください：
-{{
+{
     "PAXG/USDT": <0.0-1.0の数値>,
     "SLVON/USDT": <0.0-1.0の数値>,
     "SPYON/USDT": <0.0-1.0の数値>,
@@ -95,19 +73,516 @@ class GeminiClient:
     "MSTRX/USDT": <0.0-1.0の数値>,
     "ONDO/USDT": <0.0-1.0の数値>,
     "USDT": <0.0-1.0の数値>
-}}
+}
 合計が1.0になることを確認してください。
+"""
+
+# 市場分析と目標資産配分を1回で求める場合の静的システム指示
+MARKET_DECISION_INSTRUCTION = """
+あなたは金融市場の分析とポートフォリオ最適化のエキスパートです。与えられる最新ニュース・現在の価格情報・現在の資産配分を基に、RWA（現実資産トークン）のポートフォリオ最適化の判断と、最適な資産配分の決定を行ってください。
+
+## 取引対象資産
+- PAXG/USDT (Gold)
+- SLVON/USDT (Silver - iShares Silver Trust Ondo Tokenized)
+- SPYON/USDT (S&P500)
+- QQQON/USDT (NASDAQ)
+- TSLAX/USDT (Tesla)
+- NVDAX/USDT (NVIDIA)
+- MSTRX/USDT (MicroStrategy)
+- ONDO/USDT (US Treasury)
+- USDT (現金)
+
+## タスク
+1. ニュースの内容と現在の価格/騰落率を比較分析してください
+2. Confidence Score (1-10) を算出してください
+   - 1-3: 情報不足、判断不可
+   - 4-7: 弱いシグナル、アクション不要
+   - 8-10: 強いシグナル、アクション検討
+3. 判断根拠を reasoning に明確に説明してください
+4. 各資産の目標配分比率を target_allocations に決定してください（合計1.0）
+   - リスクを分散し、ニュースに基づいた合理的な配分にしてください
+   - Confidence Scoreが8未満の場合は現在の資産配分をそのまま返してください
+"""
+
+# MARKET_DECISION_INSTRUCTIONの応答スキーマ（JSONモードで出力を強制する）
+MARKET_DECISION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "confidence_score": {"type": "integer", "description": "1-10の整数"},
+        "reasoning": {"type": "string", "description": "判断根拠のテキスト説明"},
+        "target_allocations": {
+            "type": "object",
+            "description": "各資産の目標配分比率（0.0-1.0、合計1.0）",
+            "properties": {asset: {"type": "number"} for asset in ALLOCATION_ASSETS},
+            "required": ALLOCATION_ASSETS,
+        },
+    },
+    "required": ["confidence_score", "reasoning", "target_allocations"],
+}
+
+
+@dataclass
+class MarketDecision:
+    """市場分析（とポートフォリオ最適化）の結果"""
+    confidence_score: int
+    reasoning: str
+    # 目標資産比率（合計1.0）。求めていない・取得できなかった場合はNone
+    target_allocations: Optional[Dict[str, float]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MarketDecision":
+        """
+        構造化出力を検証して生成
+        
+        confidence_score・reasoningが不正な場合はValueError。target_allocationsが不正な場合は
+        スコアと判断根拠を残して target_allocations=None とする（最適化を別途呼び出して求める）。
+        """
+        confidence_score = data.get("confidence_score")
+        if isinstance(confidence_score, bool) or not isinstance(confidence_score, (int, float)) \
+                or not 1 <= confidence_score <= 10:
+            raise ValueError(f"Invalid confidence_score: {confidence_score!r}")
+        reasoning = data.get("reasoning")
+        if not isinstance(reasoning, str) or not reasoning.strip():
+            raise ValueError("Missing reasoning")
+        
+        return cls(
+            confidence_score=int(confidence_score),
+            reasoning=reasoning,
+            target_allocations=normalize_allocations(data.get("target_allocations"))
+        )
+
+
+def normalize_allocations(allocations: Any) -> Optional[Dict[str, float]]:
+    """
+    目標資産配分を検証し、合計1.0に正規化
+    
+    対象外の資産は無視する。配分がない・合計が0・数値でないか負の値を含む場合はNone
+    （不正な資産だけを除いて正規化すると残りの資産に配分が偏るため、配分全体を破棄する）。
+    """
+    if not isinstance(allocations, dict):
+        return None
+    
+    normalized = {}
+    for asset in ALLOCATION_ASSETS:
+        if asset not in allocations:
+            continue
+        try:
+            ratio = float(allocations[asset])
+        except (TypeError, ValueError):
+            ratio = None
+        if ratio is None or not math.isfinite(ratio) or ratio < 0:
+            logger.warning(f"Discarding target allocations: invalid ratio for {asset}: {allocations[asset]!r}")
+            return None
+        normalized[asset] = ratio
+    
+    total = sum(normalized.values())
+    if total <= 0:
+        return None
+    return {asset: ratio / total for asset, ratio in normalized.items()}
+
+
+class ScoreStreamParser:
+    """
+    ストリーミング応答からconfidence_scoreとreasoningを逐次抽出
+    
+    confidence_scoreはreasoningより先に出力される（出力形式・スキーマのプロパティ順）。
+    """
+    
+    SCORE_PATTERN = re.compile(r'"confidence_score"\s*:\s*(\d+)(?=\s*[,}])')
+    REASONING_PATTERN = re.compile(r'"reasoning"\s*:\s*"')
+    
+    def __init__(self):
+        self.text = ""
+        self.score: Optional[int] = None
+        # ストリーム開始からconfidence_scoreが確定するまでの時間
+        self.time_to_score_ms: Optional[float] = None
+        self._started_at = time.perf_counter()
+    
+    def feed(self, chunk: str) -> bool:
+        """チャンクを追加し、このチャンクでconfidence_scoreが確定した場合にTrueを返す"""
+        self.text += chunk
+        if self.score is not None:
+            return False
+        match = self.SCORE_PATTERN.search(self.text)
+        if match is None:
+            return False
+        self.score = int(match.group(1))
+        self.time_to_score_ms = round((time.perf_counter() - self._started_at) * 1000, 1)
+        return True
+    
+    def reasoning(self) -> str:
+        """これまでに受信したreasoning（途中までの場合もある）"""
+        match = self.REASONING_PATTERN.search(self.text)
+        if match is None:
+            return ""
+        raw = self.text[match.end():]
+        end = re.search(r'(?<!\\)"', raw)
+        if end:
+            raw = raw[:end.start()]
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            # エスケープの途中で切れている場合はそのまま返す
+            return raw
+    
+    def reasoning_excerpt(self) -> str:
+        """早期終了時に記録する判断根拠の抜粋"""
+        return self.reasoning()[:GEMINI_STREAM_EARLY_EXIT_CHARS] + "…（以下省略）"
+
+
+# コンテキストキャッシュのハンドル（ウォームスタート間、クライアント再生成後も共有）
+# 表示名 -> (CachedContent。作成できなかった場合はNone, 有効期限のUNIX時刻)
+_context_caches: Dict[str, Tuple[Optional[Any], float]] = {}
+_context_caches_lock = threading.Lock()
+
+
+class GeminiClient:
+    """Gemini 3 Flash クライアント"""
+    
+    def __init__(self, response_cache: Optional[LLMResponseCache] = None):
+        # google.generativeaiは読み込みが重いため、クライアント生成時まで遅延インポートする
+        import google.generativeai as genai
+        
+        genai.configure(api_key=GEMINI_API_KEY)
+        self._genai = genai
+        # 表示名 -> システム指示付きモデル（コンテキストキャッシュを使わない場合）
+        self._instruction_models: Dict[str, Any] = {}
+        # 同一入力の応答を再利用するキャッシュ（Noneの場合は毎回生成）
+        self.response_cache = response_cache
+        # 呼び出し名 -> トークン使用量と応答キャッシュのhit/miss（pop_usageで取り出すまで保持）
+        self.usage: Dict[str, Dict[str, Any]] = {}
+        # 早期終了後に残りの応答を受信しているスレッド（wait_for_drainsで短時間だけ完了を待つ）
+        self._drains: List[threading.Thread] = []
+    
+    def analyze_market(self, news_text: str, price_data: Dict,
+                       on_score: Optional[Callable[[int], None]] = None) -> Tuple[int, str]:
+        """
+        市場分析を実行
+        
+        on_scoreを渡した場合はストリーミングで生成し、confidence_scoreが確定した時点で呼び出す
+        （_generateを参照）。
+        
+        Returns:
+            (confidence_score, reasoning_text)
+        """
+        prompt = f"""
+## 最新ニュース
+{news_text}
+
+## 現在の価格情報
+{self._format_price_data(price_data)}
+"""
+        
+        try:
+            result = self._generate(
+                "analyze_market", MARKET_ANALYSIS_INSTRUCTION, prompt, self._parse_response,
+                on_score=on_score,
+                early_exit=lambda parser: {
+                    "confidence_score": parser.score,
+                    "reasoning": parser.reasoning_excerpt()
+                }
+            )
+            return result["confidence_score"], result["reasoning"]
+        except Exception as e:
+            logger.error(f"Failed to analyze market with Gemini: {str(e)}")
+            return 0, f"分析エラー: {str(e)}"
+    
+    def optimize_portfolio(self, reasoning: str, current_allocations: Dict[str, float]) -> Dict[str, float]:
+        """
+        ポートフォリオ最適化
+        
+        Returns:
+            目標資産比率の辞書 (例: {{"PAXG/USDT": 0.6, "USDT": 0.4}})
+        """
+        prompt = f"""
+## 分析結果
+{reasoning}
+
+## 現在の資産配分
+{self._format_allocations(current_allocations)}
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            allocations = self._parse_allocations(response.text)
+            allocations = self._generate(
+                "optimize_portfolio", PORTFOLIO_OPTIMIZATION_INSTRUCTION, prompt, self._parse_allocations
+            )
             return allocations
         except Exception as e:
             logger.error(f"Failed to optimize portfolio with Gemini: {str(e)}")
             # エラー時は現在の配分を維持
             return current_allocations
     
+    def decide(self, news_text: str, price_data: Dict,
+               current_allocations: Dict[str, float],
+               on_score: Optional[Callable[[int], None]] = None) -> MarketDecision:
+        """
+        市場分析と目標資産配分の決定を1回の構造化出力呼び出しで実行
+        
+        analyze_market → optimize_portfolio の2回の直列呼び出しを置き換える。
+        応答はresponse_schemaでJSONに固定し、MarketDecisionとして検証する。
+        on_scoreを渡した場合はストリーミングで生成する（_generateを参照）。
+        """
+        prompt = f"""
+## 最新ニュース
+{news_text}
+
+## 現在の価格情報
+{self._format_price_data(price_data)}
+
+## 現在の資産配分
+{self._format_allocations(current_allocations)}
+"""
+        
+        try:
+            return self._generate(
+                "decide",
+                MARKET_DECISION_INSTRUCTION,
+                prompt,
+                lambda text: MarketDecision.from_dict(json.loads(text)),
+                generation_config={
+                    "response_mime_type": "application/json",
+                    "response_schema": MARKET_DECISION_SCHEMA,
+                },
+                on_score=on_score,
+                early_exit=lambda parser: MarketDecision(parser.score, parser.reasoning_excerpt())
+            )
+        except Exception as e:
+            logger.error(f"Failed to get market decision from Gemini: {str(e)}")
+            return MarketDecision(0, f"分析エラー: {str(e)}")
+    
+    def pop_usage(self) -> Dict[str, Dict[str, Any]]:
+        """前回取り出して以降の呼び出しごとのトークン使用量を返し、クリアする"""
+        usage, self.usage = self.usage, {}
+        return usage
+    
+    def wait_for_drains(self, timeout: float = GEMINI_STREAM_DRAIN_WAIT_SECONDS):
+        """
+        早期終了したストリームの残りの受信（応答キャッシュへの保存）の完了を短時間だけ待つ
+        
+        Lambdaは応答を返すと実行環境を凍結するため、実行サイクルの終了前に呼ぶ。
+        早期終了で実行時間を短くするため生成全体の完了までは待たず、timeoutを過ぎた分は
+        次のウォームスタートで受信を再開するか、凍結中に接続が切れた場合はキャッシュへの保存を諦める。
+        """
+        deadline = time.monotonic() + timeout
+        drains, self._drains = self._drains, []
+        for thread in drains:
+            thread.join(max(deadline - time.monotonic(), 0))
+            if thread.is_alive():
+                logger.info(f"Gemini stream {thread.name} still receiving after {timeout}s, not waiting")
+    
+    def _generate(self, name: str, instruction: str, prompt: str, parse: Callable[[str], T],
+                  generation_config: Optional[Dict] = None,
+                  on_score: Optional[Callable[[int], None]] = None,
+                  early_exit: Optional[Callable[[ScoreStreamParser], T]] = None) -> T:
+        """
+        システム指示付きで生成し、parseした結果を返す
+        
+        応答キャッシュにparse可能な応答があれば生成せずに返す。生成した応答はparseに成功した場合のみ保存する。
+        GEMINI_STREAMING_ENABLEDでon_scoreを渡した場合はストリーミングで生成し、
+        confidence_scoreが確定した時点でon_scoreを呼ぶ。スコアがMIN_CONFIDENCE_SCORE未満であれば
+        判断根拠をGEMINI_STREAM_EARLY_EXIT_CHARS文字受信した時点で打ち切り、early_exitの結果を返す。
+        打ち切った応答は残りをバックグラウンドで受信し、完了した応答を応答キャッシュに保存する（_drain_and_cache）。
+        キャッシュ済み/未キャッシュのトークン数と応答キャッシュのhit/missを記録する。
+        コンテキストキャッシュが使えない場合もシステム指示は先頭に固定されるため、
+        Gemini側の暗黙的キャッシュの対象になる（cached_tokensに計上される）。
+        """
+        key = None
+        if self.response_cache is not None:
+            key = cache_key(GEMINI_MODEL, instruction, prompt, generation_config)
+            start = time.perf_counter()
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                try:
+                    result = parse(cached['response_text'])
+                    self.usage[name] = self._cache_hit_usage(time.perf_counter() - start)
+                    log_to_json("INFO", f"Gemini {name} response cache hit", cache_key=key, **self.usage[name])
+                    return result
+                except Exception as e:
+                    logger.warning(f"Ignoring unparsable cached response for {name}: {str(e)}")
+            if LLM_CACHE_REPLAY_ONLY:
+                raise RuntimeError(f"No cached response for {name} ({key}) in replay-only mode")
+        
+        display_name = self._context_cache_name(name, instruction)
+        model, cache_name = self._model_for(display_name, instruction)
+        stream = GEMINI_STREAMING_ENABLED and on_score is not None
+        start = time.perf_counter()
+        try:
+            text, response, parser, exited = self._run_model(model, prompt, generation_config, stream,
+                                                             on_score, early_exit is not None)
+        except Exception as e:
+            if cache_name is None:
+                raise
+            # キャッシュが外部で削除・失効していた場合はハンドルを破棄して指示付きで再実行
+            logger.warning(f"Gemini context cache {cache_name} unavailable, retrying without it: {str(e)}")
+            with _context_caches_lock:
+                _context_caches.pop(display_name, None)
+            model, cache_name = self._instruction_model(display_name, instruction), None
+            start = time.perf_counter()
+            text, response, parser, exited = self._run_model(model, prompt, generation_config, stream,
+                                                             on_score, early_exit is not None)
+        
+        # 早期終了した場合は使用量が確定しないため0として記録する
+        usage = self._usage(None if exited else response, cache_name, time.perf_counter() - start)
+        usage['response_cache'] = 'miss' if key else None
+        if parser is not None:
+            usage['time_to_score_ms'] = parser.time_to_score_ms
+            usage['early_exit'] = exited
+        self.usage[name] = usage
+        log_to_json("INFO", f"Gemini {name} token usage", **usage)
+        
+        if exited:
+            if key:
+                self._drain_and_cache(name, response, cache_name, start, parse, key,
+                                      instruction, prompt, generation_config)
+            return early_exit(parser)
+        result = parse(text)
+        if key:
+            self.response_cache.put(
+                key, GEMINI_MODEL, name, instruction, prompt, generation_config, text, usage
+            )
+        return result
+    
+    def _drain_and_cache(self, name: str, response: Any, cache_name: Optional[str], start: float,
+                         parse: Callable[[str], Any], key: str, instruction: str, prompt: str,
+                         generation_config: Optional[Dict]):
+        """早期終了したストリームの残りをバックグラウンドで受信し、parseできれば応答キャッシュに保存"""
+        def drain():
+            try:
+                response.resolve()
+                text = response.text
+                parse(text)
+                usage = self._usage(response, cache_name, time.perf_counter() - start)
+                usage['response_cache'] = 'miss'
+                self.response_cache.put(
+                    key, GEMINI_MODEL, name, instruction, prompt, generation_config, text, usage
+                )
+                log_to_json("INFO", f"Gemini {name} stream drained", cache_key=key, **usage)
+            except Exception as e:
+                logger.warning(f"Failed to cache drained Gemini {name} stream: {str(e)}")
+        
+        thread = threading.Thread(target=drain, name=f"gemini-drain-{name}", daemon=True)
+        thread.start()
+        self._drains.append(thread)
+    
+    def _run_model(self, model: Any, prompt: str, generation_config: Optional[Dict], stream: bool,
+                   on_score: Optional[Callable[[int], None]], allow_early_exit: bool
+                   ) -> Tuple[str, Any, Optional[ScoreStreamParser], bool]:
+        """
+        モデルを呼び出し (応答テキスト, 応答, ストリーミング時のパーサ, 早期終了したか) を返す
+        """
+        if not stream:
+            response = model.generate_content(prompt, generation_config=generation_config)
+            return response.text, response, None, False
+        
+        response = model.generate_content(prompt, generation_config=generation_config, stream=True)
+        parser = ScoreStreamParser()
+        for chunk in response:
+            try:
+                chunk_text = chunk.text
+            except ValueError:
+                # テキストを含まないチャンク（終了理由のみ等）
+                continue
+            if parser.feed(chunk_text):
+                log_to_json("INFO", "Gemini confidence score received",
+                            confidence_score=parser.score, time_to_score_ms=parser.time_to_score_ms)
+                on_score(parser.score)
+            if (allow_early_exit and parser.score is not None and parser.score < MIN_CONFIDENCE_SCORE
+                    and len(parser.reasoning()) >= GEMINI_STREAM_EARLY_EXIT_CHARS):
+                return parser.text, response, parser, True
+        return parser.text, response, parser, False
+    
+    def _context_cache_name(self, name: str, instruction: str) -> str:
+        """モデルと指示内容から決まるキャッシュの表示名（指示を変更すると別キャッシュになる）"""
+        digest = hashlib.sha256(f"{GEMINI_MODEL}:{instruction}".encode()).hexdigest()[:16]
+        return f"rwa-{name}-{digest}"
+    
+    def _model_for(self, display_name: str, instruction: str) -> Tuple[Any, Optional[str]]:
+        """
+        (モデル, 使用するコンテキストキャッシュ名) を返す
+        
+        1トークンは1文字以上に相当するため、文字数が最小トークン数未満の指示は
+        キャッシュを作成できないとみなし、一覧取得・作成のAPI呼び出しを行わない。
+        """
+        if not GEMINI_CONTEXT_CACHE_ENABLED or len(instruction) < GEMINI_CONTEXT_CACHE_MIN_TOKENS:
+            return self._instruction_model(display_name, instruction), None
+        
+        with _context_caches_lock:
+            cached, expires_at = _context_caches.get(display_name, (None, 0.0))
+            if time.time() >= expires_at - GEMINI_CONTEXT_CACHE_REFRESH_MARGIN_SECONDS:
+                cached = self._open_context_cache(display_name, instruction)
+                if cached is not None:
+                    expires_at = cached.expire_time.timestamp()
+                else:
+                    # 作成できなかった場合（最小トークン数未満など）は有効期間中は再試行しない
+                    expires_at = time.time() + GEMINI_CONTEXT_CACHE_TTL_SECONDS
+                _context_caches[display_name] = (cached, expires_at)
+        
+        if cached is None:
+            return self._instruction_model(display_name, instruction), None
+        return self._genai.GenerativeModel.from_cached_content(cached), cached.name
+    
+    def _open_context_cache(self, display_name: str, instruction: str) -> Optional[Any]:
+        """同じ表示名の既存キャッシュを延長して再利用し、なければ作成する"""
+        caching = self._genai.caching
+        ttl = timedelta(seconds=GEMINI_CONTEXT_CACHE_TTL_SECONDS)
+        try:
+            # コールドスタート時も他の実行環境が作成したキャッシュを再利用する
+            for existing in caching.CachedContent.list():
+                if existing.display_name != display_name:
+                    continue
+                remaining = (existing.expire_time - datetime.now(timezone.utc)).total_seconds()
+                if remaining < GEMINI_CONTEXT_CACHE_REFRESH_MARGIN_SECONDS:
+                    existing.update(ttl=ttl)
+                logger.info(f"Reusing Gemini context cache {existing.name} ({display_name})")
+                return existing
+            
+            cached = caching.CachedContent.create(
+                model=f"models/{GEMINI_MODEL}",
+                display_name=display_name,
+                system_instruction=instruction,
+                ttl=ttl
+            )
+            logger.info(f"Created Gemini context cache {cached.name} ({display_name})")
+            return cached
+        except Exception as e:
+            logger.warning(f"Gemini context cache unavailable for {display_name}: {str(e)}")
+            return None
+    
+    def _instruction_model(self, display_name: str, instruction: str) -> Any:
+        """システム指示付きのモデル（コンテキストキャッシュなし）"""
+        if display_name not in self._instruction_models:
+            self._instruction_models[display_name] = self._genai.GenerativeModel(
+                GEMINI_MODEL,
+                system_instruction=instruction
+            )
+        return self._instruction_models[display_name]
+    
+    def _usage(self, response: Any, cache_name: Optional[str], elapsed: float) -> Dict[str, Any]:
+        """応答のusage_metadataからトークン使用量を集計"""
+        metadata = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(metadata, 'prompt_token_count', 0) or 0
+        cached_tokens = getattr(metadata, 'cached_content_token_count', 0) or 0
+        return {
+            'context_cache': cache_name,
+            'prompt_tokens': prompt_tokens,
+            'cached_tokens': cached_tokens,
+            'uncached_tokens': prompt_tokens - cached_tokens,
+            'output_tokens': getattr(metadata, 'candidates_token_count', 0) or 0,
+            'latency_ms': round(elapsed * 1000, 1),
+        }
+    
+    def _cache_hit_usage(self, elapsed: float) -> Dict[str, Any]:
+        """応答キャッシュから返した呼び出しの使用量（トークンは消費しない）"""
+        return {
+            'context_cache': None,
+            'response_cache': 'hit',
+            'prompt_tokens': 0,
+            'cached_tokens': 0,
+            'uncached_tokens': 0,
+            'output_tokens': 0,
+            'latency_ms': round(elapsed * 1000, 1),
+        }
+    
     def _format_price_data(self, price_data: Dict) -> str:
         """価格データをフォーマット"""
         lines = []
@@ -122,18 +597,26 @@ class GeminiClient:
             lines.append(f"{symbol}: {ratio*100:.1f}%")
         return "\n".join(lines)
     
+    def _extract_json(self, text: str) -> Optional[Dict]:
+        """応答テキスト中の最初のJSONオブジェクトを抽出（ネストしたオブジェクトにも対応）"""
+        decoder = json.JSONDecoder()
+        start = text.find('{')
+        while start != -1:
+            try:
+                value, _ = decoder.raw_decode(text, start)
+                if isinstance(value, dict):
+                    return value
+            except ValueError:
+                pass
+            start = text.find('{', start + 1)
+        return None
+    
     def _parse_response(self, text: str) -> Dict:
         """Geminiの応答をパース"""
-        import json
-        import re
-        
         # JSON部分を抽出
-        json_match = re.search(r'\{[^}]+\}', text, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except:
-                pass
+        parsed = self._extract_json(text)
+        if parsed is not None:
+            return parsed
         
         # フォールバック: 数値を抽出
         score_match = re.search(r'"confidence_score":\s*(\d+)', text)
@@ -146,16 +629,10 @@ class GeminiClient:
     
     def _parse_allocations(self, text: str) -> Dict[str, float]:
         """ポートフォリオ配分をパース"""
-        import json
-        import re
-        
         # JSON部分を抽出
-        json_match = re.search(r'\{[^}]+\}', text, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except:
-                pass
+        parsed = self._extract_json(text)
+        if parsed is not None:
+            return parsed
         
         # フォールバック: キーと値のペアを抽出
         allocations = {}
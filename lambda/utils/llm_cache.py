@@ -0,0 +1,102 @@
+"""LLM応答キャッシュ"""
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+from config import LLM_CACHE_MEMORY_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS
+from utils.dynamodb_client import DynamoDBClient
+from utils.logger import logger
+
+# メモリ上のLRU（ウォームスタート間、クライアント再生成後も共有）
+# キャッシュキー -> エントリ
+_memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    キャッシュキー用にプロンプトを正規化
+    
+    Unicode正規化（NFKC）、行末空白の除去、連続する空行の圧縮、前後の空白除去を行う。
+    """
+    text = unicodedata.normalize("NFKC", text)
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+def cache_key(model: str, instruction: str, prompt: str,
+              generation_config: Optional[Dict] = None) -> str:
+    """モデル名・システム指示・正規化したプロンプト・生成設定から決まるキャッシュキー"""
+    payload = json.dumps({
+        "model": model,
+        "instruction": normalize_prompt(instruction),
+        "prompt": normalize_prompt(prompt),
+        "generation_config": generation_config or {},
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    LLM応答キャッシュ（DynamoDB + メモリ上のLRU）
+    
+    エントリには正規化したプロンプト・生成設定・応答テキストをそのまま保存するため、
+    キャッシュキーから同じ応答を再現でき、テストでの再生にも使える。
+    読み書きの失敗はキャッシュミスとして扱い、生成は継続する。
+    """
+    
+    def __init__(self, dynamodb_client: DynamoDBClient):
+        self.dynamodb_client = dynamodb_client
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """エントリを取得（メモリ → DynamoDBの順。期限切れはNone）"""
+        with _memory_lock:
+            entry = _memory.get(key)
+            if entry is not None:
+                if entry['expires_at'] > time.time():
+                    _memory.move_to_end(key)
+                    return entry
+                del _memory[key]
+        
+        entry = self.dynamodb_client.get_llm_cache(key)
+        # TTLによる削除は遅れるため期限を確認する
+        if entry is None or int(entry['expires_at']) <= time.time():
+            return None
+        self._remember(key, entry)
+        return entry
+    
+    def put(self, key: str, model: str, call: str, instruction: str, prompt: str,
+            generation_config: Optional[Dict], response_text: str,
+            usage: Dict[str, Any]) -> Dict[str, Any]:
+        """応答を保存し、保存したエントリを返す"""
+        entry = {
+            'cache_key': key,
+            'model': model,
+            'call': call,
+            'instruction_hash': hashlib.sha256(normalize_prompt(instruction).encode()).hexdigest(),
+            'prompt': normalize_prompt(prompt),
+            'generation_config': json.dumps(generation_config or {}, sort_keys=True, ensure_ascii=False),
+            'response_text': response_text,
+            'usage': {k: v for k, v in usage.items() if isinstance(v, int)},
+            'created_at': datetime.utcnow().isoformat(),
+            'expires_at': int(time.time()) + LLM_CACHE_TTL_SECONDS,
+        }
+        self._remember(key, entry)
+        try:
+            self.dynamodb_client.save_llm_cache(entry)
+        except Exception as e:
+            logger.warning(f"Failed to save LLM response cache {key}: {str(e)}")
+        return entry
+    
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        """メモリ上のLRUに追加（上限を超えたら古いものから破棄）"""
+        with _memory_lock:
+            _memory[key] = entry
+            _memory.move_to_end(key)
+            while len(_memory) > LLM_CACHE_MEMORY_MAX_ENTRIES:
+                _memory.popitem(last=False)
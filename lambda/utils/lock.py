@@ -1,41 +1,246 @@
-"""実行ロック管理"""
+"""実行ロック管理（リース方式）"""
+import threading
+import time
+import uuid
 import boto3
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
 from botocore.exceptions import ClientError
-from config import EXECUTION_LOCKS_TABLE, AWS_REGION
-from utils.logger import logger
+from config import (
+    EXECUTION_LOCKS_TABLE, AWS_REGION, LOCK_LEASE_SECONDS, LOCK_RENEW_INTERVAL_SECONDS,
+    LOCK_ACQUIRE_WAIT_SECONDS, LOCK_ACQUIRE_POLL_SECONDS
+)
+from utils.logger import logger, log_to_json
 
 dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
 lock_table = dynamodb.Table(EXECUTION_LOCKS_TABLE)
 
+LOCK_ID = 'main_execution'
 
-def acquire_lock() -> bool:
-    """実行ロックを取得"""
+
+class LeaseLostError(Exception):
+    """リースを失った（期限切れ後に他の実行に引き継がれた、または更新できなかった）"""
+
+
+@dataclass
+class Lease:
+    """取得したリース"""
+    owner: str
+    # 取得のたびに単調増加する値。下流の書き込みに付与し、古い保持者の書き込みを拒否する（fencing_condition）
+    fencing_token: int
+    lease_expires_at: int
+    # 取得までの待ち時間と、期限切れのリースを引き継いだかどうか
+    wait_ms: float
+    taken_over: bool
+    
+    def metrics(self) -> dict:
+        """実行結果に含めるロックのメトリクス"""
+        return {
+            'fencing_token': self.fencing_token,
+            'wait_ms': self.wait_ms,
+            'taken_over': self.taken_over,
+        }
+
+
+def acquire_lock(owner: Optional[str] = None,
+                 wait_seconds: float = LOCK_ACQUIRE_WAIT_SECONDS) -> Optional[Lease]:
+    """
+    実行ロック（リース）を取得
+    
+    保持者がいない、またはリース期限（lease_expires_at）を過ぎている場合に取得できる。
+    DynamoDBのTTLによる削除は数時間遅れることがあるため、期限切れの判定は条件式で行う。
+    ロックアイテムは削除せず保持者だけを外すため、fencing_tokenは取得のたびに単調増加する。
+    保持中の場合はwait_secondsまで待って再試行し、取得できなければスキップとして記録してNoneを返す。
+    """
+    owner = owner or str(uuid.uuid4())
+    started = time.perf_counter()
+    
+    while True:
+        now = int(time.time())
+        try:
+            response = lock_table.update_item(
+                Key={'lock_id': LOCK_ID},
+                # 旧方式のTTL属性（expires_at）は外し、ロックアイテムがTTLで削除されないようにする
+                UpdateExpression=(
+                    'SET #owner = :owner, locked_at = :locked_at, lease_expires_at = :lease_expires_at, '
+                    'consecutive_skips = :zero '
+                    'ADD fencing_token :one, acquired_count :one '
+                    'REMOVE expires_at'
+                ),
+                ConditionExpression='attribute_not_exists(#owner) OR lease_expires_at < :now',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={
+                    ':owner': owner,
+                    ':locked_at': datetime.utcnow().isoformat(),
+                    ':lease_expires_at': now + LOCK_LEASE_SECONDS,
+                    ':now': now,
+                    ':zero': 0,
+                    ':one': 1,
+                },
+                ReturnValues='UPDATED_OLD'
+            )
+            break
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                logger.error(f"Failed to acquire lock: {str(e)}")
+                raise
+        
+        if time.perf_counter() - started + LOCK_ACQUIRE_POLL_SECONDS > wait_seconds:
+            _record_skip(owner, (time.perf_counter() - started) * 1000)
+            return None
+        time.sleep(LOCK_ACQUIRE_POLL_SECONDS)
+    
+    previous = response.get('Attributes', {})
+    lease = Lease(
+        owner=owner,
+        fencing_token=int(previous.get('fencing_token', 0)) + 1,
+        lease_expires_at=now + LOCK_LEASE_SECONDS,
+        wait_ms=round((time.perf_counter() - started) * 1000, 1),
+        # 解放済みのリースには保持者が残らないため、保持者が残っていれば期限切れからの引き継ぎ
+        taken_over='owner' in previous
+    )
+    log_to_json(
+        "WARNING" if lease.taken_over else "INFO",
+        "Lock acquired",
+        metric="execution_lock",
+        outcome="taken_over" if lease.taken_over else "acquired",
+        previous_owner=previous.get('owner'),
+        previous_skips=int(previous.get('consecutive_skips', 0)),
+        **lease.metrics()
+    )
+    return lease
+
+
+def renew_lock(lease: Lease):
+    """リース期限を延長（保持者とfencing_tokenが一致しない場合はLeaseLostError）"""
+    lease_expires_at = int(time.time()) + LOCK_LEASE_SECONDS
     try:
-        expires_at = int((datetime.utcnow() + timedelta(minutes=10)).timestamp())
-        lock_table.put_item(
-            Item={
-                'lock_id': 'main_execution',
-                'locked_at': datetime.utcnow().isoformat(),
-                'expires_at': expires_at
-            },
-            ConditionExpression='attribute_not_exists(lock_id)'
+        lock_table.update_item(
+            Key={'lock_id': LOCK_ID},
+            UpdateExpression='SET lease_expires_at = :lease_expires_at',
+            ConditionExpression='#owner = :owner AND fencing_token = :token',
+            ExpressionAttributeNames={'#owner': 'owner'},
+            ExpressionAttributeValues={
+                ':lease_expires_at': lease_expires_at,
+                ':owner': lease.owner,
+                ':token': lease.fencing_token,
+            }
         )
-        logger.info("Lock acquired successfully")
-        return True
     except ClientError as e:
         if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
-            logger.warning("Lock already exists, skipping execution")
-            return False  # 既にロックされている
-        logger.error(f"Failed to acquire lock: {str(e)}")
+            raise LeaseLostError(f"Lease {lease.fencing_token} is no longer held by {lease.owner}")
+        logger.error(f"Failed to renew lock: {str(e)}")
         raise
+    lease.lease_expires_at = lease_expires_at
 
 
-def release_lock():
-    """実行ロックを解放"""
+def release_lock(lease: Lease):
+    """実行ロックを解放（自分が保持している場合のみ。fencing_tokenを残すためアイテムは削除しない）"""
     try:
-        lock_table.delete_item(Key={'lock_id': 'main_execution'})
+        lock_table.update_item(
+            Key={'lock_id': LOCK_ID},
+            UpdateExpression='SET released_at = :released_at REMOVE #owner',
+            ConditionExpression='#owner = :owner AND fencing_token = :token',
+            ExpressionAttributeNames={'#owner': 'owner'},
+            ExpressionAttributeValues={
+                ':released_at': datetime.utcnow().isoformat(),
+                ':owner': lease.owner,
+                ':token': lease.fencing_token,
+            }
+        )
         logger.info("Lock released successfully")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            logger.warning(f"Lock was taken over before release (fencing_token {lease.fencing_token})")
+            return
+        logger.error(f"Failed to release lock: {str(e)}")
     except Exception as e:
         logger.error(f"Failed to release lock: {str(e)}")
 
+
+def fencing_condition(lease: Lease) -> dict:
+    """
+    書き込みの時点でリースを保持していることを確認する条件（TransactWriteItemsのConditionCheck）
+    
+    書き込みと同じトランザクションで実行ロックのアイテムを確認するため、
+    事前のensure_held()から書き込みまでの間に引き継がれた場合も古い保持者の書き込みは失敗する。
+    """
+    return {
+        'TableName': EXECUTION_LOCKS_TABLE,
+        'Key': {'lock_id': LOCK_ID},
+        'ConditionExpression': '#owner = :owner AND fencing_token = :token',
+        'ExpressionAttributeNames': {'#owner': 'owner'},
+        'ExpressionAttributeValues': {':owner': lease.owner, ':token': lease.fencing_token},
+    }
+
+
+def _record_skip(owner: str, wait_ms: float):
+    """スキップしたサイクルをロックアイテムに記録し、メトリクスとしてログ出力"""
+    holder = {}
+    try:
+        response = lock_table.update_item(
+            Key={'lock_id': LOCK_ID},
+            UpdateExpression='SET last_skipped_at = :now ADD skipped_count :one, consecutive_skips :one',
+            ExpressionAttributeValues={':now': datetime.utcnow().isoformat(), ':one': 1},
+            ReturnValues='ALL_NEW'
+        )
+        holder = response.get('Attributes', {})
+    except Exception as e:
+        logger.error(f"Failed to record lock skip: {str(e)}")
+    
+    log_to_json(
+        "WARNING",
+        "Lock held by another execution, skipping",
+        metric="execution_lock",
+        outcome="skipped",
+        wait_ms=round(wait_ms, 1),
+        holder=holder.get('owner'),
+        holder_fencing_token=int(holder['fencing_token']) if 'fencing_token' in holder else None,
+        lease_expires_at=int(holder['lease_expires_at']) if 'lease_expires_at' in holder else None,
+        skipped_count=int(holder.get('skipped_count', 0)),
+        consecutive_skips=int(holder.get('consecutive_skips', 0)),
+        owner=owner
+    )
+
+
+class LeaseRenewer:
+    """
+    実行サイクル中、バックグラウンドでリースを定期的に延長する
+    
+    延長に失敗した（リースを失った）場合はensure_held()がLeaseLostErrorを送出する。
+    保存前にensure_held()を呼ぶことで、引き継がれた後の古い保持者の書き込みを早めに止める
+    （確認から書き込みまでの間に引き継がれた場合は、書き込み時のfencing_conditionで拒否される）。
+    """
+    
+    def __init__(self, lease: Lease):
+        self.lease = lease
+        self._stop = threading.Event()
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, name="lease-renewer", daemon=True)
+    
+    def start(self) -> "LeaseRenewer":
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+    
+    def ensure_held(self):
+        """リースを保持していることを確認し、期限を延長（失っていればLeaseLostError）"""
+        if isinstance(self._error, LeaseLostError):
+            raise self._error
+        renew_lock(self.lease)
+    
+    def _run(self):
+        while not self._stop.wait(LOCK_RENEW_INTERVAL_SECONDS):
+            try:
+                renew_lock(self.lease)
+            except LeaseLostError as e:
+                self._error = e
+                logger.error(str(e))
+                return
+            except Exception as e:
+                # 一時的なエラーは次の周期で再試行する
+                logger.warning(f"Failed to renew lease: {str(e)}")
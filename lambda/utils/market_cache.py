@@ -0,0 +1,102 @@
+"""取引所マーケット情報のディスクキャッシュ
+
+ccxtのload_marketsは全ペア（数千件）のマーケット情報を毎回ダウンロードするため、
+取引対象シンボル分（精度・最小注文額を含む）だけを /tmp に保存して再利用する。
+/tmp がない（コールドスタート直後の）場合はデプロイパッケージ同梱のスナップショットを使う。
+"""
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from config import (
+    MARKET_CACHE_PATH, MARKET_SNAPSHOT_PATH, MARKET_CACHE_TTL_SECONDS, TRADING_SYMBOLS
+)
+from utils.logger import logger
+
+# キャッシュ形式を変更した場合はインクリメントする
+MARKET_CACHE_FORMAT_VERSION = 1
+
+
+class MarketCache:
+    """取引対象シンボルのマーケット情報キャッシュ"""
+    
+    def __init__(self, exchange_id: str, library_version: str,
+                 symbols: List[str] = TRADING_SYMBOLS,
+                 path: str = MARKET_CACHE_PATH,
+                 snapshot_path: Optional[str] = MARKET_SNAPSHOT_PATH,
+                 ttl_seconds: int = MARKET_CACHE_TTL_SECONDS):
+        self.exchange_id = exchange_id
+        self.symbols = list(symbols)
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.ttl_seconds = ttl_seconds
+        # ccxtのバージョンが変わるとマーケット構造が変わりうるため版数に含める
+        self.version = f"{MARKET_CACHE_FORMAT_VERSION}:{exchange_id}:{library_version}"
+    
+    def load(self) -> Tuple[Optional[Dict], bool]:
+        """
+        キャッシュを読み込む
+        
+        Returns:
+            (マーケット情報, TTL内かどうか)。利用可能なキャッシュがなければ (None, False)
+        """
+        for path in (self.path, self.snapshot_path):
+            if not path:
+                continue
+            cached = self._read(path)
+            if cached is None:
+                continue
+            fresh = path == self.path and time.time() - cached['fetched_at'] < self.ttl_seconds
+            return cached['markets'], fresh
+        return None, False
+    
+    def save(self, markets: Dict, path: Optional[str] = None) -> Dict:
+        """取引対象シンボル分だけを書き出し、書き出した内容を返す"""
+        filtered = self.filter(markets)
+        path = path or self.path
+        payload = {
+            'version': self.version,
+            'fetched_at': time.time(),
+            'markets': filtered,
+        }
+        try:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write market cache {path}: {str(e)}")
+        return filtered
+    
+    def filter(self, markets: Dict) -> Dict:
+        """取引対象シンボルのマーケット情報のみを抽出"""
+        return {symbol: markets[symbol] for symbol in self.symbols if symbol in markets}
+    
+    def _read(self, path: str) -> Optional[Dict]:
+        """版数が一致し、全シンボルを含むキャッシュのみを返す"""
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read market cache {path}: {str(e)}")
+            return None
+        
+        if cached.get('version') != self.version:
+            return None
+        if any(symbol not in cached.get('markets', {}) for symbol in self.symbols):
+            return None
+        return cached
+
+
+if __name__ == '__main__':
+    # 同梱スナップショットの作成: python -m utils.market_cache
+    import ccxt
+    
+    exchange = ccxt.gateio({'options': {'defaultType': 'spot'}})
+    cache = MarketCache(exchange.id, ccxt.__version__)
+    os.makedirs(os.path.dirname(cache.snapshot_path), exist_ok=True)
+    written = cache.save(exchange.load_markets(), path=cache.snapshot_path)
+    print(f"Wrote {len(written)} markets to {cache.snapshot_path}", file=sys.stderr)
@@ -1,77 +1,318 @@
 """ニュース収集"""
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urljoin
 import requests
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from config import (
+    NEWS_SOURCES, NEWS_FETCH_BUDGET_SECONDS, NEWS_SOURCE_DEADLINE_SECONDS,
+    NEWS_SOURCE_DEADLINES, NEWS_MAX_ITEMS_PER_SOURCE, NEWS_USER_AGENT,
+    NEWS_CRYPTOPANIC_MAX_PAGES, NEWS_SEEN_DIGEST_ITEMS
+)
 from utils.logger import logger
+from utils.seen_news import SeenNewsIndex
 
+# 取得関数 (session, timeout, cursor) -> ニュース項目のリスト
+# cursorは前回までに取得した最新のpublished_at（対応しないソースは無視する）
+NewsFetcher = Callable[[requests.Session, float, Optional[str]], List[Dict[str, str]]]
 
-def fetch_cryptopanic_news() -> List[Dict[str, str]]:
-    """CryptoPanic APIからニュースを取得"""
-    try:
-        auth_token = os.getenv("CRYPTOPANIC_AUTH_TOKEN") or os.getenv("AUTH_TOKEN")
-        if not auth_token:
-            logger.warning("CRYPTOPANIC_AUTH_TOKEN is not set; skipping CryptoPanic news fetch")
-            return []
-
-        # CryptoPanic APIの実装（APIキーが必要な場合）
-        # ここでは例として実装
-        # Docs: Base=https://cryptopanic.com/api/developer/v2, News endpoint=GET /posts/
-        url = "https://cryptopanic.com/api/developer/v2/posts/"
-        params = {
-            "auth_token": auth_token,  # APIキーが必要
-            "public": "true",  # public=true で Public Usage Mode
-            "filter": "hot",
-            "kind": "news",
-        }
-        response = requests.get(url, params=params, timeout=10)
-        if response.status_code != 200:
-            logger.warning(
-                f"CryptoPanic returned non-200 status: {response.status_code}, body={response.text[:500]}"
-            )
-            return []
+# ソース名 -> 取得関数
+# 登録順がニューステキストでの並び順になる（CryptoPanicを優先）
+NEWS_FETCHERS: Dict[str, NewsFetcher] = {}
+
+# 全ソースで共有するキープアライブセッション（ウォームスタート時は再利用）
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def news_fetcher(name: str):
+    """ニュース取得関数をソース名で登録するデコレータ"""
+    def register(func: NewsFetcher):
+        NEWS_FETCHERS[name] = func
+        return func
+    return register
+
+
+def get_session() -> requests.Session:
+    """共有HTTPセッションを取得（ソース数分の接続をプールする）"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=len(NEWS_SOURCES), pool_maxsize=len(NEWS_SOURCES))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": NEWS_USER_AGENT})
+            _session = session
+        return _session
 
+
+@news_fetcher("cryptopanic")
+def fetch_cryptopanic_news(session: requests.Session, timeout: float,
+                           cursor: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    CryptoPanic APIからニュースを取得
+    
+    hotフィードは時系列順ではなく後からhotになった投稿がカーソルより前に現れるため、
+    時系列フィード（published_atの新しい順）を取得する。
+    cursorがある場合はそれ以降の投稿のみを返し、ページ内がすべて新しい間は次ページも取得する。
+    cursorと同時刻の投稿は取りこぼさないよう含める（重複はSeenNewsIndexで既出として扱われる）。
+    """
+    auth_token = os.getenv("CRYPTOPANIC_AUTH_TOKEN") or os.getenv("AUTH_TOKEN")
+    if not auth_token:
+        raise RuntimeError("CRYPTOPANIC_AUTH_TOKEN is not set")
+    
+    # Docs: Base=https://cryptopanic.com/api/developer/v2, News endpoint=GET /posts/
+    url = "https://cryptopanic.com/api/developer/v2/posts/"
+    params = {
+        "auth_token": auth_token,  # APIキーが必要
+        "public": "true",  # public=true で Public Usage Mode
+        "kind": "news",
+    }
+    news_items = []
+    for _ in range(NEWS_CRYPTOPANIC_MAX_PAGES):
+        response = session.get(url, params=params, timeout=timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"non-200 status: {response.status_code}, body={response.text[:500]}")
+        
         data = response.json()
-        news_items = []
-        for item in data.get("results", [])[:10]:  # 最新10件
+        reached_cursor = False
+        for item in data.get("results", []):
+            published_at = item.get("published_at", "")
+            if cursor and published_at and published_at <= cursor:
+                reached_cursor = True
+                if published_at < cursor:
+                    continue
             news_items.append({
                 "title": item.get("title", ""),
                 # Docs: original_url is the original article; url is the Cryptopanic-hosted article
                 "url": item.get("original_url") or item.get("url", ""),
-                "source": "cryptopanic"
+                "source": "cryptopanic",
+                "published_at": published_at
             })
-        return news_items
-    except Exception as e:
-        logger.warning(f"Failed to fetch CryptoPanic news: {str(e)}")
-    return []
+        
+        # 初回（カーソルなし）は1ページのみ。カーソルに達したら以降のページは取得しない
+        if not cursor or reached_cursor or not data.get("next") \
+                or len(news_items) >= NEWS_MAX_ITEMS_PER_SOURCE:
+            break
+        # nextはクエリ（auth_tokenを含む）付きのURL
+        url, params = data["next"], None
+    return news_items[:NEWS_MAX_ITEMS_PER_SOURCE]
 
 
-def collect_news() -> Dict[str, any]:
-    """全ニュースソースから情報を収集"""
-    all_news = []
-    fetch_status = {}
-    failed_sources = []
-    
-    # CryptoPanic API（優先）
-    cryptopanic_news = fetch_cryptopanic_news()
-    if cryptopanic_news:
-        all_news.extend(cryptopanic_news)
-        fetch_status["cryptopanic"] = True
-    else:
-        fetch_status["cryptopanic"] = False
-        failed_sources.append("cryptopanic")
-    
-    # ニューステキストを結合
-    news_text = "\n".join([
-        f"[{item['source']}] {item['title']}" for item in all_news
+def scrape_headlines(session: requests.Session, timeout: float, source: str,
+                     selectors: List[str]) -> List[Dict[str, str]]:
+    """
+    ニュース一覧ページから見出しを抽出
+    
+    selectorsを順に試し、最初に見出しが取れたCSSセレクタの結果を使う。
+    """
+    # beautifulsoup4 / lxml はLambda Layerに含まれる。スクレイピング時まで遅延インポートする
+    from bs4 import BeautifulSoup
+    
+    url = NEWS_SOURCES[source]
+    response = session.get(url, timeout=timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f"non-200 status: {response.status_code}")
+    
+    soup = BeautifulSoup(response.text, "lxml")
+    for selector in selectors:
+        news_items = []
+        seen_titles = set()
+        for element in soup.select(selector):
+            title = " ".join(element.get_text(" ", strip=True).split())
+            if len(title) < 10 or title in seen_titles:
+                continue
+            seen_titles.add(title)
+            link = element if element.name == "a" else element.find_parent("a") or element.find("a")
+            news_items.append({
+                "title": title,
+                "url": urljoin(url, link.get("href", "")) if link else url,
+                "source": source
+            })
+            if len(news_items) >= NEWS_MAX_ITEMS_PER_SOURCE:
+                break
+        if news_items:
+            return news_items
+    raise RuntimeError("no headlines matched")
+
+
+@news_fetcher("reuters")
+def fetch_reuters_news(session: requests.Session, timeout: float,
+                       cursor: Optional[str] = None) -> List[Dict[str, str]]:
+    """Reuters（ビジネス）の見出しを取得"""
+    return scrape_headlines(session, timeout, "reuters", [
+        'a[data-testid="Heading"]',
+        "h3 a",
     ])
+
+
+@news_fetcher("investing")
+def fetch_investing_news(session: requests.Session, timeout: float,
+                         cursor: Optional[str] = None) -> List[Dict[str, str]]:
+    """Investing.com（一般ニュース）の見出しを取得"""
+    return scrape_headlines(session, timeout, "investing", [
+        'a[data-test="article-title-link"]',
+        "article a.title",
+    ])
+
+
+@news_fetcher("coindesk")
+def fetch_coindesk_news(session: requests.Session, timeout: float,
+                        cursor: Optional[str] = None) -> List[Dict[str, str]]:
+    """CoinDesk Japanの見出しを取得"""
+    return scrape_headlines(session, timeout, "coindesk", [
+        "article h2 a",
+        "article h3 a",
+        "h2 a",
+    ])
+
+
+@news_fetcher("forexfactory")
+def fetch_forexfactory_calendar(session: requests.Session, timeout: float,
+                                cursor: Optional[str] = None) -> List[Dict[str, str]]:
+    """Forex Factoryの経済指標カレンダー（本日分）を取得"""
+    from bs4 import BeautifulSoup
+    
+    url = NEWS_SOURCES["forexfactory"]
+    response = session.get(url, timeout=timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f"non-200 status: {response.status_code}")
+    
+    soup = BeautifulSoup(response.text, "lxml")
+    news_items = []
+    for row in soup.select("tr.calendar__row"):
+        event = row.select_one(".calendar__event-title")
+        if event is None:
+            continue
+        currency = row.select_one(".calendar__currency")
+        news_items.append({
+            "title": f"{currency.get_text(strip=True) if currency else ''} {event.get_text(strip=True)}".strip(),
+            "url": url,
+            "source": "forexfactory"
+        })
+        if len(news_items) >= NEWS_MAX_ITEMS_PER_SOURCE:
+            break
+    if not news_items:
+        raise RuntimeError("no calendar events matched")
+    return news_items
+
+
+@news_fetcher("liveuamap")
+def fetch_liveuamap_news(session: requests.Session, timeout: float,
+                         cursor: Optional[str] = None) -> List[Dict[str, str]]:
+    """Liveuamap（地政学イベント）の見出しを取得"""
+    return scrape_headlines(session, timeout, "liveuamap", [
+        "#feedler .event .title",
+        ".event .title",
+    ])
+
+
+def format_news_text(news_items: List[Dict[str, str]]) -> str:
+    """
+    プロンプト用のニューステキストを作成
+    
+    新着ニュースは全件、既出ニュースは件数と先頭NEWS_SEEN_DIGEST_ITEMS件のみを含める。
+    """
+    new_items = [item for item in news_items if not item.get("seen")]
+    seen_items = [item for item in news_items if item.get("seen")]
+    
+    lines = [f"[{item['source']}] {item['title']}" for item in new_items] or ["（新着ニュースなし）"]
+    if seen_items:
+        lines.append("")
+        lines.append(f"（既出ニュース {len(seen_items)}件のうち{min(len(seen_items), NEWS_SEEN_DIGEST_ITEMS)}件）")
+        lines.extend(f"[{item['source']}] {item['title']}" for item in seen_items[:NEWS_SEEN_DIGEST_ITEMS])
+    return "\n".join(lines)
+
+
+def collect_news(sources: Optional[List[str]] = None,
+                 seen_index: Optional[SeenNewsIndex] = None) -> Dict[str, any]:
+    """
+    全ニュースソースから情報を収集
+    
+    各ソースを並列に取得し、ソースごとの期限（全体の予算内）を過ぎたものは失敗として扱う。
+    ソースを追加してもサイクル時間は最も遅いソース（上限は全体の予算）で決まる。
+    seen_indexを渡した場合は各ニュースに新着/既出を付与し、ソースのカーソル以降のみを取得する。
+    """
+    if sources is None:
+        sources = [name for name in NEWS_FETCHERS if name in NEWS_SOURCES]
+    cursors = seen_index.cursors(sources) if seen_index else {}
+    
+    session = get_session()
+    started_at = time.perf_counter()
+    deadlines = {
+        name: min(NEWS_SOURCE_DEADLINES.get(name, NEWS_SOURCE_DEADLINE_SECONDS), NEWS_FETCH_BUDGET_SECONDS)
+        for name in sources
+    }
+    results: Dict[str, List[Dict[str, str]]] = {}
+    fetch_status = {}
+    
+    def record(name: str, items: List[Dict[str, str]], error: Optional[str]):
+        fetch_status[name] = {
+            # カーソル以降の新着がない場合は0件でも成功
+            "ok": error is None,
+            "items": len(items),
+            "latency_ms": round((time.perf_counter() - started_at) * 1000, 1),
+        }
+        if error is not None:
+            fetch_status[name]["error"] = error
+    
+    # 期限を過ぎたソースを待たずに戻るため、executorの終了は待たない
+    executor = ThreadPoolExecutor(max_workers=max(len(sources), 1))
+    running = {
+        executor.submit(NEWS_FETCHERS[name], session, deadlines[name], cursors.get(name)): name
+        for name in sources
+    }
+    try:
+        while running:
+            elapsed = time.perf_counter() - started_at
+            remaining = min(deadlines[name] for name in running.values()) - elapsed
+            done, _ = wait(list(running), timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                    record(name, results[name], None)
+                except Exception as e:
+                    logger.warning(f"Failed to fetch {name} news: {str(e)}")
+                    record(name, [], str(e))
+            
+            elapsed = time.perf_counter() - started_at
+            for future, name in list(running.items()):
+                if elapsed >= deadlines[name]:
+                    running.pop(future)
+                    future.cancel()
+                    logger.warning(f"Fetching {name} news exceeded its {deadlines[name]}s deadline")
+                    record(name, [], "deadline exceeded")
+    finally:
+        executor.shutdown(wait=False)
+    
+    all_news = []
+    for name in sources:
+        all_news.extend(results.get(name, []))
+    failed_sources = [name for name in sources if not fetch_status[name]["ok"]]
+    
+    if seen_index:
+        seen_index.tag(all_news)
+        for name in sources:
+            published = [item["published_at"] for item in results.get(name, []) if item.get("published_at")]
+            if published:
+                seen_index.advance_cursor(name, max(published))
+    
+    # ニューステキストを結合（既出ニュースは要約のみ）
+    news_text = format_news_text(all_news)
     
     source_urls = [item['url'] for item in all_news]
     
     return {
         "news_items": all_news,
         "news_text": news_text,
+        "new_count": sum(1 for item in all_news if not item.get("seen")),
         "source_urls": source_urls,
+        # ソース名 -> {"ok", "items", "latency_ms"(, "error")}
         "fetch_status": fetch_status,
         "failed_sources": failed_sources
     }
-
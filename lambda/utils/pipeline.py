@@ -0,0 +1,112 @@
+"""実行サイクルのステージ並列実行"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from utils.logger import log_to_json
+
+
+class Pipeline:
+    """
+    依存関係を持つステージを並列実行する小さなステージグラフ
+    
+    各ステージは依存先ステージの結果をキーワード引数として受け取る。
+    依存関係のないステージ（ネットワークI/Oなど）はスレッドプールで同時に実行される。
+    スレッド数は依存関係のないステージの数に合わせる（max_workersを指定した場合はそれを上限とする）。
+    """
+    
+    def __init__(self, name: str, max_workers: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        # ステージ名 -> {"start_ms", "end_ms", "duration_ms"}（パイプライン開始からの相対時刻）
+        self.timings: Dict[str, Dict[str, float]] = {}
+    
+    def add_stage(self, name: str, func: Callable[..., Any],
+                  depends_on: Sequence[str] = ()) -> "Pipeline":
+        """ステージを追加"""
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"Unknown dependency '{dependency}' for stage '{name}'")
+        self._stages[name] = {"func": func, "depends_on": list(depends_on)}
+        return self
+    
+    def run(self) -> Dict[str, Any]:
+        """全ステージを実行し、ステージ名 -> 結果 の辞書を返す"""
+        results: Dict[str, Any] = {}
+        pending = dict(self._stages)
+        running = {}
+        started_at = time.perf_counter()
+        self.timings = {}
+        
+        def run_stage(stage_name: str, func: Callable[..., Any], kwargs: Dict[str, Any]):
+            start = time.perf_counter()
+            try:
+                return func(**kwargs)
+            finally:
+                end = time.perf_counter()
+                self.timings[stage_name] = {
+                    "start_ms": round((start - started_at) * 1000, 1),
+                    "end_ms": round((end - started_at) * 1000, 1),
+                    "duration_ms": round((end - start) * 1000, 1),
+                }
+        
+        with ThreadPoolExecutor(max_workers=self.worker_count()) as executor:
+            while pending or running:
+                ready = [
+                    stage_name for stage_name, stage in pending.items()
+                    if all(dependency in results for dependency in stage["depends_on"])
+                ]
+                for stage_name in ready:
+                    stage = pending.pop(stage_name)
+                    kwargs = {dependency: results[dependency] for dependency in stage["depends_on"]}
+                    future = executor.submit(run_stage, stage_name, stage["func"], kwargs)
+                    running[future] = stage_name
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage_name = running.pop(future)
+                    try:
+                        results[stage_name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        self._log_timings(started_at)
+                        raise
+        
+        self._log_timings(started_at)
+        return results
+    
+    def worker_count(self) -> int:
+        """スレッドプールのスレッド数（依存関係のないステージがすべて同時に開始できる数）"""
+        roots = sum(1 for stage in self._stages.values() if not stage["depends_on"])
+        workers = max(roots, 1)
+        return min(workers, self.max_workers) if self.max_workers else workers
+    
+    def critical_path(self) -> List[str]:
+        """最後に完了したステージから、最も遅く完了した依存先を辿ったステージ列"""
+        if not self.timings:
+            return []
+        path = []
+        current = max(self.timings, key=lambda stage_name: self.timings[stage_name]["end_ms"])
+        while current:
+            path.append(current)
+            dependencies = [
+                dependency for dependency in self._stages[current]["depends_on"]
+                if dependency in self.timings
+            ]
+            current = max(
+                dependencies,
+                key=lambda stage_name: self.timings[stage_name]["end_ms"],
+                default=None
+            )
+        return list(reversed(path))
+    
+    def _log_timings(self, started_at: float):
+        """ステージごとの所要時間をJSONログに出力"""
+        log_to_json(
+            "INFO",
+            f"Pipeline '{self.name}' stage timings",
+            total_ms=round((time.perf_counter() - started_at) * 1000, 1),
+            stages=self.timings,
+            critical_path=self.critical_path()
+        )
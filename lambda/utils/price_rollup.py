@@ -0,0 +1,64 @@
+"""価格履歴のOHLCV集計（時間足・日足）"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional
+
+# 集計間隔 -> バケット開始時刻の丸め方
+ROLLUP_INTERVALS = {
+    "1h": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    "1d": lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+
+def series_key(symbol: str, interval: str) -> str:
+    """集計テーブルのパーティションキー（例: "PAXG/USDT#1d"）"""
+    return f"{symbol}#{interval}"
+
+
+def bucket_start(timestamp: datetime, interval: str) -> str:
+    """timestampが属するバケットの開始時刻（ISO8601）"""
+    return ROLLUP_INTERVALS[interval](timestamp).isoformat()
+
+
+def merge_ohlcv(existing: Optional[Dict], symbol: str, interval: str,
+                timestamp: datetime, price: float, change_24h: float,
+                volume: float) -> Dict:
+    """
+    既存のバケットに1件の価格サンプルを反映したアイテムを返す
+    
+    volume / change_24h はティッカーの24時間値のため、合算せずバケット内の最新値を保持する。
+    """
+    price = Decimal(str(price))
+    timestamp_iso = timestamp.isoformat()
+    
+    if existing is None:
+        return {
+            'series_key': series_key(symbol, interval),
+            'bucket_start': bucket_start(timestamp, interval),
+            'symbol': symbol,
+            'interval': interval,
+            'open': price,
+            'high': price,
+            'low': price,
+            'close': price,
+            'change_24h': Decimal(str(change_24h)),
+            'volume': Decimal(str(volume)),
+            'samples': 1,
+            'first_timestamp': timestamp_iso,
+            'last_timestamp': timestamp_iso,
+        }
+    
+    item = dict(existing)
+    # 遅れて到着したサンプルでopen/closeが逆転しないようにtimestampで判定
+    if timestamp_iso < item['first_timestamp']:
+        item['open'] = price
+        item['first_timestamp'] = timestamp_iso
+    if timestamp_iso >= item['last_timestamp']:
+        item['close'] = price
+        item['change_24h'] = Decimal(str(change_24h))
+        item['volume'] = Decimal(str(volume))
+        item['last_timestamp'] = timestamp_iso
+    item['high'] = max(item['high'], price)
+    item['low'] = min(item['low'], price)
+    item['samples'] = int(item.get('samples', 0)) + 1
+    return item
@@ -1,7 +1,10 @@
 """リスク管理"""
-from typing import Dict, Tuple
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 from config import (
-    MAX_SPREAD_PERCENT, BALANCE_USAGE_RATIO, MAX_PRICE_DEVIATION_PERCENT
+    MAX_SPREAD_PERCENT, BALANCE_USAGE_RATIO, MAX_PRICE_DEVIATION_PERCENT,
+    ORDER_BOOK_CACHE_TTL_SECONDS
 )
 from utils.logger import logger
 from utils.gateio_client import GateIOClient
@@ -12,10 +15,50 @@ class RiskManager:
     
     def __init__(self, gateio_client: GateIOClient):
         self.gateio_client = gateio_client
+        # symbol -> (取得時刻, オーダーブック)。サイクル内の重複取得を避ける短期キャッシュ
+        self._order_book_cache: Dict[str, Tuple[float, Optional[Dict]]] = {}
+        # 先行取得中の場合、後続の取得は完了を待ってからキャッシュを参照する
+        self._prefetch_lock = threading.Lock()
+    
+    def prefetch_order_books(self, symbols: List[str]):
+        """キャッシュにない（または期限切れの）オーダーブックをまとめて並列取得"""
+        with self._prefetch_lock:
+            now = time.monotonic()
+            stale = [
+                symbol for symbol in dict.fromkeys(symbols)
+                if symbol not in self._order_book_cache
+                or now - self._order_book_cache[symbol][0] > ORDER_BOOK_CACHE_TTL_SECONDS
+            ]
+            if not stale:
+                return
+            fetched_at = time.monotonic()
+            for symbol, orderbook in self.gateio_client.get_order_books(stale).items():
+                self._order_book_cache[symbol] = (fetched_at, orderbook)
+    
+    def prefetch_order_books_in_background(self, symbols: List[str]) -> threading.Thread:
+        """
+        オーダーブックの先行取得をバックグラウンドで開始
+        
+        取得中に validate_orders / prefetch_order_books が呼ばれた場合は完了を待つ。
+        """
+        def prefetch():
+            try:
+                self.prefetch_order_books(symbols)
+            except Exception as e:
+                logger.warning(f"Background order book prefetch failed: {str(e)}")
+        
+        thread = threading.Thread(target=prefetch, daemon=True)
+        thread.start()
+        return thread
+    
+    def get_order_book(self, symbol: str) -> Optional[Dict]:
+        """キャッシュ経由でオーダーブックを取得"""
+        self.prefetch_order_books([symbol])
+        return self._order_book_cache[symbol][1]
     
     def check_spread(self, symbol: str) -> bool:
         """スプレッドチェック"""
-        orderbook = self.gateio_client.get_order_book(symbol)
+        orderbook = self.get_order_book(symbol)
         if orderbook and orderbook.get('spread_percent'):
             spread = orderbook['spread_percent']
             if spread > MAX_SPREAD_PERCENT:
@@ -34,14 +77,21 @@ class RiskManager:
         # 実際にはprice_historyテーブルから直近の価格を取得して比較
         return True  # 暫定的にTrueを返す
     
-    def validate_trade(self, symbol: str, side: str, amount: float) -> Tuple[bool, str]:
-        """取引の妥当性を検証"""
+    def validate_trade(self, symbol: str, side: str, amount: float,
+                       ticker: Optional[Dict] = None) -> Tuple[bool, str]:
+        """
+        取引の妥当性を検証
+        
+        Args:
+            ticker: サイクル内で取得済みのティッカー。省略時はAPIから取得する
+        """
         # スプレッドチェック
         if not self.check_spread(symbol):
             return False, f"Spread too high for {symbol}"
         
         # 価格乖離チェック
-        ticker = self.gateio_client.get_ticker(symbol)
+        if ticker is None:
+            ticker = self.gateio_client.get_ticker(symbol)
         if not self.check_price_deviation(symbol, ticker['price']):
             return False, f"Price deviation too high for {symbol}"
         
@@ -50,4 +100,27 @@ class RiskManager:
             return False, f"Order amount too small: {amount}"
         
         return True, "OK"
-
+    
+    def validate_orders(self, orders: List[Dict],
+                        tickers: Dict[str, Dict]) -> List[Tuple[Dict, bool, str]]:
+        """
+        複数の注文をまとめて検証
+        
+        対象シンボルのオーダーブックを先に並列取得し、価格はサイクル内で
+        取得済みのティッカーを再利用する。
+        
+        Returns:
+            [(order, is_valid, message), ...]（ordersと同じ順序）
+        """
+        self.prefetch_order_books([order['symbol'] for order in orders])
+        
+        results = []
+        for order in orders:
+            is_valid, message = self.validate_trade(
+                order['symbol'],
+                order['side'],
+                order['amount'],
+                ticker=tickers.get(order['symbol'])
+            )
+            results.append((order, is_valid, message))
+        return results
@@ -0,0 +1,80 @@
+"""既出ニュースインデックス"""
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from config import NEWS_SEEN_MEMORY_MAX_ITEMS
+from utils.dynamodb_client import DynamoDBClient
+
+
+def news_item_hash(item: Dict[str, str]) -> str:
+    """URLとタイトルから既出判定用のハッシュを作成"""
+    title = " ".join(item.get("title", "").split()).lower()
+    return hashlib.sha256(f"{item.get('url', '')}\n{title}".encode()).hexdigest()
+
+
+class SeenNewsIndex:
+    """
+    既出ニュースのインデックス
+    
+    DynamoDBに永続化し、ウォームスタート間はメモリ上のミラーで判定する（未知のハッシュのみDynamoDBを参照）。
+    tag()で付与した新着分とソースごとのカーソルは、実行サイクルの保存時にcommit()で記録する。
+    保存前にサイクルが失敗した場合、そのニュースは次回も新着として扱われる。
+    """
+    
+    def __init__(self, dynamodb_client: DynamoDBClient):
+        self.dynamodb_client = dynamodb_client
+        # 既出ハッシュ（古いものから破棄）
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        # ソース名 -> カーソル（取得済みの最新published_at）
+        self._cursors: Dict[str, str] = {}
+        self._cursors_loaded = False
+        # 直近のtag()で新着だった項目と、進めたカーソル（commit()待ち）
+        self._pending_items: Dict[str, Dict[str, str]] = {}
+        self._pending_cursors: Dict[str, str] = {}
+    
+    def cursors(self, sources: List[str]) -> Dict[str, Optional[str]]:
+        """ソースごとのカーソル（コールドスタート時のみDynamoDBから読み込む）"""
+        if not self._cursors_loaded:
+            self._cursors.update(self.dynamodb_client.get_news_cursors(sources))
+            self._cursors_loaded = True
+        return {source: self._cursors.get(source) for source in sources}
+    
+    def tag(self, items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """各ニュースに item_hash と seen（既出かどうか）を付与"""
+        hashes = [news_item_hash(item) for item in items]
+        unknown = list({item_hash for item_hash in hashes if item_hash not in self._seen})
+        if unknown:
+            for item_hash in self.dynamodb_client.get_seen_news(unknown):
+                self._remember(item_hash)
+        
+        self._pending_items = {}
+        self._pending_cursors = {}
+        for item, item_hash in zip(items, hashes):
+            item["item_hash"] = item_hash
+            item["seen"] = item_hash in self._seen
+            if not item["seen"]:
+                self._pending_items.setdefault(item_hash, item)
+        return items
+    
+    def advance_cursor(self, source: str, cursor: str):
+        """ソースのカーソルを進める（commit()で記録）"""
+        if cursor > (self._cursors.get(source) or ""):
+            self._pending_cursors[source] = cursor
+    
+    def commit(self):
+        """新着ニュースとカーソルを保存し、メモリ上のミラーに反映（write_group内で呼ぶとまとめて書き込まれる）"""
+        if not self._pending_items and not self._pending_cursors:
+            return
+        self.dynamodb_client.save_seen_news(list(self._pending_items.values()), self._pending_cursors)
+        for item_hash in self._pending_items:
+            self._remember(item_hash)
+        self._cursors.update(self._pending_cursors)
+        self._pending_items = {}
+        self._pending_cursors = {}
+    
+    def _remember(self, item_hash: str):
+        """メモリ上のミラーに追加（上限を超えたら古いものから破棄）"""
+        self._seen[item_hash] = None
+        self._seen.move_to_end(item_hash)
+        while len(self._seen) > NEWS_SEEN_MEMORY_MAX_ITEMS:
+            self._seen.popitem(last=False)